@@ -0,0 +1,52 @@
+# Arranque en frío: cuánto tarda un proceso nuevo en tener listo el
+# compilador. Antes cualquier uso pasaba por importar el script de la
+# interfaz (tkinter y todas las etapas); la línea de comandos solo importa lo
+# que usa cada subcomando.
+#
+# Uso: python benchmarks/bench_arranque.py [--repeticiones 15]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA = "def f(x):\n    return x * 2\ntotal = 0\nfor i in range(5):\n    total = total + f(i)\nprint(total)\n"
+
+
+def medir(comando, repeticiones):
+    entorno = dict(os.environ)
+    entorno['PYTHONPATH'] = os.pathsep.join(filter(None, [RAIZ, entorno.get('PYTHONPATH')]))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=RAIZ, env=entorno, check=True, stdout=subprocess.DEVNULL)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque en frío del compilador")
+    parser.add_argument('--repeticiones', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'programa.py')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(PROGRAMA)
+        casos = [
+            ("python vacío", [sys.executable, '-c', 'pass']),
+            ("importar la interfaz", [sys.executable, '-c', 'import compilador.gui']),
+            ("cli lex", [sys.executable, '-m', 'compilador', 'lex', ruta]),
+            ("cli ir", [sys.executable, '-m', 'compilador', 'ir', ruta]),
+            ("cli run", [sys.executable, '-m', 'compilador', 'run', ruta]),
+        ]
+        for nombre, comando in casos:
+            print(f"{nombre:<22} {medir(comando, args.repeticiones) * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
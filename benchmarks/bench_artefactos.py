@@ -0,0 +1,61 @@
+# Abrir un artefacto (.cart) con mmap contra volver a calcular sus etapas
+# desde el código fuente: tokens y código intermedio.
+#
+# Uso: python benchmarks/bench_artefactos.py [--lineas 500000] [--ruta /tmp/bench.cart]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lexico import generar_fuente
+from compilador.artefactos import abrir_artefacto, guardar_artefacto
+from compilador.flujo_tokens import flujo_tokens
+from compilador.intermedio import generar_codigo_intermedio
+from compilador.sintactico import analizador_sintactico
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Abrir un artefacto frente a recalcular las etapas")
+    parser.add_argument('--lineas', type=int, default=500000)
+    parser.add_argument('--ruta', default=os.path.join(tempfile.gettempdir(), 'bench_artefactos.cart'))
+    args = parser.parse_args()
+
+    codigo_fuente = generar_fuente(args.lineas)
+    flujo, t_lexico = cronometrar(lambda: flujo_tokens(codigo_fuente))
+    arbol, t_sintactico = cronometrar(lambda: analizador_sintactico(flujo))
+    codigo, t_intermedio = cronometrar(lambda: generar_codigo_intermedio(arbol))
+    tamano, t_guardar = cronometrar(lambda: guardar_artefacto(args.ruta, flujo, intermedio=codigo))
+
+    artefacto, t_abrir = cronometrar(lambda: abrir_artefacto(args.ruta))
+    flujo_cargado, t_tokens = cronometrar(artefacto.flujo)
+    codigo_cargado, t_codigo = cronometrar(artefacto.intermedio)
+    # Recorrer las columnas sí lee el archivo entero
+    _, t_recorrer = cronometrar(lambda: sum(flujo_cargado.fines) + sum(codigo_cargado.opcodes))
+
+    if list(flujo_cargado) != list(flujo) or list(codigo_cargado) != list(codigo):
+        print("ERROR: el artefacto no tiene lo mismo que se guardó")
+        sys.exit(1)
+
+    print(f"Líneas: {args.lineas}  Tokens: {len(flujo)}  Instrucciones: {len(codigo)}")
+    print(f"Artefacto: {tamano / (1 << 20):.1f} MiB, guardado en {t_guardar * 1000:.1f} ms")
+    print(f"Calcular:  léxico {t_lexico * 1000:.1f} ms, sintáctico {t_sintactico * 1000:.1f} ms, "
+          f"intermedio {t_intermedio * 1000:.1f} ms")
+    print(f"Abrir:     mmap {t_abrir * 1000:.2f} ms, tokens {t_tokens * 1000:.2f} ms, "
+          f"intermedio {t_codigo * 1000:.2f} ms")
+    print(f"Recorrer las columnas abiertas: {t_recorrer * 1000:.1f} ms")
+    print(f"Aceleración: {(t_lexico + t_sintactico + t_intermedio) / (t_abrir + t_tokens + t_codigo):.0f}x")
+    artefacto.cerrar()
+    os.remove(args.ruta)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Latencia de ejecutar un programa en un proceso aparte: arrancando el
+# proceso en cada ejecución (pool vacío) contra sacarlo del pool ya arrancado.
+#
+# Uso: python benchmarks/bench_ejecucion.py [--ejecuciones 20]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.ejecucion import PoolEjecucion
+
+PROGRAMA = "print(sum(range(1000)))\n"
+
+
+def medir(pool, ejecuciones):
+    objeto = compile(PROGRAMA, '<programa>', 'exec')
+    tiempos = []
+    for _ in range(ejecuciones):
+        time.sleep(0.2)  # dar tiempo a que el pool reponga el proceso
+        inicio = time.perf_counter()
+        resultado = pool.ejecutar(objeto).esperar()
+        tiempos.append(time.perf_counter() - inicio)
+        assert resultado.estado == 'ok' and resultado.salida == "499500\n", resultado
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2], tiempos[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de la ejecución en procesos aparte")
+    parser.add_argument('--ejecuciones', type=int, default=20)
+    args = parser.parse_args()
+
+    for nombre, tamano in (("sin pool", 0), ("pool", 2)):
+        pool = PoolEjecucion(tamano=tamano)
+        try:
+            mediana, peor = medir(pool, args.ejecuciones)
+        finally:
+            pool.cerrar()
+        print(f"{nombre:<10} mediana {mediana * 1000:7.1f} ms   peor {peor * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
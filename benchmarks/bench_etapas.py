@@ -0,0 +1,299 @@
+# Tiempo y memoria de cada etapa del compilador por separado, sobre código
+# generado de varios tipos (asignaciones, condicionales anidados, cadenas
+# largas, mucho comentario y delimitadores sin pareja) y tamaños (1K a 100M). Cada etapa recibe la
+# entrada ya calculada por las anteriores, así solo se mide ella.
+#
+# Los resultados se guardan en JSON y se pueden comparar con otra ejecución
+# guardada (por defecto base_etapas.json junto a este archivo): las etapas
+# más lentas que la base por encima de la tolerancia se marcan como
+# regresión y el programa termina con código 1.
+#
+# Uso: python benchmarks/bench_etapas.py [--tamanos 1K 100K 1M] [--corpus asignaciones ...]
+#          [--etapas lexico semantico ...] [--repeticiones 3] [--sin-memoria]
+#          [--salida resultados.json] [--base base_etapas.json] [--tolerancia 0.25]
+#
+# Con --tamanos 100M hace falta bastante memoria: la etapa `lexico` devuelve
+# una lista de tuplas (varios GB con 100 MB de código).
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.arbol import generar_arbol_dot
+from compilador.correccion import corregir_codigo
+from compilador.flujo_tokens import flujo_tokens
+from compilador.intermedio import generar_codigo_intermedio
+from compilador.lexico import analizador_lexico
+from compilador.optimizador import optimizar_codigo
+from compilador.semantico import analizador_semantico
+from compilador.sintactico import analizador_sintactico
+
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'base_etapas.json')
+UNIDADES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+# === Generadores de código ===
+# Cada uno devuelve un bloque de código para el índice i; el corpus repite
+# bloques con nombres distintos hasta llegar al tamaño pedido
+
+def bloque_asignaciones(i):
+    return (f"v{i} = v{i - 1} + {i} * 3\n"
+            f"w{i} = (v{i} - {i % 7}) // 2 % 11\n"
+            f"v{i} += w{i}\n")
+
+
+def bloque_condicionales(i):
+    return (f"if v{i - 1} > {i % 5}:\n"
+            f"    if v{i - 1} < {i % 9} and v{i - 1} != 3:\n"
+            f"        v{i} = 1\n"
+            f"    elif v{i - 1} == {i % 4}:\n"
+            f"        while v{i - 1} > 100:\n"
+            f"            v{i - 1} -= 100\n"
+            f"        v{i} = 2\n"
+            f"    else:\n"
+            f"        v{i} = 3\n"
+            f"else:\n"
+            f"    v{i} = v{i - 1}\n")
+
+
+def bloque_cadenas(i):
+    texto = f"cadena número {i} " * 12
+    return (f"v{i} = \"{texto}\"\n"
+            f"c{i} = '{texto[::-1]}'\n"
+            f"d{i} = \"\"\"{texto}\n{texto}\"\"\"\n")
+
+
+def bloque_comentarios(i):
+    return (f"# Comentario {i}: explica en detalle lo que hace la siguiente línea\n"
+            f"# y añade una segunda línea de comentario para el bloque {i}\n"
+            f"v{i} = v{i - 1} + 1  # comentario al final de la línea {i}\n"
+            f"#\n#   {'-' * 60}\n#\n")
+
+
+# Caso malo de la corrección: n aperturas '(' y n cierres ']' que no cierran
+# ninguna. No se hace con bloques, se genera entero.
+def texto_delimitadores(tamano):
+    n = max(1, (tamano - 4) // 2)
+    return 'x = ' + '(' * n + ']' * n
+
+
+CORPUS = {
+    'asignaciones': bloque_asignaciones,
+    'condicionales': bloque_condicionales,
+    'cadenas': bloque_cadenas,
+    'comentarios': bloque_comentarios,
+    'delimitadores': texto_delimitadores,
+}
+ENTEROS = {'delimitadores'}
+
+
+def generar_corpus(nombre, tamano):
+    if nombre in ENTEROS:
+        return CORPUS[nombre](tamano)
+    bloque = CORPUS[nombre]
+    partes = ["v0 = 0\n"]
+    total = len(partes[0])
+    i = 1
+    while total < tamano:
+        parte = bloque(i)
+        partes.append(parte)
+        total += len(parte)
+        i += 1
+    return ''.join(partes)
+
+
+def leer_tamano(texto):
+    texto = texto.strip().upper().rstrip('B')
+    if texto and texto[-1] in UNIDADES:
+        return int(float(texto[:-1]) * UNIDADES[texto[-1]])
+    return int(texto)
+
+
+def nombre_tamano(tamano):
+    for sufijo in ('G', 'M', 'K'):
+        if tamano >= UNIDADES[sufijo] and tamano % UNIDADES[sufijo] == 0:
+            return f"{tamano // UNIDADES[sufijo]}{sufijo}"
+    return str(tamano)
+
+
+# === Etapas ===
+# (nombre, función que prepara la entrada a partir de las entradas comunes, etapa)
+
+ETAPAS = [
+    ('lexico', lambda e: e['fuente'], analizador_lexico),
+    ('flujo_tokens', lambda e: e['fuente'], flujo_tokens),
+    ('sintactico', lambda e: e['flujo'], analizador_sintactico),
+    ('semantico', lambda e: e['arbol'], analizador_semantico),
+    ('intermedio', lambda e: e['arbol'], generar_codigo_intermedio),
+    ('optimizador', lambda e: e['intermedio'], optimizar_codigo),
+    ('correccion', lambda e: e['fuente'], corregir_codigo),
+    ('dot', lambda e: e['arbol'], lambda arbol: generar_arbol_dot(arbol, "MiPrograma")),
+]
+
+
+# Entradas comunes calculadas una vez por corpus, solo las que hacen falta
+def preparar_entradas(fuente, etapas):
+    entradas = {'fuente': fuente}
+    if etapas - {'lexico', 'flujo_tokens', 'correccion'}:
+        entradas['flujo'] = flujo_tokens(fuente)
+        entradas['arbol'] = analizador_sintactico(entradas['flujo'])
+        if 'optimizador' in etapas:
+            entradas['intermedio'] = generar_codigo_intermedio(entradas['arbol'])
+    return entradas
+
+
+# Una pasada por cada etapa con código pequeño para que lo que solo se hace
+# la primera vez (importaciones perezosas, cachés de re) no cuente
+def calentar(etapas):
+    entradas = preparar_entradas(generar_corpus('asignaciones', 1024), set(etapas))
+    for nombre, entrada_de, funcion in ETAPAS:
+        if nombre in etapas:
+            funcion(entrada_de(entradas))
+
+
+def medir_tiempo(funcion, entrada, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcion(entrada)
+        duracion = time.perf_counter() - inicio
+        del resultado
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+# Memoria pedida por la etapa (sin contar su entrada) en su punto máximo
+def medir_memoria(funcion, entrada):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = funcion(entrada)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return pico
+
+
+def ejecutar(tamanos, corpus, etapas, repeticiones, con_memoria):
+    resultados = []
+    calentar(etapas)
+    for nombre_corpus in corpus:
+        for tamano in tamanos:
+            fuente = generar_corpus(nombre_corpus, tamano)
+            entradas = preparar_entradas(fuente, set(etapas))
+            tokens = len(entradas['flujo']) if 'flujo' in entradas else len(flujo_tokens(fuente))
+            for nombre, entrada_de, funcion in ETAPAS:
+                if nombre not in etapas:
+                    continue
+                entrada = entrada_de(entradas)
+                segundos = medir_tiempo(funcion, entrada, repeticiones)
+                resultado = {
+                    'corpus': nombre_corpus,
+                    'tamano': nombre_tamano(tamano),
+                    'bytes': len(fuente.encode('utf-8')),
+                    'tokens': tokens,
+                    'etapa': nombre,
+                    'segundos': segundos,
+                    'tokens_por_segundo': tokens / segundos if segundos else None,
+                    'pico_memoria': medir_memoria(funcion, entrada) if con_memoria else None,
+                }
+                resultados.append(resultado)
+                mostrar_resultado(resultado)
+            del entradas, fuente
+    return resultados
+
+
+def formato_bytes(cantidad):
+    if cantidad is None:
+        return '-'
+    for unidad in ('B', 'KiB', 'MiB'):
+        if cantidad < 1024:
+            return f"{cantidad:.0f} {unidad}"
+        cantidad /= 1024
+    return f"{cantidad:.1f} GiB"
+
+
+def mostrar_resultado(r):
+    velocidad = f"{r['tokens_por_segundo']:>12,.0f}" if r['tokens_por_segundo'] else f"{'-':>12}"
+    print(f"{r['corpus']:<14} {r['tamano']:>6} {r['etapa']:<13} {r['segundos']:>10.4f} s "
+          f"{velocidad} tok/s {formato_bytes(r['pico_memoria']):>10}", flush=True)
+
+
+# Compara con la base por (corpus, tamaño, etapa). Devuelve las regresiones.
+# Las diferencias de menos de `minimo` segundos no cuentan: con los tamaños
+# pequeños el ruido es mayor que la tolerancia.
+def comparar(resultados, base, tolerancia, minimo):
+    anteriores = {(r['corpus'], r['tamano'], r['etapa']): r for r in base['resultados']}
+    regresiones = []
+    print(f"\nComparación con la base (tolerancia {tolerancia:.0%}):")
+    for r in resultados:
+        anterior = anteriores.get((r['corpus'], r['tamano'], r['etapa']))
+        if anterior is None or not anterior['segundos']:
+            continue
+        relacion = r['segundos'] / anterior['segundos']
+        marca = ''
+        if abs(r['segundos'] - anterior['segundos']) < minimo:
+            pass
+        elif relacion > 1 + tolerancia:
+            marca = '  <-- REGRESIÓN'
+            regresiones.append((r, anterior, relacion))
+        elif relacion < 1 - tolerancia:
+            marca = '  (mejora)'
+        print(f"{r['corpus']:<14} {r['tamano']:>6} {r['etapa']:<13} {anterior['segundos']:>10.4f} s -> "
+              f"{r['segundos']:>10.4f} s {relacion:>6.2f}x{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo y memoria de cada etapa del compilador")
+    parser.add_argument('--tamanos', nargs='+', default=['1K', '10K', '100K', '1M'],
+                        help="tamaños del código generado (admite K, M y G)")
+    parser.add_argument('--corpus', nargs='+', choices=list(CORPUS), default=list(CORPUS))
+    parser.add_argument('--etapas', nargs='+', choices=[nombre for nombre, _, _ in ETAPAS],
+                        default=[nombre for nombre, _, _ in ETAPAS])
+    parser.add_argument('--repeticiones', type=int, default=3, help="se queda con el mejor tiempo")
+    parser.add_argument('--sin-memoria', action='store_true', help="no medir el pico de memoria (tracemalloc)")
+    parser.add_argument('--salida', metavar='RUTA', help="guardar los resultados en JSON")
+    parser.add_argument('--base', metavar='RUTA', default=BASE,
+                        help="resultados guardados con los que comparar ('' para no comparar)")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="cuánto más lento que la base se acepta antes de marcar regresión")
+    parser.add_argument('--minimo', type=float, default=0.01,
+                        help="diferencia mínima en segundos para marcar regresión o mejora")
+    args = parser.parse_args()
+
+    tamanos = [leer_tamano(tamano) for tamano in args.tamanos]
+    print(f"{'corpus':<14} {'tamaño':>6} {'etapa':<13} {'tiempo':>12} {'velocidad':>18} {'memoria':>10}")
+    resultados = ejecutar(tamanos, args.corpus, args.etapas, args.repeticiones, not args.sin_memoria)
+
+    if args.salida:
+        datos = {
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticiones': args.repeticiones,
+            'resultados': resultados,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, indent=1, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.base and os.path.exists(args.base) and os.path.abspath(args.base) != os.path.abspath(args.salida or ''):
+        with open(args.base, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(resultados, base, args.tolerancia, args.minimo)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# Benchmark: motor léxico precompilado contra el bucle original que
+# recompilaba cada patrón de TOKENS_PYTHON en cada posición, y el motor con
+# una sola expresión regular contra el del autómata (el que se usa ahora).
+#
+# Uso: python benchmarks/bench_lexico.py [--lineas 50000] [--repeticiones 3]
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.lexico import TOKENS_PYTHON, analizador_lexico, es_palabra_clave, motor_perfil
+
+PLANTILLA = '''# Programa con una estructura condicional
+x = 15
+if x > 10:
+    print("x es mayor que 10")
+else:
+    print('x es menor o igual a 10')
+for i in range(5):
+    total += i * 2.5 - (i % 3)
+resultado = [a, b, c] != {d: e}
+'''
+
+
+# Copia del analizador original (versión con ERROR_LEXICO) usada como referencia
+def analizador_lexico_original(codigo_fuente):
+    tokens_encontrados = []
+    lineas = codigo_fuente.splitlines()
+
+    for num_linea, linea in enumerate(lineas, start=1):
+        posicion = 0
+        while posicion < len(linea):
+            for token_tipo, patron in TOKENS_PYTHON:
+                patron_compilado = re.compile(patron)
+                coincidencia = patron_compilado.match(linea, posicion)
+                if coincidencia:
+                    texto = coincidencia.group(0)
+                    if token_tipo != 'ESPACIO':
+                        if token_tipo == 'IDENTIFICADOR' and es_palabra_clave(texto):
+                            tokens_encontrados.append((num_linea, 'PALABRA_CLAVE', texto))
+                        else:
+                            tokens_encontrados.append((num_linea, token_tipo, texto))
+                    posicion = coincidencia.end(0)
+                    break
+            else:
+                tokens_encontrados.append((num_linea, 'ERROR_LEXICO', linea[posicion]))
+                posicion += 1
+    return tokens_encontrados
+
+
+def generar_fuente(num_lineas):
+    bloque = PLANTILLA.splitlines()
+    repeticiones = num_lineas // len(bloque) + 1
+    return "\n".join((bloque * repeticiones)[:num_lineas])
+
+
+def medir(funcion, codigo_fuente, repeticiones):
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(codigo_fuente)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del analizador léxico")
+    parser.add_argument('--lineas', type=int, default=50000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    codigo_fuente = generar_fuente(args.lineas)
+    t_original, tokens_original = medir(analizador_lexico_original, codigo_fuente, args.repeticiones)
+    t_regex, tokens_regex = medir(motor_perfil('python', automata=False).analizar, codigo_fuente, args.repeticiones)
+    t_motor, tokens_motor = medir(analizador_lexico, codigo_fuente, args.repeticiones)
+
+    if not tokens_original == tokens_regex == tokens_motor:
+        print("ERROR: los tokens del motor no coinciden con los del analizador original")
+        sys.exit(1)
+
+    print(f"Líneas: {args.lineas}  Tokens: {len(tokens_motor)}")
+    print(f"Original: {t_original:.3f} s  ({len(tokens_original) / t_original:,.0f} tokens/s)")
+    print(f"Regex:    {t_regex:.3f} s  ({len(tokens_regex) / t_regex:,.0f} tokens/s)")
+    print(f"Autómata: {t_motor:.3f} s  ({len(tokens_motor) / t_motor:,.0f} tokens/s)")
+    print(f"Aceleración: {t_original / t_motor:.1f}x ({t_regex / t_motor:.2f}x sobre la regex)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# El léxico con entradas hechas para frenarlo, y fuzzing.
+#
+# Estrés: cada caso genera texto patológico de n y de 4n caracteres y mide
+# tokens/s y caracteres/s con los dos motores (expresión regular y
+# autómata). Si analizar 4n tarda más de --factor veces lo que tarda n, el
+# caso no es lineal y el programa termina con código 1.
+#
+# Fuzzing: textos aleatorios hechos de trozos difíciles (aperturas de
+# cadenas y comentarios, comillas, caracteres desconocidos, no ASCII,
+# saltos de línea...). Para cada uno se comprueba que los tokens cubren el
+# texto en orden sin huecos salvo espacios, que las líneas son las correctas
+# y que flujo_tokens, el streaming (iterar), el léxico en paralelo por
+# trozos y el incremental dan lo mismo. Un fallo se muestra con su semilla.
+#
+# Uso: python benchmarks/bench_lexico_adverso.py [--tamano 20000] [--factor 8]
+#          [--fuzz 300] [--semilla 1] [--max-fuzz 400]
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.flujo_tokens import escanear_columnas, flujo_tokens, tipos_de
+from compilador.lexico import motor_perfil
+from compilador.lexico_incremental import LexicoIncremental
+
+
+def repetir(trozo):
+    return lambda n: (trozo * (n // len(trozo) + 1))[:n]
+
+
+# nombre -> (perfil, generador de n caracteres)
+CASOS = {
+    'comentarios_sin_cierre': ('c', repetir('/* ')),
+    'triples_dobles_sin_cierre': ('python', lambda n: '"""' + repetir('x "" \n')(n - 3)),
+    'triples_simples_sin_cierre': ('python', lambda n: "'''" + repetir("x '' \n")(n - 3)),
+    'triples_alternadas': ('python', repetir('"""\'\'\'')),
+    'comillas_sueltas': ('python', repetir('"x \'y ')),
+    'comillas_sin_cierre_por_linea': ('python', repetir('"abc def\n')),
+    'simbolos_desconocidos': ('python', repetir('@$?`!')),
+    'letras_no_ascii': ('python', repetir('ñandú 漢字 ¿€ ')),
+    'linea_enorme': ('python', repetir('abc + 1 * ')),
+    'identificador_enorme': ('python', repetir('a')),
+    'numeros_con_puntos': ('python', repetir('1.')),
+    'parentesis_anidados': ('python', repetir('(')),
+    'espacios': ('python', repetir(' \t\n')),
+}
+
+TROZOS = ['"""', "'''", '/*', '*/', '"', "'", '#', '\n', ' ', '\t', '\\', 'x', 'def', 'if', '1.5', '1.',
+          '(', ')', '[', ']', ':', '==', '+=', '&&', '@', '$', '`', 'ñ', '漢', ' ', ' ', '\r\n',
+          'import', 'a_b', '9']
+
+
+def medir(texto, motor):
+    inicio = time.perf_counter()
+    flujo = flujo_tokens(texto, motor)
+    return len(flujo), time.perf_counter() - inicio
+
+
+def estres(tamano, factor):
+    fallos = 0
+    print(f"{'caso':<32}{'motor':<9}{'n':>9}{'tokens/s':>14}{'caracteres/s':>15}{'4n/n':>8}")
+    for nombre, (perfil, generar) in CASOS.items():
+        pequeno, grande = generar(tamano), generar(4 * tamano)
+        for automata in (False, True):
+            motor = motor_perfil(perfil, automata)
+            medir(pequeno, motor)  # calentar (tablas del autómata, caché de re)
+            tokens, t_pequeno = min(medir(pequeno, motor) for _ in range(3))
+            tokens_grande, t_grande = min(medir(grande, motor) for _ in range(3))
+            razon = t_grande / t_pequeno if t_pequeno else 0.0
+            lineal = razon <= factor
+            fallos += not lineal
+            print(f"{nombre:<32}{'autómata' if automata else 'regex':<9}{tamano:>9}"
+                  f"{tokens_grande / t_grande if t_grande else 0:>14,.0f}"
+                  f"{len(grande) / t_grande if t_grande else 0:>15,.0f}{razon:>8.1f}"
+                  f"{'' if lineal else '  NO LINEAL'}")
+    return fallos
+
+
+def texto_aleatorio(azar, maximo):
+    partes = []
+    while sum(map(len, partes)) < maximo and azar.random() > 0.02:
+        partes.append(azar.choice(TROZOS))
+    return ''.join(partes)
+
+
+# Problema encontrado en un texto con un motor ('' si ninguno)
+def comprobar(texto, motor):
+    flujo = flujo_tokens(texto, motor)
+    posicion, linea = 0, 1
+    for i in range(len(flujo)):
+        inicio, fin = flujo.inicios[i], flujo.fines[i]
+        if fin <= inicio:
+            return f"token vacío en {inicio}"
+        hueco = texto[posicion:inicio]
+        if inicio < posicion or hueco and not hueco.isspace():
+            return f"hueco o solapamiento antes del token {i} ({hueco!r})"
+        linea += texto.count('\n', posicion, inicio)
+        if flujo.lineas[i] != linea:
+            return f"token {i}: línea {flujo.lineas[i]}, debería ser {linea}"
+        linea += texto.count('\n', inicio, fin)
+        posicion = fin
+    if texto[posicion:] and not texto[posicion:].isspace():
+        return f"texto sin tokens al final ({texto[posicion:]!r})"
+
+    esperados = list(flujo)
+    if list(motor.iterar(io.StringIO(texto))) != esperados:
+        return "iterar sobre un archivo no coincide"
+    if list(motor.iterar(texto, tam_bloque=7)) != esperados:
+        return "iterar por bloques no coincide"
+    # Dos trozos cortados tras un salto de línea, como en flujo_tokens_paralelo
+    corte = texto.find('\n', len(texto) // 2) + 1
+    if corte:
+        tipos = tipos_de(motor)
+        primero = escanear_columnas(texto, motor, tipos, 0, corte, 1)
+        segundo = escanear_columnas(texto, motor, tipos, primero[4], len(texto), primero[5])
+        if list(primero[2]) + list(segundo[2]) != list(flujo.inicios):
+            return "escanear por trozos no coincide"
+    incremental = LexicoIncremental(motor)
+    incremental.actualizar(texto[:len(texto) // 2])
+    incremental.actualizar(texto)
+    if list(incremental) != esperados:
+        return "el léxico incremental no coincide"
+    return ''
+
+
+def fuzz(casos, semilla, maximo):
+    fallos = 0
+    inicio = time.perf_counter()
+    motores = [motor_perfil(perfil, automata) for perfil in ('python', 'c') for automata in (False, True)]
+    for caso in range(casos):
+        azar = random.Random(semilla * 1000003 + caso)
+        texto = texto_aleatorio(azar, maximo)
+        for motor in motores:
+            problema = comprobar(texto, motor)
+            if problema:
+                fallos += 1
+                nombre = 'autómata' if hasattr(motor.patron, 'escanear_columnas') else 'regex'
+                print(f"FALLO semilla={semilla} caso={caso} motor={nombre} {problema}\n    {texto[:200]!r}")
+    print(f"Fuzzing: {casos} textos x {len(motores)} motores en {time.perf_counter() - inicio:.1f} s, "
+          f"{fallos} fallos")
+    return fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="El léxico con entradas patológicas y fuzzing")
+    parser.add_argument('--tamano', type=int, default=20000, help="caracteres del caso pequeño (el grande es 4x)")
+    parser.add_argument('--factor', type=float, default=8.0, help="máximo tiempo(4n) / tiempo(n)")
+    parser.add_argument('--fuzz', type=int, default=300, help="número de textos aleatorios")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--max-fuzz', type=int, default=400, help="caracteres como mucho por texto aleatorio")
+    args = parser.parse_args()
+
+    fallos = estres(args.tamano, args.factor)
+    print()
+    fallos += fuzz(args.fuzz, args.semilla, args.max_fuzz)
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Máquina virtual contra exec: tiempo de bucles aritméticos, llamadas a
+# funciones y recursión ejecutados sobre el código intermedio (sin optimizar
+# y optimizado) y con exec del código fuente compilado por Python.
+#
+# Antes se comprueba que la máquina da lo mismo que exec (lo que imprime y el
+# tipo de excepción) con programas que ya fallaron alguna vez: cierres,
+# locales leídas antes de asignarlas, recursión profunda, plegado de -0.0...
+# Si alguno no coincide el programa termina con código 1.
+#
+# Uso: python benchmarks/bench_maquina.py [--iteraciones 200000]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.flujo_tokens import flujo_tokens
+from compilador.intermedio import generar_codigo_intermedio
+from compilador.maquina import MaquinaVirtual
+from compilador.optimizador import optimizar_codigo
+
+PROGRAMAS = {
+    'cierre': "def outer():\n    x = 5\n    def inner():\n        return x\n    return inner()\nprint(outer())\n",
+    'cierre_tardio': ("def f():\n    def g():\n        return y\n    y = 3\n    r = g()\n    y = 4\n"
+                      "    return r, g()\nprint(f())\n"),
+    'cierre_sin_valor': "def f():\n    def g():\n        return y\n    r = g()\n    y = 1\n    return r\nf()\n",
+    'cierre_dos_niveles': ("def a():\n    x = 1\n    def b():\n        def c():\n            return x + 1\n"
+                           "        return c()\n    return b()\nprint(a())\n"),
+    'contador': ("def hacer():\n    n = [0]\n    def inc():\n        n[0] += 1\n        return n[0]\n"
+                 "    return inc\ni = hacer()\ni()\nprint(i(), i())\n"),
+    'local_antes_de_asignar': "x = 1\ndef f():\n    print(x)\n    x = 2\nf()\n",
+    'local_antes_de_sumar': "x = 1\ndef f():\n    x += 1\nf()\n",
+    'local_borrada': "x = 1\ndef f():\n    x = 2\n    del x\n    return x\nf()\n",
+    'global': "x = 1\ndef f():\n    global x\n    x = x + 1\nf()\nprint(x)\n",
+    'global_en_anidada': ("x = 'g'\ndef f():\n    x = 'l'\n    def g():\n        global x\n        return x\n"
+                          "    return g()\nprint(f())\n"),
+    'sombra': ("x = 'g'\ndef f():\n    x = 'f'\n    def g():\n        x = 'g2'\n        return x\n"
+               "    return g(), x\nprint(f(), x)\n"),
+    'recursion_500': "def f(n):\n    if n == 0:\n        return 0\n    return 1 + f(n - 1)\nprint(f(500))\n",
+    'recursion_con_nombre': ("def f(n, total=0):\n    if n == 0:\n        return total\n"
+                             "    return f(n=n - 1, total=total + 1)\nprint(f(900))\n"),
+    'recursion_mutua': ("def par(n):\n    if n == 0:\n        return True\n    return impar(n - 1)\n"
+                        "def impar(n):\n    if n == 0:\n        return False\n    return par(n - 1)\n"
+                        "print(par(700), impar(701))\n"),
+    'recursion_infinita': "def f(n):\n    return f(n + 1)\nf(0)\n",
+    'llamada_desde_python': "def doble(x):\n    return 2 * x\nprint(list(map(doble, range(5))), sorted([3, 1, 2], key=doble))\n",
+    'error_en_funcion': "def f(x):\n    return 1 // x\nprint(f(2))\nf(0)\n",
+    'argumentos': "def f(a, b=1):\n    return a + b\nprint(f(1), f(1, 2), f(b=3, a=1))\nf()\n",
+    # El optimizador pliega estas operaciones: 0.0 y -0.0 son constantes distintas
+    'cero_con_signo': "print(0.0, -0.0)\nprint(-0.0 + 0, 0.0 * -1)\n",
+    'cero_con_signo_plegado': ("print(-0.0 + 0.0, 0.0 - 0.0, -0.0 - 0.0, -0.0 * 0, 0 * -0.0, 1 * -0.0, -(0.0), "
+                               "-0.0 / 1, -0 * 1.0, 0 * -1.0)\n"),
+    # El optimizador no puede quitar una variable que se lee y no se usa
+    'nombre_suelto': "print(1)\nundefined_name\nprint(2)\n",
+    'asignacion_a_si_misma': "print(1)\nq = q\nprint(2)\n",
+    'asignacion_a_si_misma_local': "q = 1\ndef f():\n    q = q\nf()\n",
+    'cero_con_signo_variable': "x = -0.0\ny = x + 0\nprint(y, x * 1, x * 0, 0 * x, x - 0, 0 - x)\n",
+}
+
+
+def casos(n):
+    return [
+        ("while aritmético", f"s = 0\ni = 0\nwhile i < {n}:\n    s = s + i * i % 7\n    i += 1\n"),
+        ("for aritmético", f"s = 0\nfor i in range({n}):\n    s += i * 3 - 1\n"),
+        ("if dentro de for", f"p = 0\nfor i in range({n}):\n    if i % 2 == 0 and i % 3 != 0:\n        p += 1\n"),
+        ("llamadas", f"def f(x, y=1):\n    return x + y\ns = 0\nfor i in range({n // 2}):\n    s = f(s)\n"),
+        ("fib recursivo", "def fib(n):\n    if n < 2:\n        return n\n    return fib(n - 1) + fib(n - 2)\nr = fib(20)\n"),
+    ]
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+# Lo que imprime el programa y el tipo de la excepción con la que termina
+def salida(ejecutar):
+    texto = io.StringIO()
+    with contextlib.redirect_stdout(texto):
+        try:
+            ejecutar()
+        except Exception as e:
+            texto.write(f"{type(getattr(e, 'error', e)).__name__}\n")  # ErrorEjecucion lleva el original
+    return texto.getvalue()
+
+
+def comparar():
+    fallos = 0
+    for nombre, codigo_fuente in PROGRAMAS.items():
+        esperada = salida(lambda: exec(compile(codigo_fuente, nombre, 'exec'), {'__name__': '__main__'}))
+        intermedio = generar_codigo_intermedio(flujo_tokens(codigo_fuente))
+        for version, codigo in (('vm', intermedio), ('vm opt.', optimizar_codigo(intermedio))):
+            obtenida = salida(lambda: MaquinaVirtual(codigo).ejecutar())
+            if obtenida != esperada:
+                fallos += 1
+                print(f"FALLO {nombre} ({version}): exec {esperada!r}, máquina {obtenida!r}")
+    print(f"{len(PROGRAMAS)} programas comparados con exec, {fallos} fallos\n")
+    return fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Máquina virtual contra exec")
+    parser.add_argument('--iteraciones', type=int, default=200000)
+    args = parser.parse_args()
+
+    fallos = comparar()
+
+    print(f"{'caso':<20} {'instr.':>7} {'opt.':>7} {'vm':>9} {'vm opt.':>9} {'exec':>9} {'vm opt./exec':>13}")
+    for nombre, codigo_fuente in casos(args.iteraciones):
+        intermedio = generar_codigo_intermedio(flujo_tokens(codigo_fuente))
+        optimizado = optimizar_codigo(intermedio)
+        objeto = compile(codigo_fuente, nombre, 'exec')
+
+        resultado_vm = {}
+        resultado_exec = {}
+        t_vm = medir(lambda: MaquinaVirtual(intermedio).ejecutar())
+        t_opt = medir(lambda: resultado_vm.update(MaquinaVirtual(optimizado).ejecutar()))
+        t_exec = medir(lambda: exec(objeto, resultado_exec))
+        for variable in ('s', 'p', 'r'):
+            if variable in resultado_exec:
+                assert resultado_vm[variable] == resultado_exec[variable], nombre
+        print(f"{nombre:<20} {len(intermedio):>7} {len(optimizado):>7} {t_vm:>8.3f}s {t_opt:>8.3f}s "
+              f"{t_exec:>8.3f}s {t_opt / t_exec:>12.1f}x")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
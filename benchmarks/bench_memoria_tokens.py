@@ -0,0 +1,49 @@
+# Comparación de memoria: lista de tuplas (linea, tipo, texto) contra
+# TokenStream en columnas sobre el mismo código fuente.
+#
+# Uso: python benchmarks/bench_memoria_tokens.py [--lineas 50000]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lexico import generar_fuente
+from compilador.flujo_tokens import flujo_tokens
+from compilador.lexico import analizador_lexico
+
+
+def medir(funcion, codigo_fuente):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion(codigo_fuente)
+    duracion = time.perf_counter() - inicio
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, actual, pico, duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de la lista de tuplas frente a TokenStream")
+    parser.add_argument('--lineas', type=int, default=50000)
+    args = parser.parse_args()
+
+    codigo_fuente = generar_fuente(args.lineas)
+    tuplas, mem_tuplas, pico_tuplas, t_tuplas = medir(analizador_lexico, codigo_fuente)
+    flujo, mem_flujo, pico_flujo, t_flujo = medir(flujo_tokens, codigo_fuente)
+
+    if list(flujo) != tuplas:
+        print("ERROR: TokenStream no produce los mismos tokens que analizador_lexico")
+        sys.exit(1)
+
+    n = len(tuplas)
+    print(f"Líneas: {args.lineas}  Tokens: {n}  Fuente: {len(codigo_fuente):,} caracteres")
+    print(f"Lista de tuplas: {mem_tuplas:>12,} B  ({mem_tuplas / n:6.1f} B/token, pico {pico_tuplas:,} B, {t_tuplas:.3f} s)")
+    print(f"TokenStream:     {mem_flujo:>12,} B  ({mem_flujo / n:6.1f} B/token, pico {pico_flujo:,} B, {t_flujo:.3f} s)")
+    print(f"Reducción: {mem_tuplas / mem_flujo:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Construcción incremental de un proyecto generado: primera construcción
+# (todo se procesa), construcción sin cambios, un archivo cambiado del que
+# dependen otros y un archivo sin dependientes.
+#
+# Uso: python benchmarks/bench_proyecto.py [--archivos 10000] [--paquetes 100] [--trabajadores N]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compilador.proyecto import construir_proyecto
+
+
+# Cada módulo importa el anterior de su paquete y el módulo 0 del paquete anterior
+def generar_proyecto(raiz, archivos, paquetes):
+    por_paquete = max(1, archivos // paquetes)
+    for i in range(archivos):
+        p, m = divmod(i, por_paquete)
+        directorio = os.path.join(raiz, f"paquete{p}")
+        os.makedirs(directorio, exist_ok=True)
+        lineas = []
+        if m:
+            lineas.append(f"from paquete{p}.modulo{m - 1} import *")
+        if p:
+            lineas.append(f"import paquete{p - 1}.modulo0")
+        lineas += [f"def funcion{i}(x):",
+                   "    total = 0",
+                   "    for k in range(x):",
+                   "        if k % 2 == 0:",
+                   "            total = total + k * 3",
+                   "    return total",
+                   f"VALOR{i} = funcion{i}({i % 50})",
+                   f"print(VALOR{i})"]
+        with open(os.path.join(directorio, f"modulo{m}.py"), 'w', encoding='utf-8') as archivo:
+            archivo.write('\n'.join(lineas) + '\n')
+
+
+def construir(nombre, raiz, cache, trabajadores):
+    inicio = time.perf_counter()
+    _, resumen = construir_proyecto(raiz, directorio_cache=cache, trabajadores=trabajadores)
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<28}{segundos:>8.2f} s  {resumen['procesados']:>6} procesados  "
+          f"{resumen['enlazados']:>6} enlazados")
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construcción incremental de un proyecto")
+    parser.add_argument('--archivos', type=int, default=10000)
+    parser.add_argument('--paquetes', type=int, default=100)
+    parser.add_argument('--trabajadores', type=int, default=None)
+    args = parser.parse_args()
+
+    temporal = tempfile.mkdtemp(prefix='bench_proyecto')
+    raiz, cache = os.path.join(temporal, 'proyecto'), os.path.join(temporal, 'cache')
+    try:
+        generar_proyecto(raiz, args.archivos, args.paquetes)
+        construir("Primera construcción", raiz, cache, args.trabajadores)
+        construir("Sin cambios", raiz, cache, args.trabajadores)
+
+        with open(os.path.join(raiz, 'paquete0', 'modulo0.py'), 'a', encoding='utf-8') as archivo:
+            archivo.write("EXTRA = 1\n")
+        construir("Cambia paquete0/modulo0", raiz, cache, args.trabajadores)
+
+        ultimo = sorted(os.listdir(os.path.join(raiz, f"paquete{args.paquetes - 1}")))[-1]
+        with open(os.path.join(raiz, f"paquete{args.paquetes - 1}", ultimo), 'a', encoding='utf-8') as archivo:
+            archivo.write("EXTRA = 1\n")
+        construir("Cambia un archivo hoja", raiz, cache, args.trabajadores)
+        resumen = construir("Sin cambios", raiz, cache, args.trabajadores)
+        print(f"Caché: {resumen['bytes_cache'] / (1 << 20):.1f} MiB, {resumen['tokens']} tokens")
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Tiempo del analizador sintáctico: tokens por segundo sobre el corpus
+# sintético y anidamientos profundos (paréntesis, operadores unarios y bloques
+# por sangría) que con un analizador recursivo agotarían la pila.
+#
+# Uso: python benchmarks/bench_sintactico.py [--lineas 50000] [--profundidad 100000]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lexico import generar_fuente
+from compilador.flujo_tokens import flujo_tokens
+from compilador.sintactico import analizador_sintactico, recorrer
+
+
+def medir(codigo_fuente):
+    tokens = flujo_tokens(codigo_fuente)
+    inicio = time.perf_counter()
+    arbol = analizador_sintactico(tokens)
+    duracion = time.perf_counter() - inicio
+    nodos = sum(1 for _ in recorrer(arbol))
+    return len(tokens), nodos, duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendimiento del analizador sintáctico")
+    parser.add_argument('--lineas', type=int, default=50000)
+    parser.add_argument('--profundidad', type=int, default=100000)
+    args = parser.parse_args()
+    n = args.profundidad
+
+    casos = [
+        (f"corpus de {args.lineas} líneas", generar_fuente(args.lineas)),
+        (f"corpus de {args.lineas * 2} líneas", generar_fuente(args.lineas * 2)),
+        (f"{n} paréntesis anidados", "x = " + "(" * n + "1" + ")" * n + "\n"),
+        (f"{n} operadores unarios", "x = " + "-" * n + "1\n"),
+        (f"{n // 10} bloques if anidados", "".join(" " * i + "if x:\n" for i in range(n // 10)) + " " * (n // 10) + "pass\n"),
+    ]
+    print(f"{'caso':<32} {'tokens':>10} {'nodos':>10} {'tiempo':>10} {'tokens/s':>12}")
+    for nombre, codigo_fuente in casos:
+        tokens, nodos, duracion = medir(codigo_fuente)
+        print(f"{nombre:<32} {tokens:>10} {nodos:>10} {duracion:>9.3f}s {tokens / duracion:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
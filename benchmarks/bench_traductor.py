@@ -0,0 +1,65 @@
+# Traducción del código intermedio a Python: tiempo de ejecución del código
+# traducido contra exec del fuente (mismos casos que bench_maquina.py), y
+# ejecutar un programa en frío (todas las etapas + compile) contra en caliente
+# (objeto de código leído de la caché en disco).
+#
+# Uso: python benchmarks/bench_traductor.py [--iteraciones 200000] [--lineas 2000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_maquina import casos, medir
+from compilador.cache import EtapasCompilador
+from compilador.traductor import codigo_compilado, compilar_ir
+
+
+def programa(lineas):
+    partes = ["def f(x, y=2):\n    return x * y + 1\n", "total = 0\n"]
+    for i in range(lineas // 4):
+        partes.append(f"for i in range(3):\n    total = total + f(i, {i % 7})\n"
+                      f"if total % 2 == 0:\n    total = total // 2\n")
+    return ''.join(partes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traducción del código intermedio a Python")
+    parser.add_argument('--iteraciones', type=int, default=200000)
+    parser.add_argument('--lineas', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'caso':<20} {'traducido':>10} {'exec':>9} {'trad./exec':>11}")
+    for nombre, codigo_fuente in casos(args.iteraciones):
+        traducido = compilar_ir(EtapasCompilador().optimizado(codigo_fuente), nombre)
+        objeto = compile(codigo_fuente, nombre, 'exec')
+        resultado_traducido = {}
+        resultado_exec = {}
+        t_traducido = medir(lambda: exec(traducido, resultado_traducido))
+        t_exec = medir(lambda: exec(objeto, resultado_exec))
+        for variable in ('s', 'p', 'r'):
+            if variable in resultado_exec:
+                assert resultado_traducido[variable] == resultado_exec[variable], nombre
+        print(f"{nombre:<20} {t_traducido:>9.3f}s {t_exec:>8.3f}s {t_traducido / t_exec:>10.1f}x")
+
+    codigo_fuente = programa(args.lineas)
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        objeto, desde_cache = codigo_compilado(codigo_fuente, directorio_cache=directorio)
+        exec(objeto, {})
+        t_frio = time.perf_counter() - inicio
+        assert not desde_cache
+        inicio = time.perf_counter()
+        objeto, desde_cache = codigo_compilado(codigo_fuente, directorio_cache=directorio)
+        exec(objeto, {})
+        t_caliente = time.perf_counter() - inicio
+        assert desde_cache
+    print(f"\nprograma de {args.lineas} líneas: en frío {t_frio * 1000:.1f} ms, "
+          f"en caliente {t_caliente * 1000:.1f} ms ({t_frio / t_caliente:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,66 +1,17 @@
-import re
-import keyword
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
-from graphviz import Digraph
-
-# === Patrones de análisis léxico ===
-TOKENS_PYTHON = [
-    ('COMENTARIO_LINEA', r'#.*'),
-    ('CADENA_MULTILINEA', r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\')'),
-    ('CADENA', r'"[^"\n]*"|\'[^\']*\''),  
-    ('OPERADOR_LOGICO', r'and|or|not|&&|\|\|'),  
-    ('OPERADOR_COMPARACION', r'==|!=|<=|>=|<|>'),
-    ('OPERADOR_ASIGNACION', r'[\+\-\*/]?='),
-    ('OPERADOR_ARITMETICO', r'[+\-*/%]'),
-    ('PUNTUACION', r'[;,\(\)\{\}\[\]\.:]'),
-    ('IDENTIFICADOR', r'[a-zA-Z_][a-zA-Z_0-9]*'),
-    ('NUMERO', r'\d+(\.\d+)?'),  
-    ('ESPACIO', r'\s+'),  
-]
-
-PALABRAS_CLAVE = keyword.kwlist
 
-# === Funciones del compilador ===
+from compilador.correccion import corregir_codigo
+from compilador.flujo_tokens import flujo_tokens
+from compilador.lexico import analizador_lexico
+from compilador.semantico import analizador_semantico
+from compilador.intermedio import generar_codigo_intermedio, imprimir_codigo_intermedio
+from compilador.optimizador import imprimir_informe, optimizar
 
-def es_palabra_clave(palabra):
-    return palabra in PALABRAS_CLAVE
-
-def analizador_lexico(codigo_fuente):
-    tokens_encontrados = []
-    lineas = codigo_fuente.splitlines()
-
-    for num_linea, linea in enumerate(lineas, start=1):
-        posicion = 0
-        while posicion < len(linea):
-            for token_tipo, patron in TOKENS_PYTHON:
-                patron_compilado = re.compile(patron)
-                coincidencia = patron_compilado.match(linea, posicion)
-                if coincidencia:
-                    texto = coincidencia.group(0)
-                    if token_tipo != 'ESPACIO':  
-                        if token_tipo == 'IDENTIFICADOR' and es_palabra_clave(texto):
-                            tokens_encontrados.append((num_linea, 'PALABRA_CLAVE', texto))
-                        else:
-                            tokens_encontrados.append((num_linea, token_tipo, texto))
-                    posicion = coincidencia.end(0)
-                    break
-            else:
-                # Error léxico
-                tokens_encontrados.append((num_linea, 'ERROR_LEXICO', linea[posicion]))
-                posicion += 1
-    return tokens_encontrados
-
-def analizador_semantico(tokens):
-    tabla_simbolos = {}
-    errores = []
-    for token in tokens:
-        tipo, valor = token[1], token[2]
-        if tipo == "IDENTIFICADOR" and valor not in tabla_simbolos:
-            errores.append(f"Error: Variable '{valor}' no definida.")
-    return errores
+# === Funciones del compilador ===
 
 def construir_arbol_sintactico(tokens, nombre_programa):
+    from graphviz import Digraph  # solo al dibujar el árbol
     g = Digraph('G', format='png')
     g.attr(size='10,10', dpi='300')  # Tamaño y DPI
     nodo_id = 0
@@ -94,45 +45,6 @@ def construir_arbol_sintactico(tokens, nombre_programa):
     g.render('arbol_sintactico', format='png', view=True)
     messagebox.showinfo("Árbol Sintáctico", "Se generó el árbol sintáctico. Verifica 'arbol_sintactico.png'.")
 
-def generar_codigo_intermedio(tokens):
-    codigo_intermedio = []
-    for token in tokens:
-        tipo, valor = token[1], token[2]
-        if tipo == "NUMERO":
-            codigo_intermedio.append(f"LOAD {valor}")
-        elif tipo == "IDENTIFICADOR":
-            codigo_intermedio.append(f"STORE {valor}")
-        elif tipo == "OPERADOR_ARITMETICO":
-            codigo_intermedio.append(f"OPER {valor}")
-        elif tipo == "OPERADOR_ASIGNACION":
-            codigo_intermedio.append(f"ASSIGN {valor}")
-        elif tipo == "OPERADOR_COMPARACION":
-            codigo_intermedio.append(f"COMPARE {valor}")
-    return codigo_intermedio
-
-def optimizar_codigo(codigo_intermedio):
-    optimizado = []
-    for linea in codigo_intermedio:
-        if "LOAD 0" not in linea:
-            optimizado.append(linea)
-    return optimizado
-
-def corregir_codigo(codigo_fuente):
-    lineas = codigo_fuente.splitlines()
-    codigo_corregido = []
-    correcciones = []
-
-    for num_linea, linea in enumerate(lineas, start=1):
-        if '(' in linea and ')' not in linea:
-            linea = linea + ')'
-            correcciones.append(f"Línea {num_linea}: Añadido paréntesis de cierre.")
-        if '{' in linea and '}' not in linea:
-            linea = linea + '}'
-            correcciones.append(f"Línea {num_linea}: Añadida llave de cierre.")
-        codigo_corregido.append(linea)
-
-    return '\n'.join(codigo_corregido), correcciones
-
 # === Funciones de interfaz gráfica ===
 
 def mostrar_resultados_lexicos():
@@ -145,7 +57,7 @@ def mostrar_arbol_sintactico():
     construir_arbol_sintactico(tokens, "MiPrograma")
 
 def mostrar_errores_semanticos():
-    tokens = analizador_lexico(codigo_fuente)
+    tokens = flujo_tokens(codigo_fuente)  # el semántico necesita las columnas para los ámbitos
     errores = analizador_semantico(tokens)
     if errores:
         messagebox.showerror("Errores Semánticos", "\n".join(errores))
@@ -153,15 +65,16 @@ def mostrar_errores_semanticos():
         messagebox.showinfo("Análisis Semántico", "No se encontraron errores semánticos.")
 
 def mostrar_codigo_intermedio():
-    tokens = analizador_lexico(codigo_fuente)
+    tokens = flujo_tokens(codigo_fuente)
     codigo_intermedio = generar_codigo_intermedio(tokens)
-    messagebox.showinfo("Código Intermedio", "\n".join(codigo_intermedio))
+    messagebox.showinfo("Código Intermedio", "\n".join(imprimir_codigo_intermedio(codigo_intermedio)))
 
 def mostrar_codigo_optimizado():
-    tokens = analizador_lexico(codigo_fuente)
+    tokens = flujo_tokens(codigo_fuente)
     codigo_intermedio = generar_codigo_intermedio(tokens)
-    codigo_optimizado = optimizar_codigo(codigo_intermedio)
-    messagebox.showinfo("Código Optimizado", "\n".join(codigo_optimizado))
+    codigo_optimizado, informe = optimizar(codigo_intermedio)
+    messagebox.showinfo("Código Optimizado", "\n".join(imprimir_informe(informe) + [''] +
+                                                       imprimir_codigo_intermedio(codigo_optimizado)))
 
 def mostrar_codigo_corregido():
     global codigo_fuente
@@ -205,4 +118,6 @@ def menu_compilador():
     ventana.mainloop()
 
 codigo_fuente = ""
-ventana_principal()
+
+if __name__ == '__main__':
+    ventana_principal()
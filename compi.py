@@ -1,52 +1,11 @@
-import re
-import keyword
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
-from graphviz import Digraph
-
-# Patrones de análisis léxico
-TOKENS_PYTHON = [
-    ('COMENTARIO_LINEA', r'#.*'),
-    ('CADENA_MULTILINEA', r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\')'),
-    ('CADENA', r'"[^"\n]*"|\'[^\']*\''),  
-    ('OPERADOR_LOGICO', r'and|or|not|&&|\|\|'),  
-    ('OPERADOR_COMPARACION', r'==|!=|<=|>=|<|>'),
-    ('OPERADOR_ASIGNACION', r'[\+\-\*/]?='),
-    ('OPERADOR_ARITMETICO', r'[+\-*/%]'),
-    ('PUNTUACION', r'[;,\(\)\{\}\[\]\.:]'),
-    ('IDENTIFICADOR', r'[a-zA-Z_][a-zA-Z_0-9]*'),
-    ('NUMERO', r'\d+(\.\d+)?'),  
-    ('ESPACIO', r'\s+'),  
-]
-
-PALABRAS_CLAVE = keyword.kwlist
 
-# Funciones del compilador
-def es_palabra_clave(palabra):
-    return palabra in PALABRAS_CLAVE
-
-def analizador_lexico(codigo_fuente):
-    tokens_encontrados = []
-    lineas = codigo_fuente.splitlines()
-
-    for num_linea, linea in enumerate(lineas, start=1):
-        posicion = 0
-        while posicion < len(linea):
-            for token_tipo, patron in TOKENS_PYTHON:
-                patron_compilado = re.compile(patron)
-                coincidencia = patron_compilado.match(linea, posicion)
-                if coincidencia:
-                    texto = coincidencia.group(0)
-                    if token_tipo != 'ESPACIO':  
-                        if token_tipo == 'IDENTIFICADOR' and es_palabra_clave(texto):
-                            tokens_encontrados.append((num_linea, 'PALABRA_CLAVE', texto))
-                        else:
-                            tokens_encontrados.append((num_linea, token_tipo, texto))
-                    posicion = coincidencia.end(0)
-                    break
-    return tokens_encontrados
+from compilador.lexico import analizador_lexico
 
+# Funciones del compilador
 def construir_arbol_sintactico(tokens, nombre_programa):
+    from graphviz import Digraph  # solo al dibujar el árbol
     g = Digraph('G', format='png')
     g.attr(size='10,10')  # Tamaño en pulgadas
     g.attr(dpi='300')  # Establecer el DPI a 300 para mejor calidad
@@ -255,5 +214,6 @@ def menu_compilador():
     ventana.mainloop()
 
 # Iniciar aplicación
-ventana_principal()
+if __name__ == '__main__':
+    ventana_principal()
 
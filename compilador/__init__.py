@@ -0,0 +1 @@
+# Paquete con las etapas compartidas del compilador (léxico, semántico, etc.)
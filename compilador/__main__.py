@@ -0,0 +1,5 @@
+import sys
+
+from compilador.cli import main
+
+sys.exit(main())
@@ -0,0 +1,131 @@
+import io
+import os
+import shutil
+
+from compilador.cache import expulsar_archivos, hash_fuente, tocar
+from compilador.sintactico import Programa, analizador_sintactico
+
+# Carpeta donde se guardan los árboles ya renderizados, por hash del DOT;
+# cuando pasa de MAX_BYTES se borran los usados hace más tiempo
+DIRECTORIO_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'compilador', 'arboles')
+MAX_BYTES = 64 << 20
+FORMATOS = ('dot', 'svg', 'png', 'pdf')
+
+
+def _cadena_dot(texto):
+    return '"' + texto.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def _tamano_subarbol(nodo):
+    total = 0
+    pila = [nodo]
+    while pila:
+        actual = pila.pop()
+        total += 1
+        pila.extend(actual.hijos())
+    return total
+
+
+# Escribe el código DOT del árbol directamente en `salida` (cualquier objeto
+# con .write), línea a línea, sin construir un graphviz.Digraph en memoria.
+#
+# profundidad_max: los nodos a esa profundidad (los hijos de la raíz tienen
+#   profundidad 1) se dibujan, pero su subárbol se resume en un nodo "+N nodos".
+# max_nodos: al dibujar ese número de nodos, lo que falta se resume con un
+#   nodo "+N nodos" por cada padre que tenía hijos pendientes.
+# Devuelve el número de nodos escritos.
+def escribir_dot(arbol, nombre_programa, salida, profundidad_max=None, max_nodos=None, dpi=300):
+    if not isinstance(arbol, Programa):
+        arbol = analizador_sintactico(arbol)
+    escribir = salida.write
+    nodo_id = 0
+
+    def nuevo_nodo(etiqueta, atributos=''):
+        nonlocal nodo_id
+        nodo_id += 1
+        escribir(f"\tnodo{nodo_id} [label={_cadena_dot(etiqueta)}{atributos}]\n")
+        return f"nodo{nodo_id}"
+
+    def resumen(padre, ocultos):
+        id_resumen = nuevo_nodo(f"+{ocultos} nodo{'s' if ocultos != 1 else ''}", ' shape=note style=dashed')
+        escribir(f"\t{padre} -> {id_resumen} [style=dashed]\n")
+
+    escribir("digraph G {\n")
+    escribir(f"\tgraph [size=\"10,10\" dpi={dpi}]\n")
+    raiz_id = nuevo_nodo(f"Programa: {nombre_programa}", ' shape=rect style=filled fillcolor="#A0D3E8"')
+
+    # Recorrido en preorden con pila explícita: un árbol muy profundo no agota la recursión
+    pila = [(hijo, raiz_id, 1) for hijo in reversed(arbol.cuerpo)]
+    while pila:
+        if max_nodos is not None and nodo_id >= max_nodos:
+            ocultos = {}
+            for nodo, padre, _ in pila:
+                ocultos[padre] = ocultos.get(padre, 0) + _tamano_subarbol(nodo)
+            for padre, cantidad in ocultos.items():
+                resumen(padre, cantidad)
+            break
+        nodo, padre, profundidad = pila.pop()
+        id_nodo = nuevo_nodo(nodo.etiqueta())
+        escribir(f"\t{padre} -> {id_nodo}\n")
+        hijos = list(nodo.hijos())
+        if not hijos:
+            continue
+        if profundidad_max is not None and profundidad >= profundidad_max:
+            resumen(id_nodo, sum(_tamano_subarbol(hijo) for hijo in hijos))
+            continue
+        for hijo in reversed(hijos):
+            pila.append((hijo, id_nodo, profundidad + 1))
+
+    escribir("}\n")
+    return nodo_id
+
+
+# Código DOT del árbol sintáctico como texto, sin renderizarlo (el renderizado
+# lo hace la interfaz). Acepta un árbol ya construido o un TokenStream, que se
+# analiza primero.
+def generar_arbol_dot(arbol, nombre_programa, profundidad_max=None, max_nodos=None, dpi=300):
+    salida = io.StringIO()
+    escribir_dot(arbol, nombre_programa, salida, profundidad_max, max_nodos, dpi)
+    return salida.getvalue()
+
+
+# Renderiza el código DOT en `nombre_archivo`.<formato> y devuelve la ruta.
+# Los resultados se guardan en DIRECTORIO_CACHE con el hash del DOT como
+# nombre, así que volver a renderizar un árbol que no cambió solo copia el
+# archivo. Con ver=False no se abre ningún visor (modo sin interfaz).
+# graphviz solo se importa si hay que renderizar de verdad.
+def renderizar_dot(dot, nombre_archivo='arbol_sintactico', formato='png', ver=False,
+                   directorio_cache=DIRECTORIO_CACHE, max_bytes=MAX_BYTES):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS)})")
+    ruta = f"{nombre_archivo}.{formato}"
+    if formato == 'dot':
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(dot)
+    else:
+        en_cache = None
+        if directorio_cache:
+            en_cache = os.path.join(directorio_cache, f"{hash_fuente(dot)}.{formato}")
+        nuevo = en_cache is None or not os.path.exists(en_cache)
+        if nuevo:
+            from graphviz import Source
+            datos = Source(dot).pipe(format=formato)
+            if en_cache is not None:
+                os.makedirs(directorio_cache, exist_ok=True)
+                temporal = f"{en_cache}.{os.getpid()}.tmp"
+                with open(temporal, 'wb') as archivo:
+                    archivo.write(datos)
+                os.replace(temporal, en_cache)
+            else:
+                with open(ruta, 'wb') as archivo:
+                    archivo.write(datos)
+        if en_cache is not None:
+            shutil.copyfile(en_cache, ruta)
+            if nuevo:
+                expulsar_archivos(directorio_cache, max_bytes)
+            else:
+                tocar(en_cache)
+    if ver:
+        import graphviz
+        graphviz.view(ruta)
+    return ruta
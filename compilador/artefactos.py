@@ -0,0 +1,304 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from compilador.flujo_tokens import TokenStream
+from compilador.intermedio import (VERSION_IR, CodigoIntermedio, _clave_constante, _codificar_constante,
+                                   _decodificar_constante)
+from compilador.semantico import Ambito, TablaSimbolos
+
+# === Artefactos del compilador en binario ===
+#
+# Un archivo .cart guarda lo que produce el compilador para no tener que
+# volver a calcularlo: el flujo de tokens (con su código fuente), la tabla
+# de símbolos, el código intermedio y el optimizado. Cada parte es opcional.
+#
+#   cabecera    'CART', versión del formato, nº de secciones, VERSION_IR
+#               (uint16 cada uno) y 4 bytes libres; todo little-endian
+#   directorio  por sección: nombre (8 bytes ASCII rellenados con \0),
+#               desplazamiento y longitud en bytes (uint64)
+#   secciones   cada una empieza en un múltiplo de 8
+#
+# Secciones:
+#   CAD_IND, CAD_DAT  tabla de cadenas sin repetidos: n + 1 desplazamientos
+#                     (uint64) dentro de CAD_DAT; las demás secciones
+#                     guardan índices a esta tabla
+#   FUENTE            código fuente en UTF-8
+#   TOK_TIPO          cadena de cada código de tipo (uint32)
+#   TOK_COD, TOK_LIN, TOK_INI, TOK_FIN
+#                     las columnas de TokenStream (uint8 y uint32)
+#   AMBITOS           registros de 4 uint32: nombre, padre + 1 (0: ninguno),
+#                     primer símbolo y nº de símbolos
+#   SIMBOLOS          registros de 2 uint32: nombre, línea
+#   ERRORES           registros de 3 uint32: nombre, primera línea, usos
+#   IR_OPC, IR_OPE, IR_LIN
+#                     las columnas de CodigoIntermedio (uint8 y uint32)
+#   IR_CON            registros de 2 uint32: etiqueta de tipo y cadena con
+#                     los datos (la codificación de serializar_codigo_intermedio)
+#   IR_NOM            cadena de cada nombre (uint32)
+#   OP_*              lo mismo que IR_* para el código optimizado
+#
+# Todos los registros son de ancho fijo, así que al abrir un artefacto con
+# mmap las columnas de tokens y de código intermedio son memoryview sobre el
+# archivo, sin copiar nada: abrir uno de millones de tokens tarda lo que se
+# tarda en decodificar su código fuente. Esas columnas son de solo lectura.
+# Las cadenas se decodifican cuando se piden; la tabla de símbolos, que
+# depende de los nombres distintos y no del tamaño del programa, se
+# reconstruye entera.
+
+MAGIA = b'CART'
+VERSION_ARTEFACTO = 1
+CABECERA = struct.Struct('<4sHHH4x')
+ENTRADA = struct.Struct('<8sQQ')
+ALINEACION = 8
+EXTENSION = '.cart'
+
+
+class TablaCadenas:
+    def __init__(self):
+        self.indices = {}
+        self.datos = []
+
+    def agregar(self, datos):
+        if isinstance(datos, str):
+            datos = datos.encode('utf-8', 'surrogatepass')
+        indice = self.indices.get(datos)
+        if indice is None:
+            indice = self.indices[datos] = len(self.datos)
+            self.datos.append(datos)
+        return indice
+
+    def secciones(self):
+        desplazamientos = array('Q', [0])
+        total = 0
+        for datos in self.datos:
+            total += len(datos)
+            desplazamientos.append(total)
+        return [('CAD_IND', desplazamientos), ('CAD_DAT', b''.join(self.datos))]
+
+
+def _columna_bytes(columna):
+    if isinstance(columna, array):
+        if sys.byteorder == 'big' and columna.itemsize > 1:
+            columna = array(columna.typecode, columna)
+            columna.byteswap()
+        return columna.tobytes()
+    return bytes(columna)
+
+
+def _secciones_intermedio(prefijo, codigo, cadenas):
+    constantes = array('I')
+    for valor in codigo.constantes:
+        etiqueta, datos = _codificar_constante(valor)
+        constantes.extend((etiqueta[0], cadenas.agregar(datos)))
+    return [(f'{prefijo}_OPC', codigo.opcodes), (f'{prefijo}_OPE', codigo.operandos),
+            (f'{prefijo}_LIN', codigo.lineas), (f'{prefijo}_CON', constantes),
+            (f'{prefijo}_NOM', array('I', [cadenas.agregar(nombre) for nombre in codigo.nombres]))]
+
+
+# Partes (bytes) del artefacto, en orden, para escribirlas sin juntarlas
+def serializar_artefacto(flujo=None, tabla=None, intermedio=None, optimizado=None):
+    cadenas = TablaCadenas()
+    secciones = []
+    if flujo is not None:
+        secciones += [('FUENTE', flujo.fuente.encode('utf-8', 'surrogatepass')),
+                      ('TOK_TIPO', array('I', [cadenas.agregar(tipo) for tipo in flujo.tipos])),
+                      ('TOK_COD', flujo.codigos), ('TOK_LIN', flujo.lineas),
+                      ('TOK_INI', flujo.inicios), ('TOK_FIN', flujo.fines)]
+    if tabla is not None:
+        ambitos, simbolos, errores = array('I'), array('I'), array('I')
+        numero = {id(ambito): n for n, ambito in enumerate(tabla.ambitos)}
+        for ambito in tabla.ambitos:
+            padre = 0 if ambito.padre is None else numero[id(ambito.padre)] + 1
+            ambitos.extend((cadenas.agregar(ambito.nombre), padre, len(simbolos) // 2, len(ambito.simbolos)))
+            for nombre, linea in ambito.simbolos.items():
+                simbolos.extend((cadenas.agregar(nombre), linea))
+        for nombre, (linea, usos) in tabla.errores.items():
+            errores.extend((cadenas.agregar(nombre), linea, usos))
+        secciones += [('AMBITOS', ambitos), ('SIMBOLOS', simbolos), ('ERRORES', errores)]
+    if intermedio is not None:
+        secciones += _secciones_intermedio('IR', intermedio, cadenas)
+    if optimizado is not None:
+        secciones += _secciones_intermedio('OP', optimizado, cadenas)
+    secciones += cadenas.secciones()
+
+    datos = [_columna_bytes(contenido) for _, contenido in secciones]
+    partes = [CABECERA.pack(MAGIA, VERSION_ARTEFACTO, len(secciones), VERSION_IR)]
+    posicion = CABECERA.size + ENTRADA.size * len(secciones)
+    cuerpo = []
+    for (nombre, _), contenido in zip(secciones, datos):
+        relleno = -posicion % ALINEACION
+        posicion += relleno
+        partes.append(ENTRADA.pack(nombre.encode('ascii'), posicion, len(contenido)))
+        cuerpo += [b'\0' * relleno, contenido]
+        posicion += len(contenido)
+    return partes + cuerpo
+
+
+# Escribe el artefacto en `ruta` (primero en un temporal, para que nadie
+# abra uno a medio escribir). Devuelve el tamaño en bytes.
+def guardar_artefacto(ruta, flujo=None, tabla=None, intermedio=None, optimizado=None):
+    partes = serializar_artefacto(flujo, tabla, intermedio, optimizado)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as archivo:
+        archivo.writelines(partes)
+    os.replace(temporal, ruta)
+    return sum(len(parte) for parte in partes)
+
+
+def es_artefacto(ruta):
+    try:
+        with open(ruta, 'rb') as archivo:
+            return archivo.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+
+# Artefacto abierto sobre un buffer (bytes o mmap). Con abrir_artefacto()
+# el archivo queda mapeado hasta cerrar() o hasta que ya no se use ninguna
+# de las columnas que se sacaron de él.
+class Artefacto:
+    def __init__(self, datos, archivo=None):
+        self._mapa = datos
+        self._archivo = archivo
+        self.datos = memoryview(datos)
+        if len(self.datos) < CABECERA.size:
+            raise ValueError("Artefacto incompleto")
+        magia, version, num_secciones, self.version_ir = CABECERA.unpack_from(self.datos, 0)
+        if magia != MAGIA:
+            raise ValueError("No es un artefacto del compilador")
+        if version != VERSION_ARTEFACTO:
+            raise ValueError(f"Versión de artefacto no soportada: {version}")
+        if CABECERA.size + num_secciones * ENTRADA.size > len(self.datos):
+            raise ValueError("Artefacto truncado")
+        self.secciones = {}
+        for n in range(num_secciones):
+            nombre, inicio, longitud = ENTRADA.unpack_from(self.datos, CABECERA.size + n * ENTRADA.size)
+            if inicio + longitud > len(self.datos):
+                raise ValueError("Artefacto truncado")
+            self.secciones[nombre.rstrip(b'\0').decode('ascii')] = (inicio, longitud)
+        if not self.tiene('CAD_IND', 'CAD_DAT'):
+            raise ValueError("Artefacto sin tabla de cadenas")
+        self._cadenas_ind = self._columna('CAD_IND', 'Q')
+        self._cadenas = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    # Si quedan columnas en uso el mapa no se puede cerrar todavía: se suelta
+    # y se cierra solo cuando dejen de usarse
+    def cerrar(self):
+        self._cadenas_ind = None
+        self.datos.release()
+        if isinstance(self._mapa, mmap.mmap):
+            try:
+                self._mapa.close()
+            except BufferError:
+                pass
+        if self._archivo is not None:
+            self._archivo.close()
+        self._mapa = self._archivo = None
+
+    def tiene(self, *nombres):
+        return all(nombre in self.secciones for nombre in nombres)
+
+    def _bytes(self, nombre):
+        inicio, longitud = self.secciones[nombre]
+        return self.datos[inicio:inicio + longitud]
+
+    # Columna de ancho fijo sin copiar (memoryview); en una máquina big-endian
+    # hay que darle la vuelta a los bytes, así que ahí sí es una copia
+    def _columna(self, nombre, typecode):
+        datos = self._bytes(nombre)
+        if typecode == 'B':
+            return datos
+        if sys.byteorder == 'big':
+            columna = array(typecode)
+            columna.frombytes(datos)
+            columna.byteswap()
+            return columna
+        return datos.cast(typecode)
+
+    def cadena_bytes(self, indice):
+        inicio, fin = self._cadenas_ind[indice], self._cadenas_ind[indice + 1]
+        return self._bytes('CAD_DAT')[inicio:fin]
+
+    def cadena(self, indice):
+        texto = self._cadenas.get(indice)
+        if texto is None:
+            texto = self._cadenas[indice] = str(self.cadena_bytes(indice), 'utf-8', 'surrogatepass')
+        return texto
+
+    def fuente(self):
+        if 'FUENTE' not in self.secciones:
+            return None
+        return str(self._bytes('FUENTE'), 'utf-8', 'surrogatepass')
+
+    def flujo(self):
+        if not self.tiene('FUENTE', 'TOK_TIPO', 'TOK_COD', 'TOK_LIN', 'TOK_INI', 'TOK_FIN'):
+            return None
+        flujo = TokenStream(self.fuente(), [self.cadena(i) for i in self._columna('TOK_TIPO', 'I')])
+        flujo.codigos = self._columna('TOK_COD', 'B')
+        flujo.lineas = self._columna('TOK_LIN', 'I')
+        flujo.inicios = self._columna('TOK_INI', 'I')
+        flujo.fines = self._columna('TOK_FIN', 'I')
+        return flujo
+
+    def tabla_simbolos(self):
+        if not self.tiene('AMBITOS', 'SIMBOLOS', 'ERRORES'):
+            return None
+        ambitos, simbolos, errores = (self._columna(nombre, 'I') for nombre in ('AMBITOS', 'SIMBOLOS', 'ERRORES'))
+        tabla = TablaSimbolos()
+        tabla.ambitos = []
+        for k in range(0, len(ambitos), 4):
+            nombre, padre, primero, cantidad = ambitos[k:k + 4]
+            ambito = Ambito(self.cadena(nombre), tabla.ambitos[padre - 1] if padre else None)
+            for s in range(2 * primero, 2 * (primero + cantidad), 2):
+                ambito.simbolos[self.cadena(simbolos[s])] = simbolos[s + 1]
+            tabla.ambitos.append(ambito)
+        tabla.modulo = tabla.ambitos[0]
+        for k in range(0, len(errores), 3):
+            tabla.errores[self.cadena(errores[k])] = [errores[k + 1], errores[k + 2]]
+        return tabla
+
+    def _intermedio(self, prefijo):
+        if not self.tiene(*(f'{prefijo}_{parte}' for parte in ('OPC', 'OPE', 'LIN', 'CON', 'NOM'))):
+            return None
+        if self.version_ir != VERSION_IR:
+            raise ValueError(f"Versión de código intermedio no soportada: {self.version_ir}")
+        codigo = CodigoIntermedio()
+        codigo.opcodes = self._columna(f'{prefijo}_OPC', 'B')
+        codigo.operandos = self._columna(f'{prefijo}_OPE', 'I')
+        codigo.lineas = self._columna(f'{prefijo}_LIN', 'I')
+        # Las tablas se copian tal cual, con los mismos índices
+        constantes = self._columna(f'{prefijo}_CON', 'I')
+        for k in range(0, len(constantes), 2):
+            valor = _decodificar_constante(bytes((constantes[k],)), self.cadena_bytes(constantes[k + 1]))
+            codigo._indice_constantes.setdefault(_clave_constante(valor), len(codigo.constantes))
+            codigo.constantes.append(valor)
+        for indice in self._columna(f'{prefijo}_NOM', 'I'):
+            codigo._indice_nombres.setdefault(self.cadena(indice), len(codigo.nombres))
+            codigo.nombres.append(self.cadena(indice))
+        return codigo
+
+    def intermedio(self):
+        return self._intermedio('IR')
+
+    def optimizado(self):
+        return self._intermedio('OP')
+
+
+def abrir_artefacto(ruta):
+    archivo = open(ruta, 'rb')
+    try:
+        if os.fstat(archivo.fileno()).st_size == 0:
+            raise ValueError("Artefacto vacío")
+        return Artefacto(mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ), archivo)
+    except Exception:
+        archivo.close()
+        raise
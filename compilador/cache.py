@@ -0,0 +1,214 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from compilador.estadisticas import notificar, observadores
+from compilador.flujo_tokens import flujo_tokens
+from compilador.intermedio import generar_codigo_intermedio
+from compilador.optimizador import optimizar
+from compilador.semantico import analizador_semantico
+from compilador.sintactico import analizador_sintactico
+
+MAX_ENTRADAS = 64
+# Módulos de los que sale lo que guardan las cachés en disco (código generado
+# y resultados de las etapas)
+MODULOS_COMPILADOR = ('lexico', 'lexico_dfa', 'flujo_tokens', 'sintactico', 'semantico', 'intermedio',
+                      'optimizador', 'maquina', 'traductor')
+_version_compilador = None
+
+
+def hash_fuente(codigo_fuente):
+    return hashlib.blake2b(codigo_fuente.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+# Hash del código de esas etapas. Cambia con cualquier cambio del léxico, el
+# árbol, el semántico, el código intermedio, el optimizador o el traductor,
+# aunque nadie se acuerde de subir su VERSION_*: las cachés en disco que lo
+# llevan en la clave no sirven lo que generó una versión anterior.
+def version_compilador():
+    global _version_compilador
+    if _version_compilador is None:
+        directorio = os.path.dirname(os.path.abspath(__file__))
+        partes = []
+        for nombre in MODULOS_COMPILADOR:
+            try:
+                with open(os.path.join(directorio, f"{nombre}.py"), 'rb') as archivo:
+                    partes.append(archivo.read())
+            except OSError:
+                partes.append(nombre.encode('ascii'))  # sin el .py solo cuentan las VERSION_*
+        _version_compilador = hashlib.blake2b(b'\0'.join(partes), digest_size=8).hexdigest()
+    return _version_compilador
+
+
+# === Cachés en disco de un archivo por entrada ===
+# Sin índice: la fecha de modificación de cada archivo hace de último uso
+# (se actualiza con tocar() en cada acierto) y expulsar_archivos() borra los
+# usados hace más tiempo hasta que el directorio cabe en `max_bytes`.
+
+def tocar(ruta):
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+
+
+# Devuelve cuántos archivos borró
+def expulsar_archivos(directorio, max_bytes, extension=''):
+    archivos = []
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith(extension) and entrada.is_file():
+                    estado = entrada.stat()
+                    archivos.append((estado.st_mtime, estado.st_size, entrada.path))
+    except OSError:
+        return 0
+    sobrante = sum(tamano for _, tamano, _ in archivos) - max_bytes
+    expulsados = 0
+    for _, tamano, ruta in sorted(archivos):
+        if sobrante <= 0:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        sobrante -= tamano
+        expulsados += 1
+    return expulsados
+
+
+# Caché LRU de resultados de etapas, con clave (hash del código fuente, etapa).
+# Como la clave depende del contenido, cambiar el código fuente invalida
+# automáticamente todo lo calculado para la versión anterior; las entradas
+# viejas salen por el extremo LRU cuando se supera `max_entradas`.
+class CacheEtapas:
+    def __init__(self, max_entradas=MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self._ultimo_codigo = None
+        self._ultimo_hash = None
+
+    def _hash(self, codigo_fuente):
+        # Evitar volver a calcular el hash si nos pasan el mismo objeto str
+        if codigo_fuente is not self._ultimo_codigo:
+            self._ultimo_codigo = codigo_fuente
+            self._ultimo_hash = hash_fuente(codigo_fuente)
+        return self._ultimo_hash
+
+    def obtener(self, codigo_fuente, etapa, calcular):
+        clave = (self._hash(codigo_fuente), etapa)
+        if clave in self.entradas:
+            self.aciertos += 1
+            self.entradas.move_to_end(clave)
+            return self.entradas[clave]
+        self.fallos += 1
+        valor = calcular()
+        self.entradas[clave] = valor
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+            self.expulsiones += 1
+        return valor
+
+    def invalidar(self, codigo_fuente=None):
+        if codigo_fuente is None:
+            self.entradas.clear()
+            return
+        h = hash_fuente(codigo_fuente)
+        for clave in [c for c in self.entradas if c[0] == h]:
+            del self.entradas[clave]
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'expulsiones': self.expulsiones,
+            'entradas': len(self.entradas),
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+# La interfaz pidió cancelar: lo lanza la función de progreso al empezar una etapa
+class Cancelado(Exception):
+    pass
+
+
+# Etapas del compilador memorizadas: cada una reutiliza la anterior desde la
+# caché, así que p.ej. el código optimizado no vuelve a pasar por el léxico.
+#
+# Si `progreso` no es None se llama como progreso(etapa, terminada) antes de
+# calcular cada etapa que no estaba en caché y cuando ya está guardada. Las
+# etapas se anidan (el código intermedio pide el árbol, que pide los tokens),
+# así que la etapa en curso es la última que empezó y no ha terminado.
+# Lanzando Cancelado desde ahí se corta el cálculo entre una etapa y la
+# siguiente sin perder lo que ya se calculó.
+#
+# Si hay observadores registrados (compilador.estadisticas) cada etapa
+# calculada se les avisa con su tiempo, contando las etapas que pidió dentro.
+class EtapasCompilador:
+    def __init__(self, cache=None, progreso=None):
+        self.cache = cache if cache is not None else CacheEtapas()
+        self.progreso = progreso
+
+    def _obtener(self, codigo_fuente, etapa, calcular):
+        if observadores:
+            calcular = self._cronometrar(codigo_fuente, etapa, calcular)
+        progreso = self.progreso
+        if progreso is None:
+            return self.cache.obtener(codigo_fuente, etapa, calcular)
+        nombre = etapa if isinstance(etapa, str) else etapa[0]
+        calculada = []
+
+        def calcular_avisando():
+            progreso(nombre, False)
+            calculada.append(True)
+            return calcular()
+
+        valor = self.cache.obtener(codigo_fuente, etapa, calcular_avisando)
+        if calculada:
+            progreso(nombre, True)
+        return valor
+
+    @staticmethod
+    def _cronometrar(codigo_fuente, etapa, calcular):
+        def calcular_midiendo():
+            inicio = time.perf_counter()
+            valor = calcular()
+            notificar('etapa', {'etapa': etapa if isinstance(etapa, str) else etapa[0],
+                                'segundos': time.perf_counter() - inicio,
+                                'caracteres': len(codigo_fuente)})
+            return valor
+        return calcular_midiendo
+
+    def tokens(self, codigo_fuente):
+        return self._obtener(codigo_fuente, 'tokens', lambda: flujo_tokens(codigo_fuente))
+
+    def errores_semanticos(self, codigo_fuente):
+        return self._obtener(codigo_fuente, 'semantico',
+                             lambda: analizador_semantico(self.arbol(codigo_fuente)))
+
+    def intermedio(self, codigo_fuente):
+        return self._obtener(codigo_fuente, 'intermedio',
+                             lambda: generar_codigo_intermedio(self.arbol(codigo_fuente)))
+
+    # (código optimizado, informe de los pases)
+    def optimizacion(self, codigo_fuente):
+        return self._obtener(codigo_fuente, 'optimizado',
+                             lambda: optimizar(self.intermedio(codigo_fuente)))
+
+    def optimizado(self, codigo_fuente):
+        return self.optimizacion(codigo_fuente)[0]
+
+    def arbol(self, codigo_fuente):
+        return self._obtener(codigo_fuente, 'arbol',
+                             lambda: analizador_sintactico(self.tokens(codigo_fuente)))
+
+    def dot(self, codigo_fuente, nombre_programa, profundidad_max=None, max_nodos=None):
+        from compilador.arbol import generar_arbol_dot
+        return self._obtener(codigo_fuente, ('dot', nombre_programa, profundidad_max, max_nodos),
+                             lambda: generar_arbol_dot(self.arbol(codigo_fuente), nombre_programa,
+                                                       profundidad_max, max_nodos))
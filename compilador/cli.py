@@ -0,0 +1,312 @@
+# === Línea de comandos ===
+#
+#   python -m compilador lex|tree|ir|opt|run|fix|pack [--profile] [ARCHIVO ...]
+#   python -m compilador build [DIRECTORIO]
+#   python -m compilador gui
+#
+# Sin archivos (o con '-') se lee toda la entrada estándar de una vez. Un
+# ARCHIVO puede ser también un artefacto (.cart, ver `pack`): lex, ir y opt
+# muestran lo que tiene guardado sin recalcularlo y el resto usa su código
+# fuente. Aquí
+# solo se importa argparse: cada subcomando importa las etapas que usa, así
+# `lex` no carga el sintáctico ni el optimizador y nada carga tkinter ni
+# graphviz salvo `gui` y `tree -o` a PNG/SVG/PDF. La salida va a un búfer
+# grande que se vuelca de golpe en vez de escribir línea a línea.
+
+import argparse
+import os
+import sys
+import time
+
+TAMANO_BUFFER = 1 << 16
+MAGIA_ARTEFACTO = b'CART'  # compilador.artefactos.MAGIA, sin importar el módulo
+FORMATOS_LEX = ('texto', 'tsv', 'jsonl')
+LENGUAJES = ('python', 'c')  # compilador.lexico.PERFILES, sin importar el léxico
+
+
+# Texto de un archivo, o de la entrada estándar si la ruta es '-'
+def leer_fuente(ruta):
+    if ruta == '-':
+        if sys.stdin.isatty():
+            print("Escriba el código y termine con Ctrl-D (Ctrl-Z y Enter en Windows):", file=sys.stderr)
+        return sys.stdin.buffer.read().decode('utf-8', 'replace')
+    with open(ruta, encoding='utf-8', errors='replace') as archivo:
+        return archivo.read()
+
+
+# Salida estándar con búfer propio (aunque sea una terminal); hay que cerrarla
+# para que se escriba lo que quede. No cierra el descriptor real.
+def salida_estandar():
+    sys.stdout.flush()
+    return open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=TAMANO_BUFFER, closefd=False)
+
+
+# Artefacto abierto si `ruta` es uno (si no, None)
+def abrir_si_artefacto(ruta):
+    if ruta == '-':
+        return None
+    try:
+        with open(ruta, 'rb') as archivo:
+            if archivo.read(len(MAGIA_ARTEFACTO)) != MAGIA_ARTEFACTO:
+                return None
+    except OSError:
+        return None
+    from compilador.artefactos import abrir_artefacto
+    try:
+        return abrir_artefacto(ruta)
+    except ValueError:
+        return None  # empieza igual pero no lo es: se trata como código
+
+
+def nombre_entrada(ruta):
+    return '<stdin>' if ruta == '-' else ruta
+
+
+def nombre_programa(ruta):
+    if ruta == '-':
+        return "MiPrograma"
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+
+def escribir_tokens(flujo, salida, formato='texto'):
+    if formato == 'texto':
+        escribir = salida.write
+        for linea, tipo, texto in flujo:
+            escribir(f"Línea {linea}: {tipo} -> {texto}\n")
+        return
+    from compilador.tablas import FilasTokens
+    filas = FilasTokens(flujo)
+    if formato == 'tsv':
+        salida.write('\t'.join(filas.columnas) + '\n')
+        salida.writelines(filas.lineas_tsv())
+    else:
+        salida.writelines(filas.lineas_jsonl())
+
+
+# === Subcomandos ===
+# Cada uno recibe (ruta, código fuente, salida, argumentos) y devuelve el
+# código de salida del proceso para ese archivo (0 si todo fue bien). Si la
+# entrada es un artefacto, está abierto en args.artefacto.
+
+def comando_lex(ruta, fuente, salida, args):
+    flujo = args.artefacto.flujo() if args.artefacto is not None else None
+    if flujo is None:
+        from compilador.flujo_tokens import flujo_tokens
+        from compilador.lexico import motor_perfil
+        flujo = flujo_tokens(fuente, motor_perfil(args.lenguaje))
+    escribir_tokens(flujo, salida, args.formato)
+    return 0
+
+
+def comando_tree(ruta, fuente, salida, args):
+    from compilador.arbol import escribir_dot, generar_arbol_dot, renderizar_dot
+    from compilador.flujo_tokens import flujo_tokens
+    from compilador.sintactico import analizador_sintactico
+    arbol = analizador_sintactico(flujo_tokens(fuente))
+    if args.salida is None:
+        escribir_dot(arbol, nombre_programa(ruta), salida, args.profundidad, args.max_nodos)
+        return 0
+    nombre_archivo, extension = os.path.splitext(args.salida)
+    formato = extension.lstrip('.').lower() or 'dot'
+    dot = generar_arbol_dot(arbol, nombre_programa(ruta), args.profundidad, args.max_nodos)
+    print(f"Árbol sintáctico escrito en {renderizar_dot(dot, nombre_archivo, formato)}", file=sys.stderr)
+    return 0
+
+
+def comando_ir(ruta, fuente, salida, args):
+    from compilador.cache import EtapasCompilador
+    from compilador.intermedio import texto_instruccion
+    codigo = args.artefacto.intermedio() if args.artefacto is not None else None
+    if codigo is None:
+        codigo = EtapasCompilador().intermedio(fuente)
+    salida.writelines(texto_instruccion(codigo, i) + '\n' for i in range(len(codigo)))
+    return 0
+
+
+def comando_opt(ruta, fuente, salida, args):
+    from compilador.cache import EtapasCompilador
+    from compilador.intermedio import texto_instruccion
+    from compilador.optimizador import imprimir_informe
+    codigo = args.artefacto.optimizado() if args.artefacto is not None and not args.informe else None
+    if codigo is None:
+        codigo, informe = EtapasCompilador().optimizacion(fuente)
+    if args.informe:
+        print('\n'.join(imprimir_informe(informe)), file=sys.stderr)
+    salida.writelines(texto_instruccion(codigo, i) + '\n' for i in range(len(codigo)))
+    return 0
+
+
+# El programa se ejecuta en este mismo proceso con la salida estándar normal;
+# lo escrito antes por otros archivos se vuelca primero para no desordenarlo
+def comando_run(ruta, fuente, salida, args):
+    from compilador.traductor import codigo_compilado
+    if args.sin_cache:
+        objeto, _ = codigo_compilado(fuente, nombre_entrada(ruta), directorio_cache=None)
+    else:
+        objeto, _ = codigo_compilado(fuente, nombre_entrada(ruta))
+    salida.flush()
+    try:
+        exec(objeto, {'__name__': '__main__', '__builtins__': __builtins__})
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception as e:
+        import traceback
+        sys.stdout.flush()
+        # Sin el marco de este archivo: el traceback empieza en el programa
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    finally:
+        sys.stdout.flush()
+    return 0
+
+
+def comando_fix(ruta, fuente, salida, args):
+    from compilador.correccion import corregir_codigo
+    codigo_corregido, correcciones = corregir_codigo(fuente)
+    for correccion in correcciones:
+        print(f"{nombre_entrada(ruta)}: {correccion}", file=sys.stderr)
+    salida.write(codigo_corregido)
+    if not codigo_corregido.endswith('\n'):
+        salida.write('\n')
+    return 0
+
+
+# Guarda tokens, tabla de símbolos, código intermedio y optimizado en un
+# artefacto: -o RUTA, o el nombre del programa con .cart en el directorio actual
+def comando_pack(ruta, fuente, salida, args):
+    from compilador.artefactos import EXTENSION, guardar_artefacto
+    from compilador.cache import EtapasCompilador
+    from compilador.semantico import construir_tabla_simbolos
+    etapas = EtapasCompilador()
+    destino = args.salida or nombre_programa(ruta) + EXTENSION
+    tamano = guardar_artefacto(destino, etapas.tokens(fuente), construir_tabla_simbolos(etapas.arbol(fuente)),
+                               etapas.intermedio(fuente), etapas.optimizado(fuente))
+    print(f"{nombre_entrada(ruta)}: artefacto escrito en {destino} ({tamano} bytes)", file=sys.stderr)
+    return 0
+
+
+# Construcción incremental de un directorio con la caché de proyectos
+def comando_build(args):
+    from compilador.proyecto import construir_proyecto, imprimir_construccion
+    opciones = {'trabajadores': args.trabajadores}
+    if args.cache is not None:
+        opciones['directorio_cache'] = args.cache
+    if args.max_mb is not None:
+        opciones['max_bytes'] = args.max_mb << 20
+    if not os.path.isdir(args.directorio):
+        print(f"compilador: {args.directorio}: no es un directorio", file=sys.stderr)
+        return 2
+    resultados, resumen = construir_proyecto(args.directorio, **opciones)
+    salida = salida_estandar()
+    try:
+        salida.writelines(linea + '\n' for linea in imprimir_construccion(resultados, resumen, args.todos))
+    finally:
+        salida.close()
+    return 1 if any(r['error'] for r in resultados) else 0
+
+
+def comando_gui(args):
+    from compilador.gui import ventana_principal
+    ventana_principal()
+    return 0
+
+
+def perfil(ruta, fuente, comando, segundos):
+    from compilador.estadisticas import imprimir_estadisticas, medir_programa
+    lineas = [f"--- {nombre_entrada(ruta)}: {comando} en {segundos * 1000:.1f} ms"]
+    lineas += imprimir_estadisticas(medir_programa(fuente))
+    print('\n'.join(lineas), file=sys.stderr)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='python -m compilador', description="Compilador sin interfaz gráfica")
+    subcomandos = parser.add_subparsers(dest='comando', required=True, metavar='COMANDO')
+
+    def subcomando(nombre, funcion, ayuda):
+        sub = subcomandos.add_parser(nombre, help=ayuda, description=ayuda)
+        sub.add_argument('rutas', nargs='*', default=['-'], metavar='ARCHIVO',
+                         help="archivos a procesar ('-' o ninguno: entrada estándar)")
+        sub.add_argument('--profile', action='store_true',
+                         help="al terminar, mostrar en stderr las estadísticas de cada etapa para cada archivo")
+        sub.set_defaults(funcion=funcion)
+        return sub
+
+    sub = subcomando('lex', comando_lex, "tokens del análisis léxico")
+    sub.add_argument('--formato', choices=FORMATOS_LEX, default='texto')
+    sub.add_argument('--lenguaje', choices=LENGUAJES, default='python', help="perfil de patrones del léxico")
+    sub = subcomando('tree', comando_tree, "árbol sintáctico en DOT")
+    sub.add_argument('-o', '--salida', metavar='RUTA',
+                     help="escribir el árbol en RUTA (.dot, .svg, .png o .pdf) en vez de la salida estándar")
+    sub.add_argument('--profundidad', type=int, default=None, help="resumir los nodos más profundos")
+    sub.add_argument('--max-nodos', type=int, default=None, help="resumir a partir de este número de nodos")
+    subcomando('ir', comando_ir, "código intermedio")
+    sub = subcomando('opt', comando_opt, "código intermedio optimizado")
+    sub.add_argument('--informe', action='store_true', help="mostrar en stderr el informe de los pases")
+    sub = subcomando('run', comando_run, "ejecutar el programa")
+    sub.add_argument('--sin-cache', action='store_true', help="no usar la caché de código compilado en disco")
+    subcomando('fix', comando_fix, "corregir errores simples y mostrar el código corregido")
+    sub = subcomando('pack', comando_pack, "guardar tokens, tabla de símbolos y código intermedio en un artefacto")
+    sub.add_argument('-o', '--salida', metavar='RUTA', help="ruta del artefacto (por defecto PROGRAMA.cart)")
+    build = subcomandos.add_parser('build', help="analizar un directorio reutilizando lo que no cambió",
+                                   description="analizar un directorio reutilizando lo que no cambió")
+    build.add_argument('directorio', nargs='?', default='.', metavar='DIRECTORIO')
+    build.add_argument('-j', '--trabajadores', type=int, default=None, help="procesos (por defecto, uno por CPU)")
+    build.add_argument('--cache', metavar='DIR', help="directorio de la caché (por defecto ~/.cache/compilador/proyectos)")
+    build.add_argument('--max-mb', type=int, default=None, help="tamaño máximo de la caché en MiB (256)")
+    build.add_argument('--todos', action='store_true', help="mostrar también los archivos sin cambios")
+    build.set_defaults(funcion=None)
+    gui = subcomandos.add_parser('gui', help="abrir la interfaz gráfica")
+    gui.set_defaults(funcion=None)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.comando == 'gui':
+        return comando_gui(args)
+    if args.comando == 'build':
+        return comando_build(args)
+    if args.comando in ('tree', 'pack') and args.salida is not None and len(args.rutas) > 1:
+        print("compilador: -o solo admite un archivo", file=sys.stderr)
+        return 2
+
+    codigo = 0
+    salida = salida_estandar()
+    try:
+        for ruta in args.rutas:
+            args.artefacto = abrir_si_artefacto(ruta)
+            try:
+                if args.artefacto is not None:
+                    fuente = args.artefacto.fuente() or ''
+                else:
+                    fuente = leer_fuente(ruta)
+            except OSError as e:
+                print(f"compilador: {ruta}: {e.strerror}", file=sys.stderr)
+                codigo = 1
+                continue
+            if len(args.rutas) > 1 and args.comando != 'run':
+                salida.write(f"==> {ruta} <==\n")
+            inicio = time.perf_counter()
+            try:
+                codigo = args.funcion(ruta, fuente, salida, args) or codigo
+            except Exception as e:
+                salida.flush()
+                print(f"compilador: {ruta}: {e}", file=sys.stderr)
+                codigo = 1
+            if args.profile:
+                salida.flush()
+                perfil(ruta, fuente, args.comando, time.perf_counter() - inicio)
+        salida.flush()
+    except BrokenPipeError:
+        # La salida se cerró antes de tiempo (p. ej. `| head`): no es un error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return codigo
+    finally:
+        try:
+            salida.close()
+        except BrokenPipeError:
+            pass
+    return codigo
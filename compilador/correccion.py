@@ -0,0 +1,193 @@
+# === Corrección de delimitadores ===
+#
+# Repara paréntesis, corchetes y llaves sin cerrar (o cerrados de más) en
+# todo el archivo de una vez. Trabaja sobre el flujo de tokens del léxico,
+# así que lo que hay dentro de cadenas y comentarios no cuenta, y los
+# delimitadores pueden abarcar varias líneas como en Python.
+#
+# Una sola pasada con una pila por los tokens de puntuación produce una
+# lista de ediciones (insertar, borrar o cambiar texto en una posición del
+# fuente); al final se aplican todas juntas construyendo el texto nuevo una
+# sola vez.
+#
+# Dónde se cierra lo que quedó abierto: cuando una línea nueva empieza con
+# la misma sangría (o menos) que la línea de la primera apertura y la línea
+# anterior no termina en algo que pide continuar (una apertura, una coma o
+# un operador), se entiende que empezó otra instrucción y se cierra todo al
+# final de la anterior. Si la instrucción abre un bloque (def, if, ...) y
+# una línea termina en ':', se cierra antes de los dos puntos. Lo que siga
+# abierto al final se cierra tras el último token.
+
+from bisect import bisect_left, bisect_right
+from itertools import compress
+
+from compilador.flujo_tokens import flujo_tokens
+
+CIERRES = {'(': ')', '[': ']', '{': '}'}
+APERTURAS = {cierre: apertura for apertura, cierre in CIERRES.items()}
+DELIMITADORES = frozenset('()[]{}')
+NOMBRES_CIERRE = {')': ("paréntesis", 'o'), ']': ("corchete", 'o'), '}': ("llave", 'a')}
+COMENTARIOS = frozenset({'COMENTARIO_LINEA', 'COMENTARIO_BLOQUE'})
+# Instrucciones que terminan en ':' y abren un bloque
+BLOQUES = frozenset({'def', 'class', 'if', 'elif', 'else', 'while', 'for', 'with', 'try', 'except', 'finally'})
+# Tipos de token tras los que la expresión sigue en la línea siguiente
+CONTINUAN = frozenset({'OPERADOR_LOGICO', 'OPERADOR_COMPARACION', 'OPERADOR_ASIGNACION', 'OPERADOR_ARITMETICO'})
+
+
+# Reemplaza fuente[inicio:fin] por `texto` (inicio == fin: insertar)
+class Edicion:
+    __slots__ = ('inicio', 'fin', 'texto', 'linea', 'descripcion')
+
+    def __init__(self, inicio, fin, texto, linea, descripcion):
+        self.inicio = inicio
+        self.fin = fin
+        self.texto = texto
+        self.linea = linea
+        self.descripcion = descripcion
+
+    def __repr__(self):
+        return f"Edicion({self.inicio}, {self.fin}, {self.texto!r}, línea {self.linea})"
+
+
+def aplicar_ediciones(fuente, ediciones):
+    partes = []
+    posicion = 0
+    # sorted es estable: varias inserciones en el mismo punto quedan en orden
+    for edicion in sorted(ediciones, key=lambda e: e.inicio):
+        partes.append(fuente[posicion:edicion.inicio])
+        partes.append(edicion.texto)
+        posicion = max(posicion, edicion.fin)
+    partes.append(fuente[posicion:])
+    return ''.join(partes)
+
+
+def _anadido(cierre):
+    nombre, genero = NOMBRES_CIERRE[cierre]
+    return f"Añadid{genero} {nombre} de cierre."
+
+
+# Ediciones que equilibran los delimitadores de un TokenStream
+def ediciones_delimitadores(flujo):
+    fuente, tipos = flujo.fuente, flujo.tipos
+    codigos, lineas, inicios, fines = flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines
+    total = len(flujo)
+    ediciones = []
+    pila = []  # (apertura, índice del token, sangría de su línea, ¿su línea abre un bloque?)
+    # Cuántas aperturas de cada tipo hay en la pila: así un cierre sin su
+    # apertura se detecta sin recorrerla
+    abiertas = dict.fromkeys(CIERRES, 0)
+
+    # Solo se recorren los tokens de puntuación que son delimitadores
+    puntuacion = tipos.index('PUNTUACION') if 'PUNTUACION' in tipos else -1
+    tabla = bytes(1 if codigo == puntuacion else 0 for codigo in range(256))
+    delimitadores = [j for j in compress(range(total), codigos.tobytes().translate(tabla))
+                     if fuente[inicios[j]] in DELIMITADORES]
+
+    def columna(j):
+        return inicios[j] - fuente.rfind('\n', 0, inicios[j]) - 1
+
+    def apertura(j):
+        primero = bisect_left(lineas, lineas[j], 0, j + 1)
+        bloque = tipos[codigos[primero]] == 'PALABRA_CLAVE' and fuente[inicios[primero]:fines[primero]] in BLOQUES
+        return (fuente[inicios[j]], j, columna(primero), bloque)
+
+    def anterior(j):
+        # Token anterior a j sin contar comentarios (no se inserta dentro de uno)
+        j -= 1
+        while j >= 0 and tipos[codigos[j]] in COMENTARIOS:
+            j -= 1
+        return j
+
+    def apilar(j):
+        pila.append(apertura(j))
+        abiertas[fuente[inicios[j]]] += 1
+
+    def desapilar():
+        abre = pila.pop()[0]
+        abiertas[abre] -= 1
+        return abre
+
+    def linea_final(j):
+        return lineas[j] + fuente.count('\n', inicios[j], fines[j])
+
+    # Cierra todo lo abierto justo después del token `previo`
+    def cerrar_todo(previo):
+        posicion, linea = fines[previo], linea_final(previo)
+        if fuente[inicios[previo]:fines[previo]] == ':' and pila[0][3]:  # "if f(a:" -> "if f(a):"
+            posicion = inicios[previo]
+        while pila:
+            cierre = CIERRES[desapilar()]
+            ediciones.append(Edicion(posicion, posicion, cierre, linea, _anadido(cierre)))
+
+    # ¿El token k empieza una instrucción nueva con delimitadores abiertos?
+    def empieza_instruccion(k):
+        if fuente.find('\n', fines[k - 1], inicios[k]) == -1:
+            return False
+        previo = anterior(k)
+        texto_previo = fuente[inicios[previo]:fines[previo]]
+        if texto_previo == ':' and pila[0][3]:
+            return True
+        if columna(k) > pila[0][2]:
+            return False
+        return not (texto_previo in CIERRES or texto_previo == ',' or tipos[codigos[previo]] in CONTINUAN)
+
+    # Revisa los comienzos de línea en (revisado, hasta] mientras haya algo abierto
+    def revisar_lineas(revisado, hasta):
+        k = bisect_right(lineas, lineas[revisado], revisado, hasta + 1)
+        while k <= hasta and pila:
+            if empieza_instruccion(k):
+                cerrar_todo(anterior(k))
+                return
+            k = bisect_right(lineas, lineas[k], k, hasta + 1)
+
+    revisado = 0
+    for j in delimitadores:
+        caracter = fuente[inicios[j]]
+        if pila:
+            # Un cierre al principio de la línea no empieza instrucción
+            hasta = j if caracter in CIERRES else j - 1
+            if hasta > revisado:
+                revisar_lineas(revisado, hasta)
+        if caracter in CIERRES:
+            apilar(j)
+            revisado = j
+            continue
+        revisado = j
+        abre = APERTURAS[caracter]
+        if pila and pila[-1][0] == abre:
+            desapilar()
+            continue
+        nombre, genero = NOMBRES_CIERRE[caracter]
+        if not pila:
+            ediciones.append(Edicion(inicios[j], fines[j], '', lineas[j],
+                                     f"Eliminad{genero} {nombre} de cierre sin apertura."))
+            continue
+        if not abiertas[abre]:
+            # No cierra nada abierto: se cambia por el que toca
+            cierre = CIERRES[desapilar()]
+            ediciones.append(Edicion(inicios[j], fines[j], cierre, lineas[j],
+                                     f"Cambiado '{caracter}' por '{cierre}'."))
+            continue
+        # Cierra una apertura más externa: primero se cierran las de dentro.
+        # Lo que se recorre sale de la pila, así que en total es lineal.
+        previo = anterior(j)
+        while pila[-1][0] != abre:
+            cierre = CIERRES[desapilar()]
+            ediciones.append(Edicion(fines[previo], fines[previo], cierre, linea_final(previo), _anadido(cierre)))
+        desapilar()
+
+    if pila:
+        if total - 1 > revisado:
+            revisar_lineas(revisado, total - 1)
+        if pila:
+            cerrar_todo(anterior(total))
+    return ediciones
+
+
+# Devuelve (código corregido, lista de correcciones hechas)
+def corregir_codigo(codigo_fuente, flujo=None):
+    if flujo is None:
+        flujo = flujo_tokens(codigo_fuente)
+    ediciones = ediciones_delimitadores(flujo)
+    correcciones = [f"Línea {edicion.linea}: {edicion.descripcion}" for edicion in ediciones]
+    return aplicar_ediciones(codigo_fuente, ediciones), correcciones
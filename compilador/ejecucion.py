@@ -0,0 +1,213 @@
+# === Ejecución de programas en procesos aparte ===
+#
+# Los programas del usuario no se ejecutan en el proceso de la interfaz: un
+# bucle infinito la congelaría y un programa que gasta mucha memoria la
+# tiraría. Cada programa corre en un proceso compilador.trabajador con tiempo
+# máximo, límite de memoria y la posibilidad de cancelarlo (se mata el
+# proceso). La salida llega poco a poco a la cola `eventos` de la Ejecucion.
+#
+# ProcessPoolExecutor no sirve aquí porque no deja matar una tarea concreta.
+# PoolEjecucion tiene procesos ya arrancados esperando trabajo: ejecutar un
+# programa solo saca uno de la lista y arranca otro para reponerlo. Cada
+# proceso ejecuta un solo programa, así nada de uno afecta al siguiente.
+
+import atexit
+import marshal
+import os
+import queue
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from compilador.trabajador import CABECERA
+
+TAMANO_POOL = 2
+TIEMPO_MAXIMO = 10.0  # segundos
+LIMITE_MEMORIA = 512 * 1024 * 1024  # bytes de memoria virtual del proceso
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MENSAJES = {
+    'tiempo': "El programa superó el tiempo máximo de {tiempo_maximo:g} s",
+    'cancelado': "Ejecución detenida",
+}
+
+
+class Resultado:
+    __slots__ = ('estado', 'mensaje', 'salida', 'duracion')
+
+    # estado: 'ok', 'error', 'memoria', 'tiempo' o 'cancelado'
+    def __init__(self, estado, mensaje, salida, duracion):
+        self.estado = estado
+        self.mensaje = mensaje
+        self.salida = salida
+        self.duracion = duracion
+
+    def __repr__(self):
+        return f"Resultado({self.estado!r}, {self.mensaje!r}, {self.duracion:.3f}s)"
+
+
+def _matar(proceso):
+    if proceso.poll() is not None:
+        return
+    try:
+        if os.name == 'posix':
+            os.killpg(proceso.pid, signal.SIGKILL)  # también lo que haya lanzado el programa
+        else:
+            proceso.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# Un programa ejecutándose. Los eventos son ('salida', texto), ('error',
+# texto) y al final ('fin', Resultado); los pone un hilo que lee del proceso.
+class Ejecucion:
+    def __init__(self, proceso, objeto, tiempo_maximo, limite_memoria):
+        self.proceso = proceso
+        self.tiempo_maximo = tiempo_maximo
+        self.eventos = queue.Queue()
+        self.resultado = None
+        self._motivo = None
+        self._terminada = threading.Event()
+        self._inicio = time.perf_counter()
+        datos = marshal.dumps((objeto, limite_memoria))
+        try:
+            proceso.stdin.write(struct.pack('<I', len(datos)) + datos)
+            proceso.stdin.close()
+        except OSError:
+            pass  # el proceso ya no existe: lo dirá el hilo lector
+        self._temporizador = None
+        if tiempo_maximo:
+            self._temporizador = threading.Timer(tiempo_maximo, self.cancelar, ('tiempo',))
+            self._temporizador.daemon = True
+            self._temporizador.start()
+        threading.Thread(target=self._leer, daemon=True).start()
+
+    def cancelar(self, motivo='cancelado'):
+        if self._motivo is None and not self._terminada.is_set():
+            self._motivo = motivo
+            _matar(self.proceso)
+
+    @property
+    def terminada(self):
+        return self._terminada.is_set()
+
+    def esperar(self, tiempo=None):
+        self._terminada.wait(tiempo)
+        return self.resultado
+
+    # Eventos llegados desde la última vez, sin bloquear (para sondear con after())
+    def pendientes(self, maximo=1000):
+        eventos = []
+        try:
+            while len(eventos) < maximo:
+                eventos.append(self.eventos.get_nowait())
+        except queue.Empty:
+            pass
+        return eventos
+
+    def _leer(self):
+        archivo = self.proceso.stdout
+        partes = []
+        final = None
+        while True:
+            cabecera = archivo.read(CABECERA.size)
+            if len(cabecera) < CABECERA.size:
+                break
+            tipo, longitud = CABECERA.unpack(cabecera)
+            datos = archivo.read(longitud)
+            if tipo == b'f':
+                final = marshal.loads(datos)
+                break
+            texto = datos.decode('utf-8', 'replace')
+            partes.append(texto)
+            self.eventos.put(('salida' if tipo == b'o' else 'error', texto))
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+        if final is None:
+            self.proceso.wait()
+        else:
+            _matar(self.proceso)  # hilos del programa que sigan vivos
+            self.proceso.wait()
+        archivo.close()
+        if final is not None:  # terminó aunque justo se pidiera cancelarlo
+            estado, mensaje = final
+        elif self._motivo is not None:
+            estado, mensaje = self._motivo, MENSAJES[self._motivo].format(tiempo_maximo=self.tiempo_maximo)
+        else:
+            estado, mensaje = 'error', f"El proceso terminó de forma inesperada (código {self.proceso.returncode})"
+        self.resultado = Resultado(estado, mensaje, ''.join(partes), time.perf_counter() - self._inicio)
+        self.eventos.put(('fin', self.resultado))
+        self._terminada.set()
+
+
+class PoolEjecucion:
+    def __init__(self, tamano=TAMANO_POOL, tiempo_maximo=TIEMPO_MAXIMO, limite_memoria=LIMITE_MEMORIA):
+        self.tamano = tamano
+        self.tiempo_maximo = tiempo_maximo
+        self.limite_memoria = limite_memoria
+        self.cerrado = False
+        self._libres = deque()
+        self._cerrojo = threading.Lock()
+        for _ in range(tamano):
+            self._libres.append(self._arrancar())
+
+    @staticmethod
+    def _arrancar():
+        entorno = dict(os.environ)
+        entorno['PYTHONPATH'] = os.pathsep.join(filter(None, [RAIZ, entorno.get('PYTHONPATH')]))
+        return subprocess.Popen([sys.executable, '-m', 'compilador.trabajador'],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=entorno,
+                                start_new_session=(os.name == 'posix'))
+
+    # Ejecuta un objeto de código (o código fuente) en un proceso del pool
+    def ejecutar(self, objeto, tiempo_maximo=None, limite_memoria=None):
+        if isinstance(objeto, str):
+            objeto = compile(objeto, '<programa>', 'exec')
+        with self._cerrojo:
+            if self.cerrado:
+                raise RuntimeError("El pool de ejecución está cerrado")
+            proceso = None
+            while self._libres and proceso is None:
+                candidato = self._libres.popleft()
+                if candidato.poll() is None:
+                    proceso = candidato
+            if proceso is None:
+                proceso = self._arrancar()
+            while len(self._libres) < self.tamano:
+                self._libres.append(self._arrancar())
+        return Ejecucion(proceso,
+                         objeto,
+                         self.tiempo_maximo if tiempo_maximo is None else tiempo_maximo,
+                         self.limite_memoria if limite_memoria is None else limite_memoria)
+
+    def cerrar(self):
+        with self._cerrojo:
+            self.cerrado = True
+            libres, self._libres = list(self._libres), deque()
+        for proceso in libres:
+            try:
+                proceso.stdin.close()  # sin trabajo el proceso termina solo
+            except OSError:
+                pass
+            try:
+                proceso.wait(1)
+            except subprocess.TimeoutExpired:
+                _matar(proceso)
+                proceso.wait()
+            proceso.stdout.close()
+
+
+_pool = None
+
+
+# Pool compartido, creado la primera vez que se usa y cerrado al salir
+def pool_ejecucion():
+    global _pool
+    if _pool is None:
+        _pool = PoolEjecucion()
+        atexit.register(_pool.cerrar)
+    return _pool
@@ -0,0 +1,236 @@
+# === Estadísticas del compilador ===
+#
+# medir_programa() pasa un programa por todas las etapas sin caché y junta:
+# tiempo de cada etapa (propio y contando las que pide dentro), pico de
+# memoria (tracemalloc), tokens por tipo, aciertos de cada patrón del léxico
+# (e intentos, con el motor de expresión regular) y la tasa de aciertos de la
+# caché de etapas de la sesión.
+#
+# Para mandar métricas a otro sitio se registran observadores con
+# observar(funcion); se llaman como funcion(evento, datos) con:
+#   'etapa'        cada vez que EtapasCompilador calcula una etapa (no en
+#                  los aciertos de caché): {'etapa', 'segundos', 'caracteres'}
+#   'estadisticas' al terminar medir_programa(), con su resultado
+# Un observador que lanza una excepción no corta el cálculo: se ignora.
+
+import time
+import tracemalloc
+from itertools import compress
+from operator import gt
+
+from compilador.flujo_tokens import flujo_tokens
+from compilador.lexico import MOTOR_PYTHON
+
+observadores = []
+
+
+# Se puede usar como decorador
+def observar(funcion):
+    if funcion not in observadores:
+        observadores.append(funcion)
+    return funcion
+
+
+def dejar_de_observar(funcion):
+    if funcion in observadores:
+        observadores.remove(funcion)
+
+
+def notificar(evento, datos):
+    for funcion in list(observadores):
+        try:
+            funcion(evento, datos)
+        except Exception:
+            pass
+
+
+# Función de progreso para EtapasCompilador que mide cada etapa. Las etapas
+# se anidan (el código intermedio pide el árbol, que pide los tokens): el
+# tiempo propio de una etapa es su total menos el de las que pidió dentro.
+# Con memoria=True (y tracemalloc activo) guarda además el pico de memoria
+# de cada etapa por encima de la que había al empezarla. `progreso` es otra
+# función de progreso a la que se le pasa cada llamada (p. ej. la de la
+# interfaz, que puede cancelar).
+class Cronometro:
+    def __init__(self, progreso=None, memoria=False):
+        self.progreso = progreso
+        self.memoria = memoria
+        self.etapas = {}  # nombre -> {'segundos', 'segundos_propios', 'pico_memoria'}
+        self._pila = []  # [nombre, inicio, segundos de las anidadas, memoria al empezar, pico]
+
+    def __call__(self, etapa, terminada):
+        if self.progreso is not None:
+            self.progreso(etapa, terminada)
+        if not terminada:
+            marco = [etapa, 0.0, 0.0, 0, 0]
+            if self.memoria:
+                actual, pico = tracemalloc.get_traced_memory()
+                if self._pila:
+                    self._pila[-1][4] = max(self._pila[-1][4], pico)
+                tracemalloc.reset_peak()
+                marco[3] = marco[4] = actual
+            self._pila.append(marco)
+            marco[1] = time.perf_counter()
+            return
+        ahora = time.perf_counter()
+        nombre, inicio, anidadas, memoria_inicio, pico = self._pila.pop()
+        segundos = ahora - inicio
+        medida = {'segundos': segundos, 'segundos_propios': segundos - anidadas, 'pico_memoria': None}
+        if self.memoria:
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+            medida['pico_memoria'] = pico - memoria_inicio
+            tracemalloc.reset_peak()
+        if self._pila:
+            self._pila[-1][2] += segundos
+            if self.memoria:
+                self._pila[-1][4] = max(self._pila[-1][4], pico)
+        self.etapas[nombre] = medida
+
+
+# Aciertos de cada patrón del motor léxico sobre `codigo_fuente` y
+# caracteres que no reconoce ninguno. Se cuentan sobre los tokens que da
+# el motor (los de `flujo` si ya se tienen), que pasan por escanear_columnas
+# y su guarda de aperturas sin cierre: no es cuadrático con "/*" * n.
+#
+# Los intentos dependen del motor. La expresión regular prueba los patrones
+# en orden hasta el que coincide: un patrón se intenta cada vez que ninguno
+# de los anteriores coincidió, y los que tienen muchos intentos y pocos
+# aciertos al principio de la lista son trabajo perdido. El autómata los
+# prueba todos a la vez y se queda con la coincidencia más larga: no hay
+# intentos por patrón y quedan en None.
+def estadisticas_patrones(codigo_fuente, motor=MOTOR_PYTHON, flujo=None):
+    if flujo is None:
+        flujo = flujo_tokens(codigo_fuente, motor)
+    aciertos = dict.fromkeys((tipo for tipo, _ in motor.tokens), 0)
+    for tipo, cantidad in contar_tipos(flujo).items():
+        if tipo == 'PALABRA_CLAVE':
+            tipo = 'IDENTIFICADOR'  # las reconoce el patrón de los identificadores
+        if tipo in aciertos:
+            aciertos[tipo] += cantidad
+    # Los espacios no dejan token: cada hueco entre dos tokens es uno
+    inicios, fines = flujo.inicios, flujo.fines
+    if 'ESPACIO' in aciertos:
+        if len(flujo):
+            aciertos['ESPACIO'] = (sum(map(gt, inicios[1:], fines[:-1])) + (inicios[0] > 0)
+                                   + (fines[-1] < len(codigo_fuente)))
+        else:
+            aciertos['ESPACIO'] = int(bool(codigo_fuente))
+    codigo_error = flujo.tipos.index('ERROR_LEXICO')
+    posiciones_error = list(compress(range(len(flujo)), (codigo == codigo_error for codigo in flujo.codigos)))
+    errores = sum(fines[i] - inicios[i] for i in posiciones_error)
+
+    patrones = []
+    automata = hasattr(motor.patron, 'escanear_columnas')
+    intentos = None if automata else len(posiciones_error) + sum(aciertos.values())
+    for tipo, _ in motor.tokens:
+        patrones.append({'tipo': tipo, 'intentos': intentos, 'aciertos': aciertos[tipo]})
+        if intentos is not None:
+            intentos -= aciertos[tipo]
+    return patrones, errores
+
+
+def contar_tipos(flujo):
+    datos = flujo.codigos.tobytes()
+    cuentas = {tipo: datos.count(bytes((codigo,))) for codigo, tipo in enumerate(flujo.tipos)}
+    return {tipo: n for tipo, n in sorted(cuentas.items(), key=lambda par: -par[1]) if n}
+
+
+def _pasar_etapas(etapas, codigo_fuente):
+    etapas.optimizacion(codigo_fuente)
+    etapas.errores_semanticos(codigo_fuente)
+    etapas.dot(codigo_fuente, "MiPrograma")
+    return etapas.tokens(codigo_fuente)
+
+
+# Mide un programa. `cache` es la CacheEtapas de la sesión (para su tasa de
+# aciertos); las etapas se calculan aparte, sin caché, para medirlas todas.
+# Con memoria=True se hace una segunda pasada con tracemalloc, que frena
+# bastante y estropearía los tiempos de la primera.
+def medir_programa(codigo_fuente, cache=None, memoria=True, progreso=None):
+    from compilador.cache import EtapasCompilador
+
+    cronometro = Cronometro(progreso)
+    inicio = time.perf_counter()
+    flujo = _pasar_etapas(EtapasCompilador(progreso=cronometro), codigo_fuente)
+    total = time.perf_counter() - inicio
+    etapas = cronometro.etapas
+
+    pico_total = None
+    if memoria:
+        ya_activo = tracemalloc.is_tracing()
+        if not ya_activo:
+            tracemalloc.start()
+        try:
+            cronometro = Cronometro(progreso, memoria=True)
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _pasar_etapas(EtapasCompilador(progreso=cronometro), codigo_fuente)
+            pico_total = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            if not ya_activo:
+                tracemalloc.stop()
+        for nombre, medida in cronometro.etapas.items():
+            if nombre in etapas:
+                etapas[nombre]['pico_memoria'] = medida['pico_memoria']
+
+    patrones, errores_lexicos = estadisticas_patrones(codigo_fuente, flujo=flujo)
+    resultado = {
+        'caracteres': len(codigo_fuente),
+        'lineas': codigo_fuente.count('\n') + (not codigo_fuente.endswith('\n')),
+        'tokens': len(flujo),
+        'segundos': total,
+        'pico_memoria': pico_total,
+        'etapas': etapas,
+        'tokens_por_tipo': contar_tipos(flujo),
+        'patrones': patrones,
+        'errores_lexicos': errores_lexicos,
+        'cache': cache.estadisticas() if cache is not None else None,
+    }
+    notificar('estadisticas', resultado)
+    return resultado
+
+
+def _bytes(cantidad):
+    if cantidad is None:
+        return '-'
+    for unidad in ('B', 'KiB', 'MiB'):
+        if abs(cantidad) < 1024:
+            return f"{cantidad:.0f} {unidad}"
+        cantidad /= 1024
+    return f"{cantidad:.1f} GiB"
+
+
+def imprimir_estadisticas(resultado):
+    lineas = [f"Programa: {resultado['caracteres']} caracteres, {resultado['lineas']} líneas, "
+              f"{resultado['tokens']} tokens",
+              f"Todas las etapas: {resultado['segundos'] * 1000:.1f} ms, "
+              f"memoria máxima {_bytes(resultado['pico_memoria'])}",
+              "",
+              f"{'Etapa':<14}{'propio':>11}{'total':>11}{'memoria':>12}"]
+    for nombre, medida in resultado['etapas'].items():
+        lineas.append(f"{nombre:<14}{medida['segundos_propios'] * 1000:>8.1f} ms{medida['segundos'] * 1000:>8.1f} ms"
+                      f"{_bytes(medida['pico_memoria']):>12}")
+
+    lineas += ["", "Tokens por tipo:"]
+    for tipo, cantidad in resultado['tokens_por_tipo'].items():
+        porcentaje = 100 * cantidad / resultado['tokens']
+        lineas.append(f"  {tipo:<22}{cantidad:>10} ({porcentaje:4.1f}%)")
+
+    automata = any(patron['intentos'] is None for patron in resultado['patrones'])
+    lineas += ["", f"Patrones del léxico, en orden ({resultado['errores_lexicos']} caracteres sin reconocer):"]
+    if automata:
+        lineas.append("  (autómata: prueba todos los patrones a la vez, no hay intentos por patrón)")
+    lineas.append(f"  {'patrón':<22}{'intentos':>10}{'aciertos':>10}{'fallos':>10}")
+    for patron in resultado['patrones']:
+        if patron['intentos'] is None:
+            intentos = fallos = '-'
+        else:
+            intentos, fallos = patron['intentos'], patron['intentos'] - patron['aciertos']
+        lineas.append(f"  {patron['tipo']:<22}{intentos:>10}{patron['aciertos']:>10}{fallos:>10}")
+
+    cache = resultado['cache']
+    if cache is not None:
+        lineas += ["", f"Caché de etapas: {cache['aciertos']} aciertos, {cache['fallos']} fallos "
+                       f"({cache['tasa_aciertos']:.0%}), {cache['entradas']} entradas, "
+                       f"{cache['expulsiones']} expulsiones"]
+    return lineas
@@ -0,0 +1,173 @@
+import sys
+import time
+from array import array
+from collections.abc import Sequence
+
+from compilador.lexico import MOTOR_PYTHON, AperturasSinCierre, LimiteLexico
+
+# Tipos cuyo texto se interna al materializarlo: los nombres se repiten mucho
+TIPOS_INTERNADOS = frozenset(['IDENTIFICADOR', 'PALABRA_CLAVE'])
+# Con límite de tiempo se escanea en bloques de este tamaño y se mira el
+# reloj entre uno y otro
+TAM_BLOQUE_LIMITE = 1 << 16
+
+
+# Flujo de tokens en columnas: en lugar de una lista de tuplas
+# (linea, tipo, texto), guarda cuatro arrays compactos (código de tipo uint8,
+# línea, inicio y fin uint32) y una sola referencia al código fuente. El texto
+# de cada token se corta del código fuente cuando se pide.
+#
+# Es una secuencia: t[i] devuelve la tupla (linea, tipo, texto) de siempre, así
+# que analizador_semantico, generar_codigo_intermedio, etc. funcionan sin cambios.
+class TokenStream(Sequence):
+    __slots__ = ('fuente', 'tipos', 'codigos', 'lineas', 'inicios', 'fines')
+
+    def __init__(self, fuente, tipos):
+        self.fuente = fuente
+        self.tipos = list(tipos)  # código -> nombre del tipo
+        self.codigos = array('B')
+        self.lineas = array('I')
+        self.inicios = array('I')
+        self.fines = array('I')
+
+    # Con max_caracteres o max_segundos lanza LimiteLexico si el código
+    # fuente es más largo o el análisis tarda más (así un archivo no frena
+    # un lote entero)
+    @classmethod
+    def desde_fuente(cls, fuente, motor=MOTOR_PYTHON, max_caracteres=None, max_segundos=None):
+        if max_caracteres is not None and len(fuente) > max_caracteres:
+            raise LimiteLexico(f"El código fuente tiene {len(fuente)} caracteres (máximo {max_caracteres})")
+        tipos = tipos_de(motor)
+        flujo = cls(fuente, tipos)
+        if max_segundos is None:
+            codigos, lineas, inicios, fines, _, _ = escanear_columnas(fuente, motor, tipos, 0, len(fuente), 1)
+            flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines = codigos, lineas, inicios, fines
+            return flujo
+
+        limite_tiempo = time.perf_counter() + max_segundos
+        sin_cierre = AperturasSinCierre(fuente, motor.pares_multilinea)
+        posicion, num_linea = 0, 1
+        while posicion < len(fuente):
+            if time.perf_counter() > limite_tiempo:
+                raise LimiteLexico(f"El análisis léxico pasó de {max_segundos} s (en el carácter {posicion})")
+            codigos, lineas, inicios, fines, posicion, num_linea = escanear_columnas(
+                fuente, motor, tipos, posicion, min(posicion + TAM_BLOQUE_LIMITE, len(fuente)), num_linea,
+                sin_cierre)
+            flujo.codigos.extend(codigos)
+            flujo.lineas.extend(lineas)
+            flujo.inicios.extend(inicios)
+            flujo.fines.extend(fines)
+        return flujo
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        tipo = self.tipos[self.codigos[indice]]
+        texto = self.fuente[self.inicios[indice]:self.fines[indice]]
+        if tipo in TIPOS_INTERNADOS:
+            texto = sys.intern(texto)
+        return (self.lineas[indice], tipo, texto)
+
+    def __iter__(self):
+        tipos = self.tipos
+        fuente = self.fuente
+        for codigo, linea, inicio, fin in zip(self.codigos, self.lineas, self.inicios, self.fines):
+            tipo = tipos[codigo]
+            texto = fuente[inicio:fin]
+            if tipo in TIPOS_INTERNADOS:
+                texto = sys.intern(texto)
+            yield (linea, tipo, texto)
+
+    def tipo(self, indice):
+        return self.tipos[self.codigos[indice]]
+
+    def texto(self, indice):
+        return self.fuente[self.inicios[indice]:self.fines[indice]]
+
+    # Columna (desde 0) donde empieza el token dentro de su línea
+    def columna(self, indice):
+        inicio = self.inicios[indice]
+        return inicio - self.fuente.rfind('\n', 0, inicio) - 1
+
+    # Bytes ocupados por las columnas (sin contar el código fuente compartido)
+    def memoria(self):
+        return sum(columna.itemsize * len(columna)
+                   for columna in (self.codigos, self.lineas, self.inicios, self.fines))
+
+
+# Tabla código -> nombre de tipo para un motor (ESPACIO no genera tokens)
+def tipos_de(motor):
+    tipos = [tipo for tipo, _ in motor.tokens if tipo != 'ESPACIO']
+    tipos += [tipo for tipo in ('PALABRA_CLAVE', 'ERROR_LEXICO') if tipo not in tipos]
+    if len(tipos) > 256:
+        raise ValueError("Demasiados tipos de token para códigos de un byte")
+    return tipos
+
+
+# Escanea los tokens de `fuente` que empiezan en [posicion, limite) y los
+# devuelve en columnas, junto con la posición y la línea donde terminó el
+# último token (puede pasar de `limite` si el token sigue más allá). Para
+# escanear el mismo texto en varias llamadas se puede pasar el mismo
+# `sin_cierre` (lexico.AperturasSinCierre) en todas.
+def escanear_columnas(fuente, motor, tipos, posicion, limite, num_linea, sin_cierre=None):
+    codigo_de = {tipo: codigo for codigo, tipo in enumerate(tipos)}
+    codigo_clave = codigo_de['PALABRA_CLAVE']
+    codigo_error = codigo_de['ERROR_LEXICO']
+    codigos, lineas, inicios, fines = array('B'), array('I'), array('I'), array('I')
+    if sin_cierre is None:
+        sin_cierre = AperturasSinCierre(fuente, motor.pares_multilinea)
+
+    # El motor con autómata tiene su propio recorrido
+    escanear = getattr(motor.patron, 'escanear_columnas', None)
+    if escanear is not None:
+        posicion, num_linea = escanear(fuente, codigo_de, motor.palabras_clave, (codigos, lineas, inicios, fines),
+                                       posicion, limite, num_linea, sin_cierre)
+        return codigos, lineas, inicios, fines, posicion, num_linea
+
+    agregar_codigo = codigos.append
+    agregar_linea = lineas.append
+    agregar_inicio = inicios.append
+    agregar_fin = fines.append
+    buscar = motor.patron.match
+    contar = fuente.count
+    palabras_clave = motor.palabras_clave
+    proxima = sin_cierre.siguiente(posicion)
+
+    while posicion < limite:
+        if posicion >= proxima:
+            if posicion == proxima:
+                fin = posicion + len(sin_cierre.apertura)
+                agregar_codigo(codigo_error)
+                agregar_linea(num_linea)
+                agregar_inicio(posicion)
+                agregar_fin(fin)
+                posicion = fin
+            proxima = sin_cierre.siguiente(posicion)
+            continue
+        coincidencia = buscar(fuente, posicion)
+        if coincidencia is None or coincidencia.end() == posicion:
+            codigo, fin = codigo_error, posicion + 1
+        else:
+            fin = coincidencia.end()
+            token_tipo = coincidencia.lastgroup
+            if token_tipo == 'ESPACIO':
+                num_linea += contar('\n', posicion, fin)
+                posicion = fin
+                continue
+            codigo = codigo_de[token_tipo]
+            if token_tipo == 'IDENTIFICADOR' and coincidencia.group() in palabras_clave:
+                codigo = codigo_clave
+        agregar_codigo(codigo)
+        agregar_linea(num_linea)
+        agregar_inicio(posicion)
+        agregar_fin(fin)
+        num_linea += contar('\n', posicion, fin)
+        posicion = fin
+    return codigos, lineas, inicios, fines, posicion, num_linea
+
+
+def flujo_tokens(codigo_fuente, motor=MOTOR_PYTHON, max_caracteres=None, max_segundos=None):
+    return TokenStream.desde_fuente(codigo_fuente, motor, max_caracteres, max_segundos)
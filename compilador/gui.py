@@ -0,0 +1,437 @@
+# === Interfaz gráfica (tkinter) ===
+# Se abre con `python -m compilador gui` o con el script de la raíz del
+# proyecto. Importar este módulo no abre ninguna ventana.
+
+import os
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+
+from compilador.arbol import FORMATOS, renderizar_dot
+from compilador.artefactos import EXTENSION, abrir_artefacto, guardar_artefacto
+from compilador.cache import Cancelado, EtapasCompilador
+from compilador.correccion import corregir_codigo
+from compilador.ejecucion import pool_ejecucion
+from compilador.estadisticas import imprimir_estadisticas, medir_programa
+from compilador.optimizador import imprimir_informe
+from compilador.resaltado import ResaltadorSintaxis
+from compilador.semantico import construir_tabla_simbolos
+from compilador.tabla_virtual import TablaVirtual
+from compilador.tablas import EXPORTADORES, FilasCodigo, FilasTokens
+from compilador.traductor import codigo_compilado
+
+# Código escrito en la ventana de entrada; lo usan todas las vistas
+codigo_fuente = ""
+
+# === Funciones del compilador ===
+
+def ejecutar_codigo():
+    fuente = codigo_fuente
+
+    # El código intermedio optimizado traducido a Python. El objeto de
+    # código se guarda en disco por contenido: volver a ejecutar el mismo
+    # programa no pasa por ninguna etapa del compilador
+    def compilar():
+        return codigo_compilado(fuente, etapas=etapas)
+
+    # Se ejecuta en un proceso aparte ya arrancado: la interfaz no se congela
+    # y la salida va apareciendo en la ventana mientras el programa corre
+    def ejecutar(compilado):
+        objeto, desde_cache = compilado
+        titulo = "Resultado del Código (desde la caché)" if desde_cache else "Resultado del Código"
+        mostrar_ejecucion(pool_ejecucion().ejecutar(objeto), titulo)
+
+    en_segundo_plano("Error en el Código", compilar, ejecutar)
+
+def mostrar_ejecucion(ejecucion, titulo):
+    ventana = tk.Toplevel()
+    ventana.title(titulo)
+    ventana.geometry("700x450")
+    salida = scrolledtext.ScrolledText(ventana, wrap=tk.WORD, font=("Consolas", 11), state='disabled')
+    salida.tag_configure('error', foreground='red')
+    salida.pack(fill='both', expand=True, padx=10, pady=(10, 0))
+    barra = tk.Frame(ventana)
+    barra.pack(fill='x', padx=10, pady=5)
+    estado = tk.Label(barra, text="Ejecutando...", anchor='w', font=("Arial", 10))
+    estado.pack(side='left', fill='x', expand=True)
+    boton_detener = tk.Button(barra, text="Detener", command=ejecucion.cancelar, width=10, bg="#f44336", fg="white")
+    boton_detener.pack(side='right')
+
+    def cerrar():
+        ejecucion.cancelar()
+        ventana.destroy()
+
+    def escribir(texto, etiqueta=()):
+        salida.configure(state='normal')
+        salida.insert(tk.END, texto, etiqueta)
+        salida.configure(state='disabled')
+        salida.see(tk.END)
+
+    def sondear():
+        if not ventana.winfo_exists():
+            return
+        for tipo, dato in ejecucion.pendientes():
+            if tipo != 'fin':
+                escribir(dato, 'error' if tipo == 'error' else ())
+                continue
+            if dato.estado == 'ok':
+                if not dato.salida:
+                    escribir("Código ejecutado sin salida.\n")
+                estado.config(text=f"Terminado en {dato.duracion:.2f} s")
+            else:
+                estado.config(text=dato.mensaje, fg='red')
+            boton_detener.config(state='disabled')
+            return
+        ventana.after(50, sondear)
+
+    ventana.protocol("WM_DELETE_WINDOW", cerrar)
+    sondear()
+
+# === Funciones de interfaz gráfica ===
+
+# Resultados de cada etapa memorizados por contenido del código fuente
+etapas = EtapasCompilador()
+
+# === Etapas en segundo plano ===
+# Las etapas se calculan en un solo hilo aparte (la caché de etapas no está
+# hecha para usarse desde varios hilos a la vez) y la interfaz pregunta con
+# after() si ya terminaron, así la ventana sigue respondiendo con archivos
+# grandes. Cancelar cierra la ventana de progreso y corta el cálculo al
+# empezar la siguiente etapa; lo ya calculado queda en la caché.
+hilo_etapas = ThreadPoolExecutor(max_workers=1, thread_name_prefix='etapas')
+
+NOMBRES_ETAPA = {
+    'tokens': "Análisis léxico", 'arbol': "Análisis sintáctico", 'semantico': "Análisis semántico",
+    'intermedio': "Código intermedio", 'optimizado': "Optimización", 'dot': "Generando el árbol",
+}
+ESPERA_VENTANA = 0.2  # segundos antes de mostrar la ventana de progreso
+INTERVALO_SONDEO = 100  # ms
+
+# Calcula `calcular()` en el hilo de etapas y después llama a `mostrar` con
+# el resultado en el hilo de la interfaz. Si falla se muestra el error con
+# el título `titulo_error`.
+def en_segundo_plano(titulo_error, calcular, mostrar):
+    cancelado = threading.Event()
+    en_curso = []  # etapas empezadas y sin terminar; la última es la actual
+
+    def progreso(etapa, terminada):
+        if terminada:
+            en_curso.pop()
+        if cancelado.is_set():
+            raise Cancelado()
+        if not terminada:
+            en_curso.append(etapa)
+
+    def trabajo():
+        if cancelado.is_set():
+            raise Cancelado()
+        etapas.progreso = progreso
+        try:
+            return calcular()
+        finally:
+            etapas.progreso = None
+
+    futuro = hilo_etapas.submit(trabajo)
+    inicio = time.perf_counter()
+
+    # Ventana de progreso, oculta hasta que el cálculo tarde algo
+    ventana = tk.Toplevel()
+    ventana.withdraw()
+    ventana.title("Procesando")
+    ventana.geometry("360x130")
+    ventana.resizable(False, False)
+    etiqueta = tk.Label(ventana, text="Procesando...", anchor='w', font=("Arial", 11))
+    etiqueta.pack(fill='x', padx=15, pady=(15, 5))
+    barra = ttk.Progressbar(ventana, mode='indeterminate', length=330)
+    barra.pack(padx=15)
+    barra.start(15)
+
+    def cancelar():
+        cancelado.set()
+        futuro.cancel()
+        ventana.destroy()
+
+    tk.Button(ventana, text="Cancelar", command=cancelar, width=12).pack(pady=10)
+    ventana.protocol("WM_DELETE_WINDOW", cancelar)
+
+    def sondear():
+        if cancelado.is_set():
+            return
+        transcurrido = time.perf_counter() - inicio
+        if not futuro.done():
+            actual = list(en_curso)
+            if not futuro.running():
+                nombre = "Esperando a que termine la tarea anterior"
+            else:
+                nombre = NOMBRES_ETAPA.get(actual[-1], actual[-1]) if actual else "Procesando"
+            etiqueta.config(text=f"{nombre}... ({transcurrido:.1f} s)")
+            if transcurrido >= ESPERA_VENTANA and ventana.state() == 'withdrawn':
+                ventana.deiconify()
+            ventana.after(INTERVALO_SONDEO, sondear)
+            return
+        ventana.destroy()
+        try:
+            resultado = futuro.result()
+        except Cancelado:
+            return
+        except Exception as e:
+            messagebox.showerror(titulo_error, f"Error: {str(e)}")
+            return
+        mostrar(resultado)
+
+    ventana.after(10, sondear)
+
+# === Tablas de resultados ===
+# Tokens y código intermedio se muestran en una TablaVirtual: solo se crean
+# las filas que se ven, así también se pueden ver programas muy grandes.
+
+ANCHOS_COLUMNAS = {'n': 70, 'linea': 60, 'columna': 70, 'tipo': 170, 'instruccion': 400}
+
+def exportar_filas(filas, nombre):
+    ruta = filedialog.asksaveasfilename(
+        title="Exportar", initialfile=nombre, defaultextension=".tsv",
+        filetypes=[("TSV", "*.tsv"), ("JSON Lines", "*.jsonl")])
+    if not ruta:
+        return
+    extension = os.path.splitext(ruta)[1].lower() or '.tsv'
+    if extension not in EXPORTADORES:
+        messagebox.showerror("Exportar", f"Formato no soportado: {extension}")
+        return
+    en_segundo_plano("Exportar", lambda: EXPORTADORES[extension](filas, ruta),
+                     lambda cantidad: messagebox.showinfo("Exportar", f"Se exportaron {cantidad} filas a '{ruta}'."))
+
+# Ventana con la tabla, el número de filas y el botón de exportar. Devuelve
+# la ventana y la tabla para que cada vista añada sus controles arriba.
+def ventana_tabla(titulo, filas, nombre_exportar, texto_superior=None):
+    ventana = tk.Toplevel()
+    ventana.title(titulo)
+    ventana.geometry("800x550")
+    if texto_superior:
+        tk.Label(ventana, text=texto_superior, justify='left', anchor='w',
+                 font=("Consolas", 10)).pack(fill='x', padx=10, pady=(10, 0))
+    superior = tk.Frame(ventana)
+    superior.pack(fill='x', padx=10, pady=(10, 0))
+    tabla = TablaVirtual(ventana, anchos=ANCHOS_COLUMNAS)
+    tabla.pack(fill='both', expand=True, padx=10, pady=10)
+    inferior = tk.Frame(ventana)
+    inferior.pack(fill='x', padx=10, pady=(0, 10))
+    cantidad = tk.Label(inferior, anchor='w', font=("Arial", 10))
+    cantidad.pack(side='left', fill='x', expand=True)
+    tk.Button(inferior, text="Exportar...", width=12,
+              command=lambda: exportar_filas(tabla.fuente, nombre_exportar)).pack(side='right')
+
+    def cambiar_filas(nuevas):
+        tabla.cambiar_fuente(nuevas)
+        cantidad.config(text=f"{len(nuevas)} filas")
+
+    cambiar_filas(filas)
+    return superior, cambiar_filas
+
+# Ventana con un texto de solo lectura: errores, código corregido, estadísticas
+def ventana_texto(titulo, texto, ajustar=False):
+    ventana = tk.Toplevel()
+    ventana.title(titulo)
+    ventana.geometry("640x600")
+    area = scrolledtext.ScrolledText(ventana, wrap=tk.WORD if ajustar else tk.NONE, font=("Consolas", 10))
+    area.insert(tk.END, texto)
+    area.configure(state='disabled')
+    area.pack(fill='both', expand=True, padx=10, pady=10)
+
+def mostrar_resultados_lexicos():
+    fuente = codigo_fuente
+    en_segundo_plano("Análisis Léxico", lambda: etapas.tokens(fuente), mostrar_tabla_tokens)
+
+def mostrar_tabla_tokens(flujo):
+    superior, cambiar_filas = ventana_tabla("Análisis Léxico", FilasTokens(flujo), "tokens")
+    tk.Label(superior, text="Tipo:").pack(side='left')
+    tipo = ttk.Combobox(superior, state='readonly', width=22,
+                        values=["(todos)"] + sorted(set(flujo.tipos)))
+    tipo.set("(todos)")
+    tipo.pack(side='left', padx=(2, 10))
+    tk.Label(superior, text="Líneas:").pack(side='left')
+    desde = tk.Entry(superior, width=8)
+    desde.pack(side='left', padx=2)
+    tk.Label(superior, text="a").pack(side='left')
+    hasta = tk.Entry(superior, width=8)
+    hasta.pack(side='left', padx=2)
+
+    def filtrar(evento=None):
+        try:
+            linea_desde = int(desde.get()) if desde.get().strip() else None
+            linea_hasta = int(hasta.get()) if hasta.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Análisis Léxico", "Las líneas deben ser números enteros.")
+            return
+        tipos = None if tipo.get() == "(todos)" else {tipo.get()}
+        cambiar_filas(FilasTokens(flujo, tipos, linea_desde, linea_hasta))
+
+    tk.Button(superior, text="Filtrar", command=filtrar, width=10).pack(side='left', padx=10)
+    tipo.bind('<<ComboboxSelected>>', filtrar)
+    desde.bind('<Return>', filtrar)
+    hasta.bind('<Return>', filtrar)
+
+# En la vista rápida los programas grandes se resumen para que la imagen siga siendo legible
+MAX_NODOS_VISTA = 300
+
+def aviso_arbol(ruta):
+    messagebox.showinfo("Árbol Sintáctico", f"Se generó el árbol sintáctico. Verifica '{ruta}'.")
+
+def mostrar_arbol_sintactico():
+    fuente = codigo_fuente
+    en_segundo_plano("Árbol Sintáctico",
+                     lambda: renderizar_dot(etapas.dot(fuente, "MiPrograma", max_nodos=MAX_NODOS_VISTA), ver=True),
+                     aviso_arbol)
+
+def exportar_arbol_sintactico():
+    ruta = filedialog.asksaveasfilename(
+        title="Exportar árbol sintáctico", initialfile="arbol_sintactico", defaultextension=".svg",
+        filetypes=[("SVG", "*.svg"), ("DOT", "*.dot"), ("PNG", "*.png"), ("PDF", "*.pdf")])
+    if not ruta:
+        return
+    nombre_archivo, extension = os.path.splitext(ruta)
+    formato = extension.lstrip('.').lower() or 'svg'
+    if formato not in FORMATOS:
+        messagebox.showerror("Árbol Sintáctico", f"Formato no soportado: {extension}")
+        return
+    # Árbol completo y sin abrir visor
+    fuente = codigo_fuente
+    en_segundo_plano("Árbol Sintáctico",
+                     lambda: renderizar_dot(etapas.dot(fuente, "MiPrograma"), nombre_archivo, formato, ver=False),
+                     aviso_arbol)
+
+def mostrar_errores_semanticos():
+    def mostrar(errores):
+        texto = "\n".join(errores) if errores else "No se encontraron errores semánticos."
+        ventana_texto("Errores Semánticos", texto, ajustar=True)
+
+    fuente = codigo_fuente
+    en_segundo_plano("Análisis Semántico", lambda: etapas.errores_semanticos(fuente), mostrar)
+
+def mostrar_codigo_intermedio():
+    fuente = codigo_fuente
+    en_segundo_plano("Código Intermedio", lambda: etapas.intermedio(fuente),
+                     lambda codigo: ventana_tabla("Código Intermedio", FilasCodigo(codigo), "intermedio"))
+
+def mostrar_codigo_optimizado():
+    fuente = codigo_fuente
+
+    def mostrar(resultado):
+        codigo_optimizado, informe = resultado
+        ventana_tabla("Código Optimizado", FilasCodigo(codigo_optimizado), "optimizado",
+                      "\n".join(imprimir_informe(informe)))
+
+    en_segundo_plano("Código Optimizado", lambda: etapas.optimizacion(fuente), mostrar)
+
+def mostrar_codigo_corregido():
+    fuente = codigo_fuente
+
+    def calcular():
+        codigo_corregido, correcciones = corregir_codigo(fuente, etapas.tokens(fuente))
+        resultado_correcciones = "Correcciones:\n" + "\n".join(correcciones) if correcciones else "No se realizaron correcciones."
+        return resultado_correcciones + "\n\n" + codigo_corregido
+
+    en_segundo_plano("Código Corregido", calcular, lambda resultado: ventana_texto("Código Corregido", resultado))
+
+# Tiempos, memoria, tokens por tipo, patrones del léxico y caché. Se mide
+# todo otra vez sin caché, así que tarda más que las demás vistas.
+def mostrar_estadisticas():
+    fuente = codigo_fuente
+
+    en_segundo_plano("Estadísticas", lambda: medir_programa(fuente, etapas.cache, progreso=etapas.progreso),
+                     lambda resultado: ventana_texto("Estadísticas", "\n".join(imprimir_estadisticas(resultado))))
+
+TIPOS_ARTEFACTO = [("Artefacto del compilador", "*" + EXTENSION)]
+
+# Tokens, tabla de símbolos, código intermedio y optimizado en un .cart
+def exportar_artefacto():
+    fuente = codigo_fuente
+    ruta = filedialog.asksaveasfilename(title="Guardar artefacto", initialfile="programa",
+                                        defaultextension=EXTENSION, filetypes=TIPOS_ARTEFACTO)
+    if not ruta:
+        return
+
+    def calcular():
+        return guardar_artefacto(ruta, etapas.tokens(fuente), construir_tabla_simbolos(etapas.arbol(fuente)),
+                                 etapas.intermedio(fuente), etapas.optimizado(fuente))
+
+    en_segundo_plano("Guardar Artefacto", calcular,
+                     lambda tamano: messagebox.showinfo("Guardar Artefacto", f"Artefacto guardado en '{ruta}' ({tamano} bytes)."))
+
+# Código fuente de un artefacto. Sus tokens y su código intermedio pasan a
+# la caché de etapas, así las vistas no los vuelven a calcular.
+def importar_artefacto():
+    ruta = filedialog.askopenfilename(title="Abrir artefacto", filetypes=TIPOS_ARTEFACTO)
+    if not ruta:
+        return None
+    try:
+        artefacto = abrir_artefacto(ruta)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Abrir Artefacto", f"No se pudo abrir '{ruta}': {e}")
+        return None
+    fuente = artefacto.fuente()
+    if fuente is None:
+        messagebox.showerror("Abrir Artefacto", "El artefacto no tiene código fuente.")
+        return None
+    # La ventana guarda el código sin espacios alrededor; los espacios del
+    # final no cambian ni los tokens ni el código intermedio
+    clave = fuente.strip()
+    if fuente.startswith(clave):
+        for etapa, valor in (('tokens', artefacto.flujo()), ('intermedio', artefacto.intermedio())):
+            if valor is not None:
+                etapas.cache.obtener(clave, etapa, lambda valor=valor: valor)
+    return clave
+
+def ventana_principal():
+    def guardar_codigo():
+        global codigo_fuente
+        codigo_fuente = text_area.get("1.0", tk.END).strip()
+        if not codigo_fuente:
+            messagebox.showwarning("Advertencia", "El código fuente está vacío.")
+        else:
+            ventana.destroy()
+            menu_compilador()
+
+    def abrir():
+        fuente = importar_artefacto()
+        if fuente is not None:
+            text_area.delete("1.0", tk.END)
+            text_area.insert("1.0", fuente)
+
+    ventana = tk.Tk()
+    ventana.title("Entrada de Código Fuente")
+    ventana.geometry("800x600")
+    tk.Label(ventana, text="Escriba el código a analizar:", font=("Arial", 14)).pack(pady=10)
+    text_area = scrolledtext.ScrolledText(ventana, wrap=tk.WORD, width=90, height=25, font=("Consolas", 12))
+    text_area.pack(pady=(20, 0))
+    etiqueta_token = tk.Label(ventana, text="", anchor='w', font=("Consolas", 10))
+    etiqueta_token.pack(fill='x', padx=20)
+    ResaltadorSintaxis(text_area, etiqueta=etiqueta_token)
+    botones = tk.Frame(ventana)
+    botones.pack(pady=10)
+    tk.Button(botones, text="Guardar y Continuar", command=guardar_codigo, width=20, height=2, bg="#4CAF50", fg="white").pack(side='left', padx=5)
+    tk.Button(botones, text="Abrir Artefacto...", command=abrir, width=20, height=2).pack(side='left', padx=5)
+    ventana.mainloop()
+
+def menu_compilador():
+    ventana = tk.Tk()
+    ventana.title("Menú Compilador")
+    ventana.geometry("400x640")
+    opciones = [
+        ("Análisis Léxico", mostrar_resultados_lexicos),
+        ("Árbol Sintáctico", mostrar_arbol_sintactico),
+        ("Exportar Árbol", exportar_arbol_sintactico),
+        ("Errores Semánticos", mostrar_errores_semanticos),
+        ("Código Intermedio", mostrar_codigo_intermedio),
+        ("Código Optimizado", mostrar_codigo_optimizado),
+        ("Código Corregido", mostrar_codigo_corregido),
+        ("Ejecutar Código", ejecutar_codigo),
+        ("Estadísticas", mostrar_estadisticas),
+        ("Guardar Artefacto", exportar_artefacto),
+    ]
+    for texto, funcion in opciones:
+        tk.Button(ventana, text=texto, command=funcion, width=30, height=2, bg="#4CAF50", fg="white").pack(pady=5)
+    # Arrancar ya los procesos de ejecución para que el primer "Ejecutar" no espere
+    pool_ejecucion()
+    ventana.mainloop()
@@ -0,0 +1,661 @@
+# === Generación de código intermedio ===
+
+import ast
+import operator
+import struct
+import sys
+from array import array
+
+from compilador.sintactico import (Asignacion, Atributo, Binaria, Coleccion, Compuesta, Error, Expresion,
+                                   Funcion, Clase, Importar, Indice, Literal, Llamada, Mientras, Nombre,
+                                   Para, Programa, Retorno, Si, Simple, Unaria, analizador_sintactico)
+
+VERSION_IR = 4
+
+# Código de operación -> (nombre, tipo de operando). El operando de cada
+# instrucción es un entero: índice en la tabla de constantes, de nombres o de
+# operadores, un contador (número de argumentos, de elementos...) o el número
+# de una etiqueta. Los saltos apuntan a etiquetas (LABEL n) y no a posiciones,
+# así el optimizador puede quitar instrucciones sin recolocar nada.
+OPCODES = [
+    ('NOP', None),
+    ('LOAD', 'constante'),       # apila una constante
+    ('LOAD_VAR', 'nombre'),      # apila el valor de una variable
+    ('STORE', 'nombre'),         # desapila y guarda en una variable
+    ('OPER', 'operador'),        # operación binaria aritmética/lógica
+    ('COMPARE', 'operador'),     # comparación
+    ('UNARY', 'operador'),       # operación unaria
+    ('CALL', 'contador'),        # llamada con n argumentos
+    ('ATTR', 'nombre'),          # objeto.nombre
+    ('STORE_ATTR', 'nombre'),    # objeto.nombre = valor
+    ('INDEX', 'contador'),       # objeto[i] (n índices)
+    ('STORE_INDEX', 'contador'), # objeto[i] = valor
+    ('BUILD_LIST', 'contador'),
+    ('BUILD_TUPLE', 'contador'),
+    ('BUILD_DICT', 'contador'),  # n pares clave, valor
+    ('UNPACK', 'contador'),      # a, b = ...
+    ('POP', None),
+    ('RETURN', None),
+    ('IMPORT', 'nombre'),        # apila el módulo (import a.b apila a.b)
+    ('DUP', None),               # duplica el tope de la pila
+    ('LABEL', 'etiqueta'),       # destino de saltos, no hace nada
+    ('JUMP', 'etiqueta'),
+    ('POP_JUMP_IF_FALSE', 'etiqueta'),
+    ('POP_JUMP_IF_TRUE', 'etiqueta'),
+    ('JUMP_IF_FALSE_OR_POP', 'etiqueta'),  # and: deja el valor si salta
+    ('JUMP_IF_TRUE_OR_POP', 'etiqueta'),   # or
+    ('GET_ITER', None),
+    ('FOR_ITER', 'etiqueta'),    # apila el siguiente valor o quita el iterador y salta
+    ('MAKE_FUNCTION', 'constante'),  # (nombre, parámetros, nº de valores por defecto, etiqueta, locales, globales)
+    ('CALL_KW', 'constante'),    # (nº de posicionales, nombres de los argumentos con nombre)
+    ('STORE_GLOBAL', 'nombre'),  # asignación a una variable declarada global
+    ('DELETE', 'nombre'),
+    ('IMPORT_FROM', 'nombre'),   # from m import nombre (m en la pila, no se desapila)
+    ('BUILD_SLICE', 'contador'),
+    ('RAISE', 'contador'),       # raise (0) o raise e (1)
+    ('UNSUPPORTED', 'constante'),  # construcción que solo se traduce para mostrarla
+]
+NOMBRES_OPCODE = [nombre for nombre, _ in OPCODES]
+OPERANDO_OPCODE = [operando for _, operando in OPCODES]
+OP = {nombre: codigo for codigo, nombre in enumerate(NOMBRES_OPCODE)}
+SALTOS = frozenset(OP[nombre] for nombre in ('JUMP', 'POP_JUMP_IF_FALSE', 'POP_JUMP_IF_TRUE',
+                                              'JUMP_IF_FALSE_OR_POP', 'JUMP_IF_TRUE_OR_POP', 'FOR_ITER'))
+
+# Tabla fija de operadores (el operando de OPER/COMPARE/UNARY es su índice)
+OPERADORES = ['+', '-', '*', '/', '%', '//', '**', '&', '|', '^', '<<', '>>', '~',
+              'and', 'or', 'not', '&&', '||',
+              '==', '!=', '<', '>', '<=', '>=', 'in', 'not in', 'is',
+              'if', 'else', 'for', 'lambda', '=', ':', 'as', 'await', 'is not']
+INDICE_OPERADOR = {operador: indice for indice, operador in enumerate(OPERADORES)}
+COMPARACIONES = frozenset(['==', '!=', '<', '>', '<=', '>=', 'in', 'not in', 'is', 'is not'])
+# and/or (y && || del perfil tipo C) se traducen con saltos para no evaluar
+# el lado derecho si no hace falta
+CORTOCIRCUITO = {'and': 'JUMP_IF_FALSE_OR_POP', '&&': 'JUMP_IF_FALSE_OR_POP',
+                 'or': 'JUMP_IF_TRUE_OR_POP', '||': 'JUMP_IF_TRUE_OR_POP'}
+
+# Qué hace cada operador (lo usan la máquina virtual y el plegado de constantes)
+FUNCIONES_OPERADOR = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '%': operator.mod, '//': operator.floordiv, '**': operator.pow,
+    '&': operator.and_, '|': operator.or_, '^': operator.xor,
+    '<<': operator.lshift, '>>': operator.rshift,
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt, '>': operator.gt,
+    '<=': operator.le, '>=': operator.ge,
+    'in': lambda a, b: a in b, 'not in': lambda a, b: a not in b,
+    'is': operator.is_, 'is not': operator.is_not,
+}
+FUNCIONES_UNARIAS = {'-': operator.neg, '+': operator.pos, '~': operator.invert, 'not': operator.not_}
+
+
+# (valores que desapila, valores que apila) de una instrucción. En FOR_ITER y
+# JUMP_IF_FALSE_OR_POP/JUMP_IF_TRUE_OR_POP depende de si salta, así que aquí
+# cuentan como (0, 0) y quien recorre el código trata cada camino aparte.
+def efecto_pila(opcode, operando, constantes):
+    nombre = NOMBRES_OPCODE[opcode]
+    if nombre in ('LOAD', 'LOAD_VAR', 'IMPORT', 'IMPORT_FROM'):
+        return 0, 1
+    if nombre in ('STORE', 'STORE_GLOBAL', 'POP', 'RETURN', 'POP_JUMP_IF_FALSE', 'POP_JUMP_IF_TRUE'):
+        return 1, 0
+    if nombre in ('OPER', 'COMPARE'):
+        return 2, 1
+    if nombre in ('UNARY', 'ATTR', 'GET_ITER'):
+        return 1, 1
+    if nombre == 'DUP':
+        return 1, 2
+    if nombre == 'STORE_ATTR':
+        return 2, 0
+    if nombre in ('CALL', 'INDEX'):
+        return operando + 1, 1
+    if nombre == 'CALL_KW':
+        posicionales, nombres = constantes[operando]
+        return posicionales + len(nombres) + 1, 1
+    if nombre == 'STORE_INDEX':
+        return operando + 2, 0
+    if nombre in ('BUILD_LIST', 'BUILD_TUPLE', 'BUILD_SLICE'):
+        return operando, 1
+    if nombre == 'BUILD_DICT':
+        return 2 * operando, 1
+    if nombre == 'UNPACK':
+        return 1, operando
+    if nombre == 'MAKE_FUNCTION':
+        return constantes[operando][2], 1
+    if nombre == 'RAISE':
+        return operando, 0
+    return 0, 0
+
+
+# Clave de una constante en su tabla: 1, 1.0 y True son constantes distintas,
+# y también 0.0 y -0.0 aunque sean iguales con ==. Los float y complex van
+# por su repr, que distingue el signo del cero y hace que todos los NaN (que
+# no son iguales ni a sí mismos) sean una sola constante.
+def _clave_constante(valor):
+    if type(valor) is float or type(valor) is complex:
+        return type(valor), repr(valor)
+    return type(valor), valor
+
+
+# Código intermedio de pila en columnas: un byte de opcode, un uint32 de
+# operando y la línea de origen por instrucción, más las tablas de constantes
+# y nombres sin repetidos.
+class CodigoIntermedio:
+    __slots__ = ('opcodes', 'operandos', 'lineas', 'constantes', 'nombres',
+                 '_indice_constantes', '_indice_nombres')
+
+    def __init__(self):
+        self.opcodes = array('B')
+        self.operandos = array('I')
+        self.lineas = array('I')
+        self.constantes = []
+        self.nombres = []
+        self._indice_constantes = {}
+        self._indice_nombres = {}
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def emitir(self, opcode, operando=0, linea=0):
+        self.opcodes.append(opcode)
+        self.operandos.append(operando)
+        self.lineas.append(linea)
+
+    def constante(self, valor):
+        clave = _clave_constante(valor)
+        indice = self._indice_constantes.get(clave)
+        if indice is None:
+            indice = self._indice_constantes[clave] = len(self.constantes)
+            self.constantes.append(valor)
+        return indice
+
+    def nombre(self, texto):
+        indice = self._indice_nombres.get(texto)
+        if indice is None:
+            indice = self._indice_nombres[texto] = len(self.nombres)
+            self.nombres.append(texto)
+        return indice
+
+    # Operando de la instrucción i ya resuelto: la constante, el nombre, el
+    # operador o el contador
+    def argumento(self, i):
+        tipo = OPERANDO_OPCODE[self.opcodes[i]]
+        operando = self.operandos[i]
+        if tipo == 'constante':
+            return self.constantes[operando]
+        if tipo == 'nombre':
+            return self.nombres[operando]
+        if tipo == 'operador':
+            return OPERADORES[operando]
+        if tipo == 'contador' or tipo == 'etiqueta':
+            return operando
+        return None
+
+    # (nombre del opcode, argumento, línea) de cada instrucción
+    def __iter__(self):
+        for i in range(len(self.opcodes)):
+            yield NOMBRES_OPCODE[self.opcodes[i]], self.argumento(i), self.lineas[i]
+
+
+# Copia de una columna como array: las de un artefacto abierto con mmap son
+# memoryview de solo lectura (ver compilador.artefactos)
+def copiar_columna(columna):
+    if isinstance(columna, array):
+        return columna[:]
+    copia = array(columna.format)
+    copia.frombytes(columna.cast('B'))
+    return copia
+
+
+# Texto de la instrucción i, p.ej. "LOAD 5", "STORE x", "OPER +", "JUMP L3"
+def texto_instruccion(codigo, i):
+    nombre = NOMBRES_OPCODE[codigo.opcodes[i]]
+    tipo = OPERANDO_OPCODE[codigo.opcodes[i]]
+    argumento = codigo.argumento(i)
+    if nombre == 'LABEL':
+        return f"L{argumento}:"
+    if tipo is None:
+        return nombre
+    if tipo == 'etiqueta':
+        return f"{nombre} L{argumento}"
+    if isinstance(argumento, str) and tipo == 'constante':
+        return f"{nombre} {argumento!r}"
+    return f"{nombre} {argumento}"
+
+
+def imprimir_codigo_intermedio(codigo):
+    return [texto_instruccion(codigo, i) for i in range(len(codigo))]
+
+
+def _valor_literal(nodo):
+    if nodo.tipo == 'NUMERO':
+        for conversion in (int, float):
+            try:
+                return conversion(nodo.valor)  # int('05') sí funciona, literal_eval no
+            except ValueError:
+                pass
+    if nodo.valor in ('True', 'False', 'None'):
+        return {'True': True, 'False': False, 'None': None}[nodo.valor]
+    try:
+        return ast.literal_eval(nodo.valor)  # 0x1F, 1e5, 2j, cadenas
+    except (ValueError, SyntaxError):
+        return nodo.valor  # f-strings y similares: se guarda el texto
+
+
+def _es_cadena_formateada(nodo):
+    prefijo = nodo.valor[:len(nodo.valor) - len(nodo.valor.lstrip('bBrRuUfF'))]
+    # El prefijo va seguido de comillas: False o fin no son cadenas
+    return nodo.tipo != 'NUMERO' and 'f' in prefijo.lower() and nodo.valor[len(prefijo):][:1] in ('"', "'")
+
+
+# Nombres declarados con `global` en el cuerpo de una función (sin entrar en
+# funciones o clases anidadas)
+def _globales_declaradas(cuerpo):
+    declaradas = set()
+    pila = list(cuerpo)
+    while pila:
+        nodo = pila.pop()
+        if isinstance(nodo, Simple) and nodo.palabra == 'global':
+            for argumento in nodo.argumentos:
+                elementos = argumento.elementos if isinstance(argumento, Coleccion) else [argumento]
+                declaradas.update(elemento.id for elemento in elementos if isinstance(elemento, Nombre))
+        elif isinstance(nodo, (Si, Mientras, Para, Compuesta)):
+            pila.extend(nodo.cuerpo)
+            pila.extend(getattr(nodo, 'sino', ()))
+    return declaradas
+
+
+# Partes de una rebanada: a[1:2:3] llega como Binaria(':', Binaria(':', 1, 2), 3)
+def _partes_rebanada(nodo):
+    if isinstance(nodo.izquierda, Binaria) and nodo.izquierda.operador == ':':
+        return [nodo.izquierda.izquierda, nodo.izquierda.derecha, nodo.derecha]
+    return [nodo.izquierda, nodo.derecha]
+
+
+# Traduce el árbol sintáctico a código de pila en notación postfija
+# (LOAD 2, LOAD 3, OPER + en lugar de 2 + 3). Acepta un árbol o un
+# TokenStream. if/while/for, and/or y el condicional usan etiquetas y saltos;
+# las funciones se traducen en su sitio, saltando por encima del cuerpo, y
+# MAKE_FUNCTION guarda la etiqueta donde empieza. Lo que la máquina virtual
+# no sabe ejecutar (clases, try, with, lambda, comprensiones...) se marca con
+# UNSUPPORTED y se traduce igual para poder mostrarlo.
+def generar_codigo_intermedio(entrada):
+    arbol = entrada if isinstance(entrada, Programa) else analizador_sintactico(entrada)
+    codigo = CodigoIntermedio()
+    emitir = codigo.emitir
+    etiquetas = 0
+    bucles = []  # (etiqueta de inicio, etiqueta de salida, es_for) o None al entrar en una función
+    globales = []  # nombres declarados global en cada función abierta
+    locales = []  # nombres asignados en cada función abierta (sus variables locales)
+
+    def instruccion(linea, nombre, operando=0):
+        return ('emitir', OP[nombre], operando, linea)
+
+    def no_soportado(linea, descripcion):
+        return ('emitir', OP['UNSUPPORTED'], codigo.constante(descripcion), linea)
+
+    def nueva_etiqueta():
+        nonlocal etiquetas
+        etiquetas += 1
+        return etiquetas
+
+    # Tareas: ('nodo', n), ('destino', n) para los lados izquierdos de una
+    # asignación, ('emitir', opcode, operando, linea), y ('bucle', datos),
+    # ('fin_bucle',), ('funcion', globales, locales), ('fin_funcion',) para
+    # saber adónde saltan break/continue y qué variables son globales o
+    # locales, y ('crear_funcion', datos, globales, locales, linea), que emite
+    # MAKE_FUNCTION cuando ya se conocen todas las locales. Sin recursión.
+    pila = [('nodo', sentencia) for sentencia in reversed(arbol.cuerpo)]
+    while pila:
+        tarea = pila.pop()
+        accion = tarea[0]
+        if accion == 'emitir':
+            emitir(tarea[1], tarea[2], tarea[3])
+            continue
+        if accion == 'bucle':
+            bucles.append(tarea[1])
+            continue
+        if accion == 'fin_bucle':
+            bucles.pop()
+            continue
+        if accion == 'funcion':
+            bucles.append(None)
+            globales.append(tarea[1])
+            locales.append(tarea[2])
+            continue
+        if accion == 'fin_funcion':
+            bucles.pop()
+            globales.pop()
+            locales.pop()
+            continue
+        if accion == 'crear_funcion':
+            _, datos, declaradas, asignadas, linea = tarea
+            funcion = datos + (tuple(sorted(asignadas)), tuple(sorted(declaradas)))
+            emitir(OP['MAKE_FUNCTION'], codigo.constante(funcion), linea)
+            continue
+        nodo = tarea[1]
+        linea = nodo.linea
+        # Lo más frecuente, sin pasar por la lista de tareas
+        if accion == 'nodo' and type(nodo) is Nombre:
+            emitir(OP['LOAD_VAR'], codigo.nombre(nodo.id), linea)
+            continue
+        if accion == 'nodo' and type(nodo) is Literal and not _es_cadena_formateada(nodo):
+            emitir(OP['LOAD'], codigo.constante(_valor_literal(nodo)), linea)
+            continue
+
+        tareas = []  # lo que hay que hacer, en orden
+        if accion == 'destino':
+            if isinstance(nodo, Nombre):
+                es_global = globales and nodo.id in globales[-1]
+                if locales and not es_global:
+                    locales[-1].add(nodo.id)
+                tareas.append(instruccion(linea, 'STORE_GLOBAL' if es_global else 'STORE', codigo.nombre(nodo.id)))
+            elif isinstance(nodo, Atributo):
+                tareas += [('nodo', nodo.valor), instruccion(linea, 'STORE_ATTR', codigo.nombre(nodo.nombre))]
+            elif isinstance(nodo, Indice):
+                tareas.append(('nodo', nodo.valor))
+                tareas += [('nodo', indice) for indice in nodo.indices]
+                tareas.append(instruccion(linea, 'STORE_INDEX', len(nodo.indices)))
+            elif isinstance(nodo, Coleccion):
+                tareas.append(instruccion(linea, 'UNPACK', len(nodo.elementos)))
+                tareas += [('destino', elemento) for elemento in nodo.elementos]
+            elif isinstance(nodo, Binaria) and nodo.operador == ':':
+                tareas.append(('destino', nodo.izquierda))  # x: int = 1
+            else:
+                tareas += [no_soportado(linea, f"asignación a {nodo.etiqueta()}"), instruccion(linea, 'POP')]
+
+        # --- sentencias ---
+        elif isinstance(nodo, Asignacion):
+            if nodo.operador != '=':
+                # x += e  ->  LOAD_VAR x, e, OPER +, STORE x
+                tareas += [('nodo', nodo.objetivo), ('nodo', nodo.valor),
+                           instruccion(linea, 'OPER', INDICE_OPERADOR[nodo.operador[:-1]])]
+            else:
+                tareas.append(('nodo', nodo.valor))
+            tareas.append(('destino', nodo.objetivo))
+        elif isinstance(nodo, Expresion):
+            tareas += [('nodo', nodo.valor), instruccion(linea, 'POP')]
+        elif isinstance(nodo, Si):
+            sino, fin = nueva_etiqueta(), nueva_etiqueta()
+            tareas += [('nodo', nodo.condicion), instruccion(linea, 'POP_JUMP_IF_FALSE', sino)]
+            tareas += [('nodo', hijo) for hijo in nodo.cuerpo]
+            if nodo.sino:
+                tareas += [instruccion(linea, 'JUMP', fin), instruccion(linea, 'LABEL', sino)]
+                tareas += [('nodo', hijo) for hijo in nodo.sino]
+                tareas.append(instruccion(linea, 'LABEL', fin))
+            else:
+                tareas.append(instruccion(linea, 'LABEL', sino))
+        elif isinstance(nodo, (Mientras, Para)):
+            inicio, sino, fin = nueva_etiqueta(), nueva_etiqueta(), nueva_etiqueta()
+            es_for = isinstance(nodo, Para)
+            if es_for:
+                tareas += [('nodo', nodo.iterable), instruccion(linea, 'GET_ITER'), instruccion(linea, 'LABEL', inicio),
+                           instruccion(linea, 'FOR_ITER', sino), ('destino', nodo.objetivo)]
+            else:
+                tareas += [instruccion(linea, 'LABEL', inicio), ('nodo', nodo.condicion),
+                           instruccion(linea, 'POP_JUMP_IF_FALSE', sino)]
+            tareas.append(('bucle', (inicio, fin, es_for)))
+            tareas += [('nodo', hijo) for hijo in nodo.cuerpo]
+            tareas += [('fin_bucle',), instruccion(linea, 'JUMP', inicio), instruccion(linea, 'LABEL', sino)]
+            tareas += [('nodo', hijo) for hijo in nodo.sino]
+            tareas.append(instruccion(linea, 'LABEL', fin))
+        elif isinstance(nodo, Funcion):
+            inicio, fin = nueva_etiqueta(), nueva_etiqueta()
+            parametros, por_defecto = [], []
+            for parametro in nodo.parametros:
+                if isinstance(parametro, Binaria) and parametro.operador == '=':
+                    por_defecto.append(parametro.derecha)
+                    parametro = parametro.izquierda
+                if isinstance(parametro, Binaria) and parametro.operador == ':':
+                    parametro = parametro.izquierda  # anotación
+                if isinstance(parametro, Nombre):
+                    parametros.append(parametro.id)
+                else:
+                    tareas.append(no_soportado(linea, f"parámetro {parametro.etiqueta()}"))
+            # Las locales se van añadiendo al traducir el cuerpo
+            declaradas, asignadas = _globales_declaradas(nodo.cuerpo), set(parametros)
+            tareas += [instruccion(linea, 'JUMP', fin), instruccion(linea, 'LABEL', inicio),
+                       ('funcion', declaradas, asignadas)]
+            tareas += [('nodo', hijo) for hijo in nodo.cuerpo]
+            tareas += [instruccion(linea, 'LOAD', codigo.constante(None)), instruccion(linea, 'RETURN'),
+                       ('fin_funcion',), instruccion(linea, 'LABEL', fin)]
+            tareas += [('nodo', valor) for valor in por_defecto]
+            funcion = (nodo.nombre, tuple(parametros), len(por_defecto), inicio)
+            tareas += [('crear_funcion', funcion, declaradas, asignadas, linea),
+                       ('destino', Nombre(nodo.nombre, linea))]
+        elif isinstance(nodo, (Clase, Compuesta)):
+            tareas.append(no_soportado(linea, nodo.etiqueta()))
+            tareas += [('nodo', hijo) for hijo in nodo.cuerpo]
+        elif isinstance(nodo, Retorno):
+            if nodo.valor is None:
+                tareas.append(instruccion(linea, 'LOAD', codigo.constante(None)))
+            else:
+                tareas.append(('nodo', nodo.valor))
+            tareas.append(instruccion(linea, 'RETURN'))
+        elif isinstance(nodo, Importar):
+            for nombre, alias in nodo.nombres:
+                if nombre == '*' or (nodo.modulo or '').startswith('.'):
+                    tareas.append(no_soportado(linea, 'import relativo' if nombre != '*' else 'import *'))
+                elif nodo.modulo:
+                    # from m import n as k  ->  IMPORT m, IMPORT_FROM n, STORE k, POP
+                    tareas += [instruccion(linea, 'IMPORT', codigo.nombre(nodo.modulo)),
+                               instruccion(linea, 'IMPORT_FROM', codigo.nombre(nombre)),
+                               ('destino', Nombre(alias or nombre, linea)), instruccion(linea, 'POP')]
+                elif alias or '.' not in nombre:
+                    tareas += [instruccion(linea, 'IMPORT', codigo.nombre(nombre)), ('destino', Nombre(alias or nombre, linea))]
+                else:
+                    # import a.b carga a.b pero guarda a
+                    paquete = nombre.split('.')[0]
+                    tareas += [instruccion(linea, 'IMPORT', codigo.nombre(nombre)), instruccion(linea, 'POP'),
+                               instruccion(linea, 'IMPORT', codigo.nombre(paquete)), ('destino', Nombre(paquete, linea))]
+        elif isinstance(nodo, Simple):
+            argumentos = nodo.argumentos[0].elementos if (
+                nodo.argumentos and isinstance(nodo.argumentos[0], Coleccion) and nodo.argumentos[0].tipo == 'tupla'
+            ) else nodo.argumentos
+            bucle = bucles[-1] if bucles else None
+            if nodo.palabra in ('pass', 'global'):
+                pass
+            elif nodo.palabra in ('break', 'continue') and bucle is not None:
+                if nodo.palabra == 'continue':
+                    tareas.append(instruccion(linea, 'JUMP', bucle[0]))
+                else:
+                    if bucle[2]:
+                        tareas.append(instruccion(linea, 'POP'))  # el iterador del for
+                    tareas.append(instruccion(linea, 'JUMP', bucle[1]))
+            elif nodo.palabra == 'raise' and len(nodo.argumentos) <= 1:
+                tareas += [('nodo', argumento) for argumento in nodo.argumentos]
+                tareas.append(instruccion(linea, 'RAISE', len(nodo.argumentos)))
+            elif nodo.palabra == 'assert' and 1 <= len(argumentos) <= 2:
+                # assert c, m  ->  c, POP_JUMP_IF_TRUE fin, AssertionError(m), RAISE 1, fin:
+                fin = nueva_etiqueta()
+                tareas += [('nodo', argumentos[0]), instruccion(linea, 'POP_JUMP_IF_TRUE', fin),
+                           instruccion(linea, 'LOAD_VAR', codigo.nombre('AssertionError'))]
+                tareas += [('nodo', mensaje) for mensaje in argumentos[1:]]
+                tareas += [instruccion(linea, 'CALL', len(argumentos) - 1), instruccion(linea, 'RAISE', 1),
+                           instruccion(linea, 'LABEL', fin)]
+            elif nodo.palabra == 'del' and all(isinstance(argumento, Nombre) for argumento in argumentos):
+                if locales:
+                    locales[-1].update(argumento.id for argumento in argumentos if argumento.id not in globales[-1])
+                tareas += [instruccion(linea, 'DELETE', codigo.nombre(argumento.id)) for argumento in argumentos]
+            else:
+                tareas.append(no_soportado(linea, nodo.palabra))
+                for argumento in nodo.argumentos:
+                    tareas += [('nodo', argumento), instruccion(linea, 'POP')]
+
+        # --- expresiones ---
+        elif isinstance(nodo, Literal):
+            # (los nombres y el resto de literales ya se emitieron arriba)
+            tareas += [no_soportado(linea, 'f-string'),
+                       instruccion(linea, 'LOAD', codigo.constante(_valor_literal(nodo)))]
+        elif isinstance(nodo, Binaria):
+            operador = nodo.operador
+            if operador in CORTOCIRCUITO:
+                fin = nueva_etiqueta()
+                tareas += [('nodo', nodo.izquierda), instruccion(linea, CORTOCIRCUITO[operador], fin),
+                           ('nodo', nodo.derecha), instruccion(linea, 'LABEL', fin)]
+            elif operador == 'else' and isinstance(nodo.izquierda, Binaria) and nodo.izquierda.operador == 'if':
+                # a if c else b
+                sino, fin = nueva_etiqueta(), nueva_etiqueta()
+                tareas += [('nodo', nodo.izquierda.derecha), instruccion(linea, 'POP_JUMP_IF_FALSE', sino),
+                           ('nodo', nodo.izquierda.izquierda), instruccion(linea, 'JUMP', fin),
+                           instruccion(linea, 'LABEL', sino), ('nodo', nodo.derecha), instruccion(linea, 'LABEL', fin)]
+            elif operador == ':':
+                partes = _partes_rebanada(nodo)
+                tareas += [('nodo', parte) for parte in partes]
+                tareas.append(instruccion(linea, 'BUILD_SLICE', len(partes)))
+            elif operador in FUNCIONES_OPERADOR:
+                tareas += [('nodo', nodo.izquierda), ('nodo', nodo.derecha),
+                           instruccion(linea, 'COMPARE' if operador in COMPARACIONES else 'OPER', INDICE_OPERADOR[operador])]
+            else:
+                # lambda, comprensiones, f(x=1) fuera de una llamada...
+                tareas += [no_soportado(linea, 'comprensión' if operador == 'for' else operador),
+                           ('nodo', nodo.izquierda), ('nodo', nodo.derecha),
+                           instruccion(linea, 'OPER', INDICE_OPERADOR.get(operador, 0))]
+        elif isinstance(nodo, Unaria):
+            if nodo.operador not in FUNCIONES_UNARIAS:
+                tareas.append(no_soportado(linea, nodo.operador))  # *args, await
+            tareas += [('nodo', nodo.operando), instruccion(linea, 'UNARY', INDICE_OPERADOR[nodo.operador])]
+        elif isinstance(nodo, Llamada):
+            posicionales, con_nombre = [], []
+            for argumento in nodo.argumentos:
+                if isinstance(argumento, Binaria) and argumento.operador == '=' and isinstance(argumento.izquierda, Nombre):
+                    con_nombre.append(argumento)  # f(x=1)
+                else:
+                    posicionales.append(argumento)
+            tareas.append(('nodo', nodo.funcion))
+            tareas += [('nodo', argumento) for argumento in posicionales]
+            tareas += [('nodo', argumento.derecha) for argumento in con_nombre]
+            if con_nombre:
+                nombres = tuple(argumento.izquierda.id for argumento in con_nombre)
+                tareas.append(instruccion(linea, 'CALL_KW', codigo.constante((len(posicionales), nombres))))
+            else:
+                tareas.append(instruccion(linea, 'CALL', len(posicionales)))
+        elif isinstance(nodo, Atributo):
+            tareas += [('nodo', nodo.valor), instruccion(linea, 'ATTR', codigo.nombre(nodo.nombre))]
+        elif isinstance(nodo, Indice):
+            tareas.append(('nodo', nodo.valor))
+            tareas += [('nodo', indice) for indice in nodo.indices]
+            tareas.append(instruccion(linea, 'INDEX', len(nodo.indices)))
+        elif isinstance(nodo, Coleccion):
+            if nodo.tipo == 'diccionario':
+                for elemento in nodo.elementos:
+                    if isinstance(elemento, Binaria) and elemento.operador == ':':
+                        tareas += [('nodo', elemento.izquierda), ('nodo', elemento.derecha)]
+                    else:
+                        tareas += [no_soportado(linea, 'conjunto'), ('nodo', elemento)]
+                tareas.append(instruccion(linea, 'BUILD_DICT', len(nodo.elementos)))
+            else:
+                tareas += [('nodo', elemento) for elemento in nodo.elementos]
+                tareas.append(instruccion(linea, 'BUILD_LIST' if nodo.tipo == 'lista' else 'BUILD_TUPLE',
+                                          len(nodo.elementos)))
+        elif isinstance(nodo, Error):
+            tareas.append(no_soportado(linea, f"error sintáctico: {nodo.texto}"))
+        else:
+            tareas += [('nodo', hijo) for hijo in nodo.hijos()]
+        pila.extend(reversed(tareas))
+    return codigo
+
+
+# === Formato binario ===
+#
+#   cabecera   'CIR\0', versión (uint16), nº de instrucciones, de constantes
+#              y de nombres (uint32), todo little-endian
+#   opcodes    n bytes, rellenados hasta múltiplo de 4
+#   operandos  n uint32
+#   lineas     n uint32
+#   constantes por cada una: etiqueta (1 byte), longitud (uint32) y datos
+#   nombres    por cada uno: longitud (uint32) y texto UTF-8
+#
+# Las tres columnas de instrucciones son de ancho fijo, así que se pueden
+# recorrer directamente sobre los bytes sin decodificar las tablas.
+
+MAGIA_IR = b'CIR\0'
+CABECERA_IR = struct.Struct('<4sHIII')
+LONGITUD = struct.Struct('<I')
+
+
+def _columna_bytes(columna):
+    if sys.byteorder == 'big':
+        columna = array(columna.typecode, columna)
+        columna.byteswap()
+    return columna.tobytes()
+
+
+def _columna_desde(typecode, datos):
+    columna = array(typecode)
+    columna.frombytes(datos)
+    if sys.byteorder == 'big':
+        columna.byteswap()
+    return columna
+
+
+def _codificar_constante(valor):
+    if valor is None:
+        return b'n', b''
+    if isinstance(valor, bool):
+        return b'b', b'\1' if valor else b'\0'
+    if isinstance(valor, int):
+        return b'i', str(valor).encode('ascii')
+    if isinstance(valor, float):
+        return b'f', struct.pack('<d', valor)
+    if isinstance(valor, bytes):
+        return b'y', valor
+    if isinstance(valor, str):
+        return b's', valor.encode('utf-8', 'surrogatepass')
+    return b'r', repr(valor).encode('utf-8', 'surrogatepass')  # p.ej. complejos: se guarda su repr
+
+
+def _decodificar_constante(etiqueta, datos):
+    if etiqueta == b'n':
+        return None
+    if etiqueta == b'b':
+        return datos == b'\1'
+    if etiqueta == b'i':
+        return int(datos)
+    if etiqueta == b'f':
+        return struct.unpack('<d', datos)[0]
+    if etiqueta == b'y':
+        return bytes(datos)
+    if etiqueta == b'r':
+        return ast.literal_eval(bytes(datos).decode('utf-8', 'surrogatepass'))
+    return bytes(datos).decode('utf-8', 'surrogatepass')
+
+
+def serializar_codigo_intermedio(codigo):
+    n = len(codigo)
+    partes = [CABECERA_IR.pack(MAGIA_IR, VERSION_IR, n, len(codigo.constantes), len(codigo.nombres)),
+              codigo.opcodes.tobytes(), b'\0' * (-n % 4),
+              _columna_bytes(codigo.operandos), _columna_bytes(codigo.lineas)]
+    for valor in codigo.constantes:
+        etiqueta, datos = _codificar_constante(valor)
+        partes += [etiqueta, LONGITUD.pack(len(datos)), datos]
+    for nombre in codigo.nombres:
+        datos = nombre.encode('utf-8', 'surrogatepass')
+        partes += [LONGITUD.pack(len(datos)), datos]
+    return b''.join(partes)
+
+
+def deserializar_codigo_intermedio(datos):
+    datos = memoryview(datos)
+    magia, version, n, num_constantes, num_nombres = CABECERA_IR.unpack_from(datos, 0)
+    if magia != MAGIA_IR:
+        raise ValueError("No es código intermedio serializado")
+    if version != VERSION_IR:
+        raise ValueError(f"Versión de código intermedio no soportada: {version}")
+    codigo = CodigoIntermedio()
+    posicion = CABECERA_IR.size
+    codigo.opcodes = _columna_desde('B', datos[posicion:posicion + n])
+    posicion += n + (-n % 4)
+    codigo.operandos = _columna_desde('I', datos[posicion:posicion + 4 * n])
+    posicion += 4 * n
+    codigo.lineas = _columna_desde('I', datos[posicion:posicion + 4 * n])
+    posicion += 4 * n
+    for _ in range(num_constantes):
+        etiqueta = bytes(datos[posicion:posicion + 1])
+        (longitud,) = LONGITUD.unpack_from(datos, posicion + 1)
+        posicion += 1 + LONGITUD.size
+        codigo.constante(_decodificar_constante(etiqueta, datos[posicion:posicion + longitud]))
+        posicion += longitud
+    for _ in range(num_nombres):
+        (longitud,) = LONGITUD.unpack_from(datos, posicion)
+        posicion += LONGITUD.size
+        codigo.nombre(bytes(datos[posicion:posicion + longitud]).decode('utf-8', 'surrogatepass'))
+        posicion += longitud
+    return codigo
@@ -0,0 +1,267 @@
+import codecs
+import keyword
+import re
+
+from compilador.lexico_dfa import DIRECTORIO_CACHE, PatronDFA
+
+# === Patrones de análisis léxico ===
+# El orden importa: con la expresión regular (MotorLexico) gana en cada
+# posición el primer patrón que coincide; con el autómata (MotorDFA, el que
+# se usa por defecto) gana el más largo y, si empatan, el primero.
+TOKENS_PYTHON = [
+    ('COMENTARIO_LINEA', r'#.*'),
+    ('CADENA_MULTILINEA', r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')'),
+    ('CADENA', r'"[^"\n]*"|\'[^\'\n]*\''),
+    ('OPERADOR_LOGICO', r'and|or|not|&&|\|\|'),
+    ('OPERADOR_COMPARACION', r'==|!=|<=|>=|<|>'),
+    ('OPERADOR_ASIGNACION', r'[\+\-\*/]?='),
+    ('OPERADOR_ARITMETICO', r'[+\-*/%]'),
+    ('PUNTUACION', r'[;,\(\)\{\}\[\]\.:]'),
+    ('IDENTIFICADOR', r'[a-zA-Z_][a-zA-Z_0-9]*'),
+    ('NUMERO', r'\d+(\.\d+)?'),
+    ('ESPACIO', r'\s+'),
+]
+
+PALABRAS_CLAVE = frozenset(keyword.kwlist)
+
+# Perfil C: los patrones de arriba más comentarios de bloque, caracteres,
+# incremento y operadores de bits, con las palabras clave de C además de
+# las de Python
+TOKENS_C = [
+    ('COMENTARIO_LINEA', r'#.*'),
+    ('COMENTARIO_BLOQUE', r'/\*[\s\S]*?\*/'),
+    ('CADENA_MULTILINEA', r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')'),
+    ('CADENA', r'"[^"\n]*"|\'[^\'\n]*\''),
+    ('CARACTER', r"'[^'\n]'"),
+    ('OPERADOR_LOGICO', r'and|or|not|&&|\|\|'),
+    ('OPERADOR_COMPARACION', r'==|!=|<=|>=|<|>'),
+    ('OPERADOR_ASIGNACION', r'[\+\-\*/]?='),
+    ('OPERADOR_INCREMENTO', r'\+\+|--'),
+    ('OPERADOR_ARITMETICO', r'[+\-*/%]'),
+    ('OPERADOR_BITWISE', r'&|\||~|\^|>>|<<'),
+    ('PUNTUACION', r'[;,\(\)\{\}\[\]\.:]'),
+    ('IDENTIFICADOR', r'[a-zA-Z_][a-zA-Z_0-9]*'),
+    ('NUMERO', r'\d+(\.\d+)?'),
+    ('ESPACIO', r'\s+'),
+    ('DESCONOCIDO', r'.'),
+]
+
+PALABRAS_CLAVE_C = PALABRAS_CLAVE | {
+    'int', 'float', 'char', 'void', 'do', 'switch', 'case', 'default', 'struct', 'typedef',
+    'enum', 'const', 'sizeof', 'static', 'extern', 'union', 'volatile', 'print'
+}
+
+# Perfiles de lenguaje que se pueden elegir al ejecutar (ver motor_perfil)
+PERFILES = {
+    'python': (TOKENS_PYTHON, PALABRAS_CLAVE),
+    'c': (TOKENS_C, PALABRAS_CLAVE_C),
+}
+
+# Delimitadores (apertura, cierre) de los tokens que pueden abarcar varias
+# líneas. Si una apertura no tiene cierre, el patrón recorre el resto del
+# texto buscándolo, así que el resultado depende de todo lo que viene después.
+PARES_MULTILINEA = {
+    'CADENA_MULTILINEA': (('"""', '"""'), ("'''", "'''")),
+    'COMENTARIO_BLOQUE': (('/*', '*/'),),
+}
+APERTURAS_MULTILINEA = {tipo: tuple(apertura for apertura, _ in pares) for tipo, pares in PARES_MULTILINEA.items()}
+
+
+# Error léxico por pasarse de los límites de flujo_tokens (tamaño o tiempo)
+class LimiteLexico(ValueError):
+    pass
+
+
+# Aperturas multilínea sin cierre. Buscar el cierre de cada una recorre el
+# resto del texto, y con muchas ("/* /* /* ...") el léxico se vuelve
+# cuadrático. Como una apertura solo se cierra si hay un cierre detrás, con
+# la última posición de cada cierre (un rfind) se sabe desde dónde ya no se
+# cierra ninguna. Los motores preguntan aquí dónde está la próxima de esas y
+# en ella emiten la apertura sola como ERROR_LEXICO, sin probar el patrón; el
+# resto se analiza normalmente. Cada apertura se busca una vez con find
+# hacia delante, así que todo es lineal.
+class AperturasSinCierre:
+    def __init__(self, texto, pares):
+        self.texto = texto
+        self.pares = []  # [apertura, desde dónde ya no se cierra, próxima posición]
+        for apertura, cierre in pares:
+            ultimo = texto.rfind(cierre)
+            self.pares.append([apertura, max(0, ultimo - len(apertura) + 1) if ultimo >= 0 else 0, -1])
+        self.apertura = None
+
+    # Posición de la próxima apertura sin cierre desde `posicion` (len(texto)
+    # si no hay más); cuál es queda en self.apertura
+    def siguiente(self, posicion):
+        texto = self.texto
+        proxima, apertura = len(texto), None
+        for par in self.pares:
+            if par[2] < posicion:
+                encontrada = texto.find(par[0], max(posicion, par[1]))
+                par[2] = len(texto) if encontrada == -1 else encontrada
+            if par[2] < proxima:
+                proxima, apertura = par[2], par[0]
+        self.apertura = apertura
+        return proxima
+
+
+def es_palabra_clave(palabra):
+    return palabra in PALABRAS_CLAVE
+
+
+# Tamaño (en caracteres) de cada bloque leído de un archivo o mmap. El motor
+# mantiene siempre al menos un bloque de margen por delante de la posición
+# actual, así que cualquier token más corto que TAM_BLOQUE se reconoce igual
+# que si se tuviera todo el texto en memoria.
+TAM_BLOQUE = 1 << 20
+
+
+# Motor léxico: compila todos los patrones una sola vez en una única
+# expresión regular con un grupo con nombre por tipo de token. La alternancia
+# de `re` prueba las alternativas de izquierda a derecha, así que se conserva
+# la misma prioridad que recorrer TOKENS_PYTHON en orden.
+class MotorLexico:
+    def __init__(self, tokens=TOKENS_PYTHON, palabras_clave=PALABRAS_CLAVE):
+        self.tokens = list(tokens)
+        self.palabras_clave = frozenset(palabras_clave)
+        self.aperturas = {tipo: APERTURAS_MULTILINEA[tipo] for tipo, _ in self.tokens if tipo in APERTURAS_MULTILINEA}
+        self.pares_multilinea = [par for tipo, _ in self.tokens for par in PARES_MULTILINEA.get(tipo, ())]
+        self.patron = self.compilar()
+
+    def compilar(self):
+        return re.compile('|'.join(f'(?P<{tipo}>{patron})' for tipo, patron in self.tokens))
+
+    def analizar(self, codigo_fuente):
+        return list(self.iterar(codigo_fuente))
+
+    # Genera los tokens (linea, tipo, texto) de forma perezosa. `fuente` puede
+    # ser un str, un archivo abierto (texto o binario) o un mmap.
+    def iterar(self, fuente, tam_bloque=TAM_BLOQUE):
+        if isinstance(fuente, str):
+            posicion, num_linea = 0, 1
+            sin_cierre = AperturasSinCierre(fuente, self.pares_multilinea)
+            while posicion < len(fuente):
+                limite = min(posicion + tam_bloque, len(fuente))
+                tokens, posicion, num_linea = self._escanear(fuente, posicion, limite, num_linea, sin_cierre)
+                yield from tokens
+            return
+        if not hasattr(fuente, 'read'):
+            raise TypeError(f"Fuente no soportada: {type(fuente).__name__}")
+
+        decodificador = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        posicion = 0
+        num_linea = 1
+        fin_datos = False
+        while True:
+            # Rellenar hasta tener al menos un bloque de margen por delante
+            while not fin_datos and len(buffer) - posicion < 2 * tam_bloque:
+                bloque = fuente.read(tam_bloque)
+                fin_datos = not bloque
+                if isinstance(bloque, (bytes, bytearray)):
+                    bloque = decodificador.decode(bloque, final=fin_datos)
+                buffer = buffer[posicion:] + bloque
+                posicion = 0
+
+            limite = len(buffer) if fin_datos else len(buffer) - tam_bloque
+            tokens, posicion, num_linea = self._escanear(buffer, posicion, limite, num_linea)
+            yield from tokens
+            if fin_datos and posicion >= len(buffer):
+                return
+
+    # Escanea `texto` desde `posicion` mientras los tokens empiecen antes de
+    # `limite`. Devuelve los tokens, la posición final y la línea actual.
+    # `sin_cierre` es el AperturasSinCierre de `texto` (se crea si es None).
+    def _escanear(self, texto, posicion, limite, num_linea, sin_cierre=None):
+        tokens_encontrados = []
+        agregar = tokens_encontrados.append
+        buscar = self.patron.match
+        contar = texto.count
+        palabras_clave = self.palabras_clave
+        if sin_cierre is None:
+            sin_cierre = AperturasSinCierre(texto, self.pares_multilinea)
+        proxima = sin_cierre.siguiente(posicion)
+
+        while posicion < limite:
+            if posicion >= proxima:
+                if posicion == proxima:
+                    apertura = sin_cierre.apertura
+                    agregar((num_linea, 'ERROR_LEXICO', apertura))
+                    posicion += len(apertura)
+                proxima = sin_cierre.siguiente(posicion)
+                continue
+            coincidencia = buscar(texto, posicion)
+            if coincidencia is None or coincidencia.end() == posicion:
+                # Error léxico: ningún patrón reconoce el carácter
+                agregar((num_linea, 'ERROR_LEXICO', texto[posicion]))
+                if texto[posicion] == '\n':
+                    num_linea += 1
+                posicion += 1
+                continue
+            fin = coincidencia.end()
+            token_tipo = coincidencia.lastgroup
+            if token_tipo == 'ESPACIO':
+                num_linea += contar('\n', posicion, fin)
+            else:
+                texto_token = coincidencia.group()
+                if token_tipo == 'IDENTIFICADOR' and texto_token in palabras_clave:
+                    agregar((num_linea, 'PALABRA_CLAVE', texto_token))
+                else:
+                    agregar((num_linea, token_tipo, texto_token))
+                if '\n' in texto_token:
+                    num_linea += texto_token.count('\n')
+            posicion = fin
+        return tokens_encontrados, posicion, num_linea
+
+
+# Motor que recorre las tablas de un autómata (compilador.lexico_dfa) en vez
+# de la expresión regular: gana el token más largo y no el primer patrón que
+# coincide. Las tablas se guardan en `directorio_cache` (None: no se guardan).
+class MotorDFA(MotorLexico):
+    def __init__(self, tokens=TOKENS_PYTHON, palabras_clave=PALABRAS_CLAVE, directorio_cache=DIRECTORIO_CACHE):
+        self.directorio_cache = directorio_cache
+        super().__init__(tokens, palabras_clave)
+
+    def compilar(self):
+        return PatronDFA(self.tokens, self.directorio_cache)
+
+    # Igual que MotorLexico._escanear pero con el recorrido de la tabla que
+    # escribe en columnas, que no crea un objeto por token
+    def _escanear(self, texto, posicion, limite, num_linea, sin_cierre=None):
+        tipos = [tipo for tipo, _ in self.tokens if tipo != 'ESPACIO'] + ['PALABRA_CLAVE', 'ERROR_LEXICO']
+        columnas = ([], [], [], [])
+        if sin_cierre is None:
+            sin_cierre = AperturasSinCierre(texto, self.pares_multilinea)
+        posicion, num_linea = self.patron.escanear_columnas(
+            texto, {tipo: codigo for codigo, tipo in enumerate(tipos)}, self.palabras_clave,
+            columnas, posicion, limite, num_linea, sin_cierre)
+        codigos, lineas, inicios, fines = columnas
+        tokens = [(linea, tipos[codigo], texto[inicio:fin])
+                  for codigo, linea, inicio, fin in zip(codigos, lineas, inicios, fines)]
+        return tokens, posicion, num_linea
+
+
+_motores = {}
+
+
+# Motor de un perfil de PERFILES. Con automata=False usa la expresión
+# regular (MotorLexico) en vez del autómata. Se crea una vez por perfil.
+def motor_perfil(nombre='python', automata=True):
+    if nombre not in PERFILES:
+        raise ValueError(f"Perfil desconocido: {nombre} (hay {', '.join(PERFILES)})")
+    clave = (nombre, automata)
+    if clave not in _motores:
+        tokens, palabras_clave = PERFILES[nombre]
+        _motores[clave] = (MotorDFA if automata else MotorLexico)(tokens, palabras_clave)
+    return _motores[clave]
+
+
+MOTOR_PYTHON = motor_perfil('python')
+
+
+def analizador_lexico(codigo_fuente):
+    return MOTOR_PYTHON.analizar(codigo_fuente)
+
+
+# API en streaming: recorre un str, un archivo o un mmap sin partirlo en líneas
+def iter_tokens(fuente, motor=MOTOR_PYTHON, tam_bloque=TAM_BLOQUE):
+    return motor.iterar(fuente, tam_bloque)
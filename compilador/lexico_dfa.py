@@ -0,0 +1,493 @@
+import hashlib
+import marshal
+import os
+import re
+
+# === Generador de léxicos con autómata finito determinista ===
+#
+# Convierte una lista de patrones (tipo, expresión regular) como TOKENS_PYTHON
+# en un autómata mínimo: expresión regular -> NFA de Thompson -> DFA por
+# construcción de subconjuntos -> minimización de Moore. El resultado son
+# unas pocas tablas de enteros que se guardan en disco (marshal) con el hash
+# de la especificación como nombre, así solo se generan una vez.
+#
+# Reconocer un token es recorrer la tabla carácter a carácter quedándose con
+# la última posición de aceptación (el token más largo). Si dos patrones
+# reconocen el mismo texto gana el que va antes en la lista.
+#
+# Diferencias con MotorLexico (la alternancia de `re`, donde gana el primer
+# patrón que coincide aunque sea más corto): 'android' es un identificador y
+# no OPERADOR_LOGICO 'and' + 'roid', y con el perfil C '>>' es un solo
+# OPERADOR_BITWISE. Los cuantificadores perezosos (*?, +?, ??) hacen que su
+# patrón acepte el texto más corto, como en `re`.
+#
+# Solo se admite lo que usan los perfiles: literales, '.', clases [...],
+# \s \S \d \D \w \W, grupos, '|' y los cuantificadores * + ? (también
+# perezosos). Los literales tienen que ser ASCII: cualquier carácter no ASCII
+# se trata igual que uno de los cuatro REPRESENTANTES de abajo.
+
+VERSION_DFA = 1
+DIRECTORIO_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'compilador', 'lexico')
+
+# Un carácter no ASCII solo se distingue de otro por si es espacio, dígito
+# o letra para \s, \d y \w: uno de cada clase basta para construir la tabla
+_ESPACIO, _DIGITO, _PALABRA = re.compile(r'\s'), re.compile(r'\d'), re.compile(r'\w')
+REPRESENTANTES = [chr(c) for c in range(128)] + ['\xa0', '\u0663', '\xe9', '\xbf']
+
+
+def _simbolo_no_ascii(caracter):
+    if _ESPACIO.match(caracter):
+        return 128
+    if _DIGITO.match(caracter):
+        return 129
+    return 130 if _PALABRA.match(caracter) else 131
+
+
+# --- Expresión regular -> NFA ---
+
+class _NFA:
+    def __init__(self):
+        self.vacias = []  # estado -> estados a los que se pasa sin consumir
+        self.aristas = []  # estado -> [(conjunto de símbolos, destino)]
+
+    def estado(self):
+        self.vacias.append([])
+        self.aristas.append([])
+        return len(self.vacias) - 1
+
+
+# Analizador descendente de la expresión. Cada método devuelve un fragmento
+# (inicio, fin) del NFA.
+class _Traductor:
+    def __init__(self, nfa, patron):
+        self.nfa = nfa
+        self.patron = patron
+        self.posicion = 0
+        self.perezoso = False
+
+    def error(self, mensaje):
+        raise ValueError(f"{mensaje} en la posición {self.posicion} de {self.patron!r}")
+
+    def siguiente(self):
+        return self.patron[self.posicion] if self.posicion < len(self.patron) else None
+
+    def traducir(self):
+        fragmento = self.alternativa()
+        if self.posicion < len(self.patron):
+            self.error("Paréntesis de cierre sin apertura")
+        return fragmento
+
+    def alternativa(self):
+        partes = [self.secuencia()]
+        while self.siguiente() == '|':
+            self.posicion += 1
+            partes.append(self.secuencia())
+        if len(partes) == 1:
+            return partes[0]
+        inicio, fin = self.nfa.estado(), self.nfa.estado()
+        for entrada, salida in partes:
+            self.nfa.vacias[inicio].append(entrada)
+            self.nfa.vacias[salida].append(fin)
+        return inicio, fin
+
+    def secuencia(self):
+        inicio = fin = self.nfa.estado()
+        while self.siguiente() not in (None, '|', ')'):
+            entrada, salida = self.repeticion()
+            self.nfa.vacias[fin].append(entrada)
+            fin = salida
+        return inicio, fin
+
+    def repeticion(self):
+        entrada, salida = self.atomo()
+        while self.siguiente() in ('*', '+', '?'):
+            operador = self.patron[self.posicion]
+            self.posicion += 1
+            if self.siguiente() == '?':
+                self.posicion += 1
+                self.perezoso = True
+            inicio, fin = self.nfa.estado(), self.nfa.estado()
+            self.nfa.vacias[inicio].append(entrada)
+            self.nfa.vacias[salida].append(fin)
+            if operador != '+':
+                self.nfa.vacias[inicio].append(fin)
+            if operador != '?':
+                self.nfa.vacias[salida].append(entrada)
+            entrada, salida = inicio, fin
+        if self.siguiente() == '{':
+            self.error("Repetición {m,n} no soportada")
+        return entrada, salida
+
+    def atomo(self):
+        caracter = self.siguiente()
+        if caracter == '(':
+            self.posicion += 1
+            if self.patron.startswith('?:', self.posicion):
+                self.posicion += 2
+            elif self.siguiente() == '?':
+                self.error("Grupo especial no soportado")
+            fragmento = self.alternativa()
+            if self.siguiente() != ')':
+                self.error("Falta el paréntesis de cierre")
+            self.posicion += 1
+            return fragmento
+        if caracter in ('*', '+', '?', '^', '$'):
+            self.error(f"'{caracter}' no soportado aquí")
+        inicio = self.posicion
+        if caracter == '[':
+            fin = self.patron.find(']', inicio + 2 if self.patron.startswith('[^', inicio) else inicio + 1)
+            while fin != -1 and self._escapado(fin):
+                fin = self.patron.find(']', fin + 1)
+            if fin == -1:
+                self.error("Falta el corchete de cierre")
+            self.posicion = fin + 1
+        elif caracter == '\\':
+            if self.posicion + 1 >= len(self.patron) or self.patron[self.posicion + 1].isalnum() \
+                    and self.patron[self.posicion + 1] not in 'sSdDwWntrfv':
+                self.error("Secuencia de escape no soportada")
+            self.posicion += 2
+        else:
+            if not caracter.isascii():
+                self.error("Solo se admiten literales ASCII")
+            self.posicion += 1
+        return self._caracteres(self.patron[inicio:self.posicion])
+
+    def _escapado(self, indice):
+        barras = 0
+        while self.patron[indice - 1 - barras] == '\\':
+            barras += 1
+        return barras % 2 == 1
+
+    # Fragmento que consume un carácter del conjunto descrito por `texto`
+    # (un literal, '.', una clase o un escape). El conjunto se calcula con el
+    # propio `re`, probando cada representante.
+    def _caracteres(self, texto):
+        if not texto.isascii():
+            self.error("Solo se admiten literales ASCII")
+        try:
+            patron = re.compile(texto)
+        except re.error as e:
+            self.error(f"Expresión inválida ({e})")
+        conjunto = frozenset(s for s, c in enumerate(REPRESENTANTES) if patron.fullmatch(c))
+        inicio, fin = self.nfa.estado(), self.nfa.estado()
+        self.nfa.aristas[inicio].append((conjunto, fin))
+        return inicio, fin
+
+
+# --- NFA -> DFA mínimo ---
+
+# Tablas del autómata para una lista de patrones. Devuelve un diccionario con
+#   clases        símbolo (0-131) -> clase de equivalencia
+#   transiciones  lista plana: el estado e con la clase c pasa a
+#                 transiciones[e + c]. Los estados se guardan ya multiplicados
+#                 por el número de clases; 0 es el estado muerto.
+#   aceptacion    estado -> índice del patrón que acepta (solo los que aceptan)
+#   bucles        estado -> clases con las que se queda en el mismo estado
+#   inicio        estado inicial
+def generar_tablas(tokens):
+    nfa = _NFA()
+    inicio = nfa.estado()
+    aceptaciones = {}  # estado final del NFA -> índice del patrón
+    perezosos = []  # (estado final, sus estados del NFA) de cada patrón perezoso
+    for indice, (_, patron) in enumerate(tokens):
+        primero = len(nfa.vacias)
+        traductor = _Traductor(nfa, patron)
+        entrada, salida = traductor.traducir()
+        nfa.vacias[inicio].append(entrada)
+        aceptaciones[salida] = indice
+        if traductor.perezoso:
+            perezosos.append((salida, frozenset(range(primero, len(nfa.vacias)))))
+
+    # Clases de símbolos que ningún patrón distingue
+    conjuntos = {conjunto for aristas in nfa.aristas for conjunto, _ in aristas}
+    firmas = {}
+    clases = []
+    for simbolo in range(len(REPRESENTANTES)):
+        firma = frozenset(c for c in conjuntos if simbolo in c)
+        clases.append(firmas.setdefault(firma, len(firmas)))
+    num_clases = len(firmas)
+    por_clase = [[] for _ in range(num_clases)]
+    for simbolo, clase in enumerate(clases):
+        por_clase[clase].append(simbolo)
+
+    def cierre(estados):
+        pila = list(estados)
+        visto = set(estados)
+        while pila:
+            for destino in nfa.vacias[pila.pop()]:
+                if destino not in visto:
+                    visto.add(destino)
+                    pila.append(destino)
+        acepta = min((aceptaciones[e] for e in visto if e in aceptaciones), default=-1)
+        # Un patrón perezoso que ya aceptó no sigue buscando un texto más largo
+        for final, propios in perezosos:
+            if final in visto:
+                visto -= propios - {final}
+        return frozenset(visto), acepta
+
+    # Construcción de subconjuntos (el estado 0 es el muerto)
+    muerto = frozenset()
+    estados = {muerto: 0}
+    lista = [muerto]
+    aceptacion = [-1]
+    transiciones = [[0] * num_clases]
+    primero, acepta = cierre([inicio])
+    estados[primero] = 1
+    lista.append(primero)
+    aceptacion.append(acepta)
+    transiciones.append(None)
+    pendientes = [1]
+    while pendientes:
+        numero = pendientes.pop()
+        fila = [0] * num_clases
+        for clase in range(num_clases):
+            simbolo = por_clase[clase][0]
+            destinos = {destino for e in lista[numero] for conjunto, destino in nfa.aristas[e] if simbolo in conjunto}
+            if not destinos:
+                continue
+            conjunto, acepta = cierre(destinos)
+            if conjunto not in estados:
+                estados[conjunto] = len(lista)
+                lista.append(conjunto)
+                aceptacion.append(acepta)
+                transiciones.append(None)
+                pendientes.append(estados[conjunto])
+            fila[clase] = estados[conjunto]
+        transiciones[numero] = fila
+
+    transiciones, aceptacion, inicio = _minimizar(transiciones, aceptacion, 1)
+    bucles = {}
+    for estado, fila in enumerate(transiciones):
+        propias = [clase for clase, destino in enumerate(fila) if destino == estado and estado]
+        if propias:
+            bucles[estado * num_clases] = propias
+    return {
+        'clases': clases,
+        'transiciones': [destino * num_clases for fila in transiciones for destino in fila],
+        'aceptacion': {estado * num_clases: acepta for estado, acepta in enumerate(aceptacion) if acepta >= 0},
+        'bucles': bucles,
+        'inicio': inicio * num_clases,
+    }
+
+
+# Minimización de Moore: se parte de los estados agrupados por el patrón que
+# aceptan y se separan los grupos hasta que todos sus estados van a los
+# mismos grupos con cada clase. El estado muerto queda como 0.
+def _minimizar(transiciones, aceptacion, inicio):
+    numeros = {}
+    grupo = [numeros.setdefault(acepta, len(numeros)) for acepta in aceptacion]
+    while True:
+        firmas = {}
+        nuevo = [firmas.setdefault((grupo[e], tuple(grupo[d] for d in fila)), len(firmas))
+                 for e, fila in enumerate(transiciones)]
+        if len(firmas) == len(numeros):
+            break
+        numeros = firmas
+        grupo = nuevo
+    # El estado muerto no acepta nada y no sale de sí mismo: todos los
+    # estados equivalentes a él (los que ya no pueden aceptar) caen en su grupo
+    orden = {grupo[0]: 0}
+    for e in range(len(transiciones)):
+        orden.setdefault(grupo[e], len(orden))
+    filas = [None] * len(orden)
+    aceptados = [-1] * len(orden)
+    for e, fila in enumerate(transiciones):
+        g = orden[grupo[e]]
+        if filas[g] is None:
+            filas[g] = [orden[grupo[d]] for d in fila]
+            aceptados[g] = aceptacion[e]
+    return filas, aceptados, orden[grupo[inicio]]
+
+
+# --- Caché en disco ---
+
+def clave_especificacion(tokens):
+    texto = repr((VERSION_DFA, [tuple(token) for token in tokens]))
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def cargar_tablas(tokens, directorio_cache=DIRECTORIO_CACHE):
+    if directorio_cache:
+        ruta = os.path.join(directorio_cache, f"{clave_especificacion(tokens)}.bin")
+        try:
+            with open(ruta, 'rb') as archivo:
+                return marshal.loads(archivo.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            pass  # no existe o está corrupto: se vuelve a generar
+    tablas = generar_tablas(tokens)
+    if directorio_cache:
+        try:
+            os.makedirs(directorio_cache, exist_ok=True)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as archivo:
+                archivo.write(marshal.dumps(tablas))
+            os.replace(temporal, ruta)
+        except OSError:
+            pass
+    return tablas
+
+
+# --- Reconocimiento ---
+
+# Resultado de PatronDFA.match, con la parte de la interfaz de re.Match que
+# usan los motores (end, start, group, lastgroup)
+class CoincidenciaDFA:
+    __slots__ = ('string', 'inicio', 'fin', 'lastgroup')
+
+    def __init__(self, texto, inicio, fin, tipo):
+        self.string = texto
+        self.inicio = inicio
+        self.fin = fin
+        self.lastgroup = tipo
+
+    def start(self):
+        return self.inicio
+
+    def end(self):
+        return self.fin
+
+    def group(self):
+        return self.string[self.inicio:self.fin]
+
+
+# Sustituto de la expresión regular compilada de MotorLexico: tiene match y
+# finditer, así TokenStream, LexicoIncremental y las estadísticas funcionan
+# igual con los dos motores.
+class PatronDFA:
+    def __init__(self, tokens, directorio_cache=DIRECTORIO_CACHE):
+        self.tipos = [tipo for tipo, _ in tokens]
+        tablas = cargar_tablas(tokens, directorio_cache)
+        self.transiciones = tablas['transiciones']
+        self.inicio = tablas['inicio']
+        self.aceptacion = [None] * len(self.transiciones)
+        for estado, indice in tablas['aceptacion'].items():
+            self.aceptacion[estado] = self.tipos[indice]
+        self.clases = tablas['clases']
+        self.clase_de = {chr(c): clase for c, clase in enumerate(self.clases[:128])}
+        # En los estados con bucle (dentro de un identificador, una cadena o
+        # un comentario), en cuanto se repite el estado el resto del tramo se
+        # salta de una vez con una expresión de una sola clase de caracteres.
+        # Antes de repetirlo no compensa: la mayoría de tokens son cortos.
+        self.saltos = [None] * len(self.transiciones)
+        for estado, propias in tablas['bucles'].items():
+            self.saltos[estado] = re.compile(self._expresion_clases(set(propias)) + '*').match
+
+    def _expresion_clases(self, clases):
+        ascii = ''.join(re.escape(chr(c)) for c in range(128) if self.clases[c] in clases)
+        otros = [s for s in range(128, len(REPRESENTANTES)) if self.clases[s] in clases]
+        if len(otros) == 4:
+            return f"[{ascii}\\x80-\\U0010ffff]"
+        # Intersecciones de "no ASCII" con \s, \d y \w, como clases negadas
+        no_ascii = {128: r'[^\x00-\x7f\S]', 129: r'[^\x00-\x7f\D]', 130: r'[^\x00-\x7f\W\d]',
+                    131: r'[^\x00-\x7f\s\w]'}
+        partes = ([f"[{ascii}]"] if ascii else []) + [no_ascii[s] for s in otros]
+        return f"(?:{'|'.join(partes)})" if partes else '(?!)'
+
+    def _clase(self, caracter):
+        clase = self.clases[_simbolo_no_ascii(caracter)]
+        self.clase_de[caracter] = clase
+        return clase
+
+    # Token más largo que empieza en `posicion`, o None
+    def match(self, texto, posicion=0):
+        transiciones = self.transiciones
+        aceptacion = self.aceptacion
+        saltos = self.saltos
+        clase_de = self.clase_de
+        estado = self.inicio
+        longitud = len(texto)
+        i = posicion
+        fin, tipo = posicion, None
+        while i < longitud:
+            clase = clase_de.get(texto[i])
+            if clase is None:
+                clase = self._clase(texto[i])
+            siguiente = transiciones[estado + clase]
+            if not siguiente:
+                break
+            i += 1
+            if siguiente == estado:
+                i = saltos[estado](texto, i).end()
+            estado = siguiente
+            aceptado = aceptacion[estado]
+            if aceptado is not None:
+                fin, tipo = i, aceptado
+        if tipo is None:
+            return None
+        return CoincidenciaDFA(texto, posicion, fin, tipo)
+
+    def finditer(self, texto):
+        posicion = 0
+        while posicion < len(texto):
+            coincidencia = self.match(texto, posicion)
+            if coincidencia is None:
+                posicion += 1
+                continue
+            yield coincidencia
+            posicion = coincidencia.fin
+
+    # Versión de flujo_tokens.escanear_columnas sin crear un objeto por token:
+    # recorre la tabla y agrega directamente a las columnas. `sin_cierre` es
+    # un lexico.AperturasSinCierre de `fuente` (None: no se comprueban)
+    def escanear_columnas(self, fuente, codigo_de, palabras_clave, columnas, posicion, limite, num_linea,
+                          sin_cierre=None):
+        codigos, lineas, inicios, fines = columnas
+        agregar_codigo = codigos.append
+        agregar_linea = lineas.append
+        agregar_inicio = inicios.append
+        agregar_fin = fines.append
+        contar = fuente.count
+        transiciones = self.transiciones
+        saltos = self.saltos
+        clase_de = self.clase_de
+        inicio = self.inicio
+        # Estado -> código del tipo que acepta (None: no acepta; -1: ESPACIO)
+        aceptacion = [None if tipo is None else -1 if tipo == 'ESPACIO' else codigo_de[tipo]
+                      for tipo in self.aceptacion]
+        codigo_identificador = codigo_de.get('IDENTIFICADOR')
+        codigo_clave = codigo_de['PALABRA_CLAVE']
+        codigo_error = codigo_de['ERROR_LEXICO']
+        longitud = len(fuente)
+        proxima = sin_cierre.siguiente(posicion) if sin_cierre is not None else longitud + 1
+
+        while posicion < limite:
+            if posicion >= proxima:
+                if posicion == proxima:
+                    fin = posicion + len(sin_cierre.apertura)
+                    agregar_codigo(codigo_error)
+                    agregar_linea(num_linea)
+                    agregar_inicio(posicion)
+                    agregar_fin(fin)
+                    posicion = fin
+                proxima = sin_cierre.siguiente(posicion)
+                continue
+            estado = inicio
+            i = posicion
+            fin, codigo = posicion + 1, codigo_error
+            while i < longitud:
+                clase = clase_de.get(fuente[i])
+                if clase is None:
+                    clase = self._clase(fuente[i])
+                siguiente = transiciones[estado + clase]
+                if not siguiente:
+                    break
+                i += 1
+                if siguiente == estado:
+                    i = saltos[estado](fuente, i).end()
+                estado = siguiente
+                aceptado = aceptacion[estado]
+                if aceptado is not None:
+                    fin, codigo = i, aceptado
+            if codigo == -1:
+                num_linea += contar('\n', posicion, fin)
+                posicion = fin
+                continue
+            if codigo == codigo_identificador and fuente[posicion:fin] in palabras_clave:
+                codigo = codigo_clave
+            agregar_codigo(codigo)
+            agregar_linea(num_linea)
+            agregar_inicio(posicion)
+            agregar_fin(fin)
+            num_linea += contar('\n', posicion, fin)
+            posicion = fin
+        return posicion, num_linea
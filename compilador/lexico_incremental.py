@@ -0,0 +1,187 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+from compilador.lexico import MOTOR_PYTHON, AperturasSinCierre
+
+
+# Analizador léxico incremental para el editor.
+#
+# Guarda por cada línea:
+#   tokens[L]     lista de (columna, lineas_extra, columna_fin, tipo) de los
+#                 tokens que empiezan en la línea L (lineas_extra > 0 si el
+#                 token sigue en las líneas siguientes)
+#   entrada[L]    estado del léxico al empezar la línea: columna donde se
+#                 reanuda el escaneo (len(linea) + 1 si un token la cubre entera)
+#   retroceso[L]  cuántas líneas atrás empezó el token (o espacio) que llega a
+#                 la línea L; 0 si ninguno la cruza
+#   pendiente[L]  la línea tiene una apertura multilínea sin cerrar, cuyo
+#                 resultado depende de todo el texto que viene después
+#
+# Tras una edición solo se vuelve a escanear desde la línea donde empieza el
+# token que llega a la zona editada, y se sigue hasta que el estado al entrar
+# en una línea posterior a la edición coincide con el guardado.
+class LexicoIncremental:
+    def __init__(self, motor=MOTOR_PYTHON):
+        self.motor = motor
+        self.aperturas = tuple(a for tipo, _ in motor.tokens for a in motor.aperturas.get(tipo, ()))
+        self.fuente = ''
+        self.lineas = ['']
+        self.inicios = [0]  # índice de desplazamientos: inicio de cada línea en `fuente`
+        self.tokens = [[]]
+        self.entrada = [0]
+        self.retroceso = [0]
+        self.pendiente = [False]
+
+    # Aplica el nuevo texto completo del editor. Devuelve (desde, hasta): las
+    # líneas cuyos tokens hay que volver a pintar.
+    def actualizar(self, fuente):
+        nuevas = fuente.split('\n')
+        viejas = self.lineas
+        limite = min(len(nuevas), len(viejas))
+        a = 0
+        while a < limite and nuevas[a] == viejas[a]:
+            a += 1
+        if a == len(nuevas) == len(viejas):
+            return a, a
+        a = min(a, limite - 1)
+        b = 0
+        while b < limite - a and nuevas[-1 - b] == viejas[-1 - b]:
+            b += 1
+        fin_viejo = len(viejas) - b
+        fin_nuevo = len(nuevas) - b
+        desplazamiento = fin_nuevo - fin_viejo
+
+        # Línea desde la que hay que reanudar: donde empieza el token que llega
+        # a la primera línea editada, o una apertura sin cerrar anterior.
+        desde = a - self.retroceso[a]
+        if True in self.pendiente[:desde]:
+            desde = self.pendiente.index(True)
+            desde -= self.retroceso[desde]
+        estado_desde = self.entrada[desde], self.retroceso[desde]
+
+        # Las líneas viejas reemplazadas pueden tener tokens que llegaban más abajo
+        hasta = fin_nuevo
+        for linea in range(a, fin_viejo):
+            for token in self.tokens[linea]:
+                hasta = max(hasta, linea + token[1] + desplazamiento + 1)
+
+        n = fin_nuevo - a
+        self.tokens[a:fin_viejo] = [[] for _ in range(n)]
+        self.entrada[a:fin_viejo] = [None] * n
+        self.retroceso[a:fin_viejo] = [0] * n
+        self.pendiente[a:fin_viejo] = [False] * n
+        self.entrada[desde], self.retroceso[desde] = estado_desde
+        self.fuente = fuente
+        self.lineas = nuevas
+        self.inicios = list(accumulate((len(linea) + 1 for linea in nuevas[:-1]), initial=0))
+
+        fin_escaneo, hasta_viejo = self._reescanear(desde, fin_nuevo)
+        return desde, max(hasta, hasta_viejo, fin_escaneo)
+
+    # Escanea desde el estado guardado de la línea `desde` hasta converger en
+    # una línea >= `fin_cambio`. Devuelve la línea donde paró y hasta dónde
+    # llegaban los tokens viejos que se descartaron.
+    def _reescanear(self, desde, fin_cambio):
+        fuente = self.fuente
+        inicios = self.inicios
+        lineas = self.lineas
+        num_lineas = len(lineas)
+        buscar = self.motor.patron.match
+        palabras_clave = self.motor.palabras_clave
+        multilinea = self.motor.aperturas
+        aperturas = self.aperturas
+
+        hasta = self._limpiar(desde)
+        linea = desde
+        posicion = inicios[desde] + self.entrada[desde]
+        sin_cierre = AperturasSinCierre(fuente, self.motor.pares_multilinea)
+        proxima = sin_cierre.siguiente(posicion)
+        while posicion < len(fuente):
+            if posicion > proxima:
+                proxima = sin_cierre.siguiente(posicion)
+            if posicion == proxima:
+                # Apertura sin cierre: sola como error, sin buscar el cierre
+                tipo, fin = 'ERROR_LEXICO', posicion + len(sin_cierre.apertura)
+                proxima = sin_cierre.siguiente(fin)
+            else:
+                coincidencia = buscar(fuente, posicion)
+                if coincidencia is None or coincidencia.end() == posicion:
+                    tipo, fin = 'ERROR_LEXICO', posicion + 1
+                else:
+                    tipo, fin = coincidencia.lastgroup, coincidencia.end()
+                    if tipo == 'IDENTIFICADOR' and coincidencia.group() in palabras_clave:
+                        tipo = 'PALABRA_CLAVE'
+
+            linea_fin = linea
+            while linea_fin + 1 < num_lineas and inicios[linea_fin + 1] <= fin:
+                linea_fin += 1
+            if tipo != 'ESPACIO':
+                self.tokens[linea].append((posicion - inicios[linea], linea_fin - linea, fin - inicios[linea_fin], tipo))
+                if tipo not in multilinea and fuente.startswith(aperturas, posicion):
+                    self.pendiente[linea] = True
+
+            for siguiente in range(linea + 1, linea_fin + 1):
+                if siguiente < linea_fin:
+                    columna = len(lineas[siguiente]) + 1
+                else:
+                    columna = fin - inicios[siguiente]
+                retroceso = 0 if columna == 0 else siguiente - linea
+                if siguiente >= fin_cambio and siguiente == linea_fin and self.entrada[siguiente] == columna:
+                    # Convergencia: desde aquí lo guardado sigue siendo válido
+                    self.retroceso[siguiente] = retroceso
+                    return siguiente + 1, hasta
+                hasta = max(hasta, self._limpiar(siguiente))
+                self.entrada[siguiente] = columna
+                self.retroceso[siguiente] = retroceso
+            linea = linea_fin
+            posicion = fin
+        return num_lineas, hasta
+
+    # Descarta los tokens de una línea antes de volver a escanearla. Devuelve
+    # hasta qué línea llegaban.
+    def _limpiar(self, linea):
+        hasta = linea + 1
+        for token in self.tokens[linea]:
+            hasta = max(hasta, linea + token[1] + 1)
+        self.tokens[linea] = []
+        self.pendiente[linea] = False
+        return hasta
+
+    # Token que contiene la posición (línea, columna), ambas desde 0. O(log n).
+    def token_en(self, linea, columna):
+        if not 0 <= linea < len(self.lineas):
+            return None
+        entrada = self.entrada[linea]
+        if entrada is not None and columna < entrada and self.retroceso[linea]:
+            # La posición cae dentro de un token que empezó en una línea anterior
+            origen = linea - self.retroceso[linea]
+            candidatos = self.tokens[origen][-1:]
+        else:
+            origen = linea
+            tokens = self.tokens[linea]
+            indice = bisect_right(tokens, (columna, float('inf'))) - 1
+            candidatos = tokens[indice:indice + 1] if indice >= 0 else []
+        for col, extra, col_fin, tipo in candidatos:
+            if (origen, col) <= (linea, columna) < (origen + extra, col_fin):
+                return (origen, col, origen + extra, col_fin, tipo)
+        return None
+
+    # Igual que token_en pero con un desplazamiento absoluto en el texto
+    def token_en_desplazamiento(self, desplazamiento):
+        linea = bisect_right(self.inicios, desplazamiento) - 1
+        return self.token_en(linea, desplazamiento - self.inicios[linea])
+
+    # Tokens (linea, tipo, texto) de todo el texto, como analizador_lexico
+    def __iter__(self):
+        fuente = self.fuente
+        inicios = self.inicios
+        for linea, tokens in enumerate(self.tokens):
+            for col, extra, col_fin, tipo in tokens:
+                yield (linea + 1, tipo, fuente[inicios[linea] + col:inicios[linea + extra] + col_fin])
+
+    # Tokens que empiezan en las líneas [desde, hasta), con su línea de origen
+    def tokens_en_lineas(self, desde, hasta):
+        for linea in range(desde, min(hasta, len(self.tokens))):
+            for token in self.tokens[linea]:
+                yield linea, token
+
@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from compilador.flujo_tokens import TokenStream, escanear_columnas, tipos_de
+from compilador.lexico import MOTOR_PYTHON
+
+# Por debajo de este tamaño no compensa repartir el trabajo entre procesos
+MINIMO_PARALELO = 1 << 20
+
+# Estado de cada proceso trabajador: el código fuente completo y el motor.
+# Con 'fork' se hereda del proceso padre sin copiarlo; si no, se envía una
+# vez por trabajador en el inicializador.
+_FUENTE = None
+_MOTOR = None
+
+
+def _inicializar(fuente, motor):
+    global _FUENTE, _MOTOR
+    _FUENTE, _MOTOR = fuente, motor
+
+
+def _lexar_trozo(trozo):
+    inicio, fin, num_linea = trozo
+    return escanear_columnas(_FUENTE, _MOTOR, tipos_de(_MOTOR), inicio, fin, num_linea)
+
+
+# Divide `fuente` en trozos de ~tam_trozo caracteres que empiezan siempre
+# justo después de un salto de línea. Devuelve (inicio, fin, línea inicial).
+def dividir_en_trozos(fuente, tam_trozo):
+    trozos = []
+    inicio = 0
+    num_linea = 1
+    longitud = len(fuente)
+    while inicio < longitud:
+        fin = fuente.find('\n', min(inicio + tam_trozo, longitud) - 1)
+        fin = longitud if fin == -1 else fin + 1
+        trozos.append((inicio, fin, num_linea))
+        num_linea += fuente.count('\n', inicio, fin)
+        inicio = fin
+    return trozos
+
+
+# Léxico de un solo archivo grande en varios procesos.
+#
+# Cada trozo se analiza de forma especulativa como si un token empezara en su
+# primer carácter. Al unir, si el último token del trozo anterior terminó más
+# allá del corte (p.ej. una CADENA_MULTILINEA que cruza el salto de línea), se
+# busca en el trozo siguiente el token que empieza exactamente ahí: desde ese
+# punto la salida especulativa coincide con la secuencial, porque el motor no
+# depende de nada anterior a la posición actual. Si no existe, ese trozo se
+# vuelve a analizar de forma secuencial desde donde terminó el anterior. El
+# resultado es idéntico al de TokenStream.desde_fuente.
+def flujo_tokens_paralelo(fuente, motor=MOTOR_PYTHON, trabajadores=None, tam_trozo=None):
+    trabajadores = trabajadores or os.cpu_count() or 1
+    if trabajadores == 1 or len(fuente) < MINIMO_PARALELO:
+        return TokenStream.desde_fuente(fuente, motor)
+    tam_trozo = tam_trozo or max(MINIMO_PARALELO // 4, len(fuente) // (trabajadores * 4))
+    trozos = dividir_en_trozos(fuente, tam_trozo)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _inicializar(fuente, motor)
+        opciones = {'mp_context': multiprocessing.get_context('fork')}
+    else:
+        opciones = {'initializer': _inicializar, 'initargs': (fuente, motor)}
+    try:
+        with ProcessPoolExecutor(max_workers=trabajadores, **opciones) as ejecutor:
+            resultados = list(ejecutor.map(_lexar_trozo, trozos))
+    finally:
+        _inicializar(None, None)
+
+    tipos = tipos_de(motor)
+    flujo = TokenStream(fuente, tipos)
+    posicion = 0  # donde terminó el último token ya unido
+    num_linea = 1
+    for (inicio, fin, _), resultado in zip(trozos, resultados):
+        if posicion >= fin:
+            continue  # un token del trozo anterior cubre este trozo entero
+        codigos, lineas, inicios, fines, posicion_final, linea_final = resultado
+        desde = 0
+        if posicion > inicio:
+            desde = bisect_left(inicios, posicion)
+            if desde == len(inicios) or inicios[desde] != posicion:
+                codigos, lineas, inicios, fines, posicion_final, linea_final = escanear_columnas(
+                    fuente, motor, tipos, posicion, fin, num_linea)
+                desde = 0
+        flujo.codigos.extend(codigos[desde:])
+        flujo.lineas.extend(lineas[desde:])
+        flujo.inicios.extend(inicios[desde:])
+        flujo.fines.extend(fines[desde:])
+        posicion, num_linea = posicion_final, linea_final
+    return flujo
+
+
+def analizador_lexico_paralelo(codigo_fuente, motor=MOTOR_PYTHON, trabajadores=None, tam_trozo=None):
+    return list(flujo_tokens_paralelo(codigo_fuente, motor, trabajadores, tam_trozo))
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from compilador.flujo_tokens import TokenStream
+from compilador.intermedio import generar_codigo_intermedio
+from compilador.lexico import MOTOR_PYTHON
+from compilador.optimizador import optimizar_codigo
+from compilador.semantico import analizador_semantico
+
+EXTENSIONES = ('.py',)
+# Límites del léxico para cada archivo: uno enorme o que tarda demasiado se
+# informa como error en vez de frenar el lote
+MAX_CARACTERES = 32 << 20
+MAX_SEGUNDOS_LEXICO = 30
+
+
+# Recorre `raiz` y devuelve las rutas de los archivos a analizar en orden
+# estable (directorios y archivos ordenados por nombre).
+def listar_archivos(raiz, extensiones=EXTENSIONES):
+    rutas = []
+    for directorio, subdirectorios, archivos in os.walk(raiz):
+        subdirectorios.sort()
+        for nombre in sorted(archivos):
+            if nombre.endswith(tuple(extensiones)):
+                rutas.append(os.path.join(directorio, nombre))
+    return rutas
+
+
+# Texto de un error de un archivo para el resumen. Los de lectura y los
+# límites del léxico ya se explican solos; del resto se pone también el tipo
+# (un KeyError('x') solo diría 'x').
+def mensaje_error(error):
+    if isinstance(error, (OSError, ValueError)):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+# Trabajo de cada proceso: léxico, semántico, intermedio y optimización de un archivo.
+# Devuelve solo un resumen para no pagar el envío de todos los tokens entre procesos.
+def analizar_archivo(ruta, motor=MOTOR_PYTHON, max_caracteres=MAX_CARACTERES, max_segundos=MAX_SEGUNDOS_LEXICO):
+    try:
+        with open(ruta, encoding='utf-8', errors='replace') as archivo:
+            codigo_fuente = archivo.read()
+        tokens = TokenStream.desde_fuente(codigo_fuente, motor, max_caracteres, max_segundos)
+        errores = analizador_semantico(tokens)
+        codigo_intermedio = generar_codigo_intermedio(tokens)
+        codigo_optimizado = optimizar_codigo(codigo_intermedio)
+    except Exception as e:  # un archivo que hace fallar una etapa no para todo el lote
+        return {'ruta': ruta, 'error': mensaje_error(e), 'tokens': 0, 'errores_semanticos': 0,
+                'intermedio': 0, 'optimizado': 0}
+    return {'ruta': ruta, 'error': None, 'tokens': len(tokens), 'errores_semanticos': len(errores),
+            'intermedio': len(codigo_intermedio), 'optimizado': len(codigo_optimizado)}
+
+
+# Analiza todos los archivos de `raiz` repartiéndolos entre `trabajadores`
+# procesos en lotes de `tam_lote` archivos. Los resultados llegan en el mismo
+# orden que listar_archivos, sin importar qué proceso terminó primero.
+def analizar_directorio(raiz, trabajadores=None, tam_lote=16, extensiones=EXTENSIONES, motor=MOTOR_PYTHON,
+                        max_caracteres=MAX_CARACTERES, max_segundos=MAX_SEGUNDOS_LEXICO):
+    rutas = listar_archivos(raiz, extensiones)
+    inicio = time.perf_counter()
+    trabajo = partial(analizar_archivo, motor=motor, max_caracteres=max_caracteres, max_segundos=max_segundos)
+    if trabajadores == 1:
+        resultados = list(map(trabajo, rutas))
+    else:
+        with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+            resultados = list(ejecutor.map(trabajo, rutas, chunksize=max(1, tam_lote)))
+    duracion = time.perf_counter() - inicio
+
+    total_tokens = sum(r['tokens'] for r in resultados)
+    resumen = {
+        'archivos': len(resultados),
+        'tokens': total_tokens,
+        'segundos': duracion,
+        'archivos_por_segundo': len(resultados) / duracion if duracion else 0.0,
+        'tokens_por_segundo': total_tokens / duracion if duracion else 0.0,
+    }
+    return resultados, resumen
+
+
+def mostrar_resultados_lote(resultados, resumen):
+    for r in resultados:
+        if r['error']:
+            print(f"{r['ruta']}: ERROR {r['error']}")
+        else:
+            print(f"{r['ruta']}: {r['tokens']} tokens, {r['errores_semanticos']} errores semánticos, "
+                  f"{r['intermedio']} instrucciones -> {r['optimizado']} optimizadas")
+    print("---------------------------------------------")
+    print(f"{resumen['archivos']} archivos, {resumen['tokens']} tokens en {resumen['segundos']:.2f} s "
+          f"({resumen['archivos_por_segundo']:.1f} archivos/s, {resumen['tokens_por_segundo']:,.0f} tokens/s)")
@@ -0,0 +1,445 @@
+# === Máquina virtual de pila ===
+#
+# Ejecuta el código intermedio directamente. Antes de empezar se prepara una
+# lista de (manejador, argumento) por instrucción con los operandos ya
+# resueltos (la constante, el nombre, la función del operador o la posición
+# de destino de un salto) y sin las etiquetas; el bucle principal solo busca
+# el manejador en esa lista y lo llama. Las llamadas a funciones definidas en
+# el programa no usan la pila de Python: el bucle guarda el marco que llama y
+# sigue con el de la función, así la recursión no está limitada por Python.
+
+import builtins
+import importlib
+import sys
+
+from compilador.intermedio import FUNCIONES_OPERADOR, FUNCIONES_UNARIAS, OP, OPCODES, OPERADORES, OPERANDO_OPCODE
+
+PREDEFINIDAS = builtins.__dict__
+FALTA = object()
+RETORNO = -1  # lo devuelve el manejador de RETURN
+LLAMADA = -2  # lo devuelven CALL y CALL_KW al llamar a una FuncionMaquina
+
+
+# El programa usa algo que la máquina no sabe ejecutar (clases, try, lambda...)
+class NoSoportado(Exception):
+    def __init__(self, descripcion, linea):
+        super().__init__(f"La máquina virtual no soporta {descripcion} (línea {linea})")
+        self.descripcion = descripcion
+        self.linea = linea
+
+
+# Error del programa ejecutado, con la línea del código fuente donde ocurrió
+class ErrorEjecucion(Exception):
+    def __init__(self, error, linea):
+        super().__init__(f"línea {linea}: {type(error).__name__}: {error}")
+        self.error = error
+        self.linea = linea
+
+
+# Estado de una llamada: su pila de operandos, sus variables y la función que
+# se está ejecutando (None en el módulo, donde `locales` y `globales` son el
+# mismo diccionario). `llamada` es el marco nuevo que deja CALL para el bucle.
+class Marco:
+    __slots__ = ('maquina', 'pila', 'locales', 'globales', 'funcion', 'llamada')
+
+    def __init__(self, maquina, locales, globales, funcion=None):
+        self.maquina = maquina
+        self.pila = []
+        self.locales = locales
+        self.globales = globales
+        self.funcion = funcion
+        self.llamada = None
+
+
+# Función definida con def: al llamarla se ejecuta su cuerpo en un marco nuevo.
+# `locales` son los nombres que asigna (calculados al generar el código),
+# `declaradas` los que declara global y `exterior` el marco de la función
+# donde se definió, donde se buscan las variables que no son suyas.
+class FuncionMaquina:
+    __slots__ = ('maquina', 'nombre', 'parametros', 'por_defecto', 'inicio', 'globales',
+                 'locales', 'declaradas', 'exterior')
+
+    def __init__(self, maquina, nombre, parametros, por_defecto, inicio, globales,
+                 locales=frozenset(), declaradas=frozenset(), exterior=None):
+        self.maquina = maquina
+        self.nombre = nombre
+        self.parametros = parametros
+        self.por_defecto = por_defecto
+        self.inicio = inicio
+        self.globales = globales
+        self.locales = locales
+        self.declaradas = declaradas
+        self.exterior = exterior
+
+    def __repr__(self):
+        return f"<función {self.nombre}>"
+
+    def __call__(self, *argumentos, **con_nombre):
+        return self.maquina._ejecutar(self.inicio, self.marco(argumentos, con_nombre))
+
+    # Marco de una llamada con los parámetros ya asignados
+    def marco(self, argumentos, con_nombre):
+        parametros = self.parametros
+        if len(argumentos) > len(parametros):
+            raise TypeError(f"{self.nombre}() recibe {len(parametros)} argumentos pero se le pasaron {len(argumentos)}")
+        locales = dict(zip(parametros, argumentos))
+        for nombre, valor in con_nombre.items():
+            if nombre not in parametros or nombre in locales:
+                raise TypeError(f"{self.nombre}() argumento inesperado o repetido: '{nombre}'")
+            locales[nombre] = valor
+        if len(locales) < len(parametros):
+            primero_con_defecto = len(parametros) - len(self.por_defecto)
+            for i, nombre in enumerate(parametros):
+                if nombre in locales:
+                    continue
+                if i < primero_con_defecto:
+                    raise TypeError(f"{self.nombre}() falta el argumento '{nombre}'")
+                locales[nombre] = self.por_defecto[i - primero_con_defecto]
+        return Marco(self.maquina, locales, self.globales, self)
+
+
+# --- manejadores: (pila, marco, argumento) -> None, o la posición a la que saltar ---
+
+def _nada(pila, marco, argumento):
+    pass
+
+
+def _load(pila, marco, valor):
+    pila.append(valor)
+
+
+def _load_var(pila, marco, nombre):
+    valor = marco.locales.get(nombre, FALTA)
+    if valor is FALTA:
+        valor = _no_local(marco, nombre)
+    pila.append(valor)
+
+
+# Valor de una variable que no está en las locales del marco: si la función
+# la asigna es una local todavía sin valor; si no, se busca en las funciones
+# donde se definió, en las globales y en las predefinidas
+def _no_local(marco, nombre):
+    funcion = marco.funcion
+    if funcion is not None:
+        if nombre in funcion.locales:
+            raise UnboundLocalError(f"cannot access local variable '{nombre}' where it is not associated with a value")
+        exterior = None if nombre in funcion.declaradas else funcion.exterior
+        while exterior is not None:
+            if nombre in exterior.funcion.locales:
+                valor = exterior.locales.get(nombre, FALTA)
+                if valor is FALTA:
+                    raise NameError(f"cannot access free variable '{nombre}' where it is not associated "
+                                    f"with a value in enclosing scope")
+                return valor
+            exterior = exterior.funcion.exterior
+    valor = marco.globales.get(nombre, FALTA)
+    if valor is FALTA:
+        valor = PREDEFINIDAS.get(nombre, FALTA)
+        if valor is FALTA:
+            raise NameError(f"name '{nombre}' is not defined")
+    return valor
+
+
+def _store(pila, marco, nombre):
+    marco.locales[nombre] = pila.pop()
+
+
+def _store_global(pila, marco, nombre):
+    marco.globales[nombre] = pila.pop()
+
+
+def _delete(pila, marco, nombre):
+    try:
+        del marco.locales[nombre]
+    except KeyError:
+        raise NameError(f"name '{nombre}' is not defined") from None
+
+
+def _oper(pila, marco, funcion):
+    derecha = pila.pop()
+    pila[-1] = funcion(pila[-1], derecha)
+
+
+def _unary(pila, marco, funcion):
+    pila[-1] = funcion(pila[-1])
+
+
+# Las funciones del propio programa no se llaman desde aquí: se deja su marco
+# en marco.llamada y el bucle de _ejecutar sigue con él
+def _call(pila, marco, n):
+    if n:
+        argumentos = pila[-n:]
+        del pila[-n:]
+    else:
+        argumentos = ()
+    funcion = pila[-1]
+    if type(funcion) is FuncionMaquina and funcion.maquina is marco.maquina:
+        marco.llamada = funcion.marco(argumentos, {})
+        return LLAMADA
+    pila[-1] = funcion(*argumentos)
+
+
+def _call_kw(pila, marco, argumento):
+    posicionales, nombres = argumento
+    valores = pila[-len(nombres):]
+    del pila[-len(nombres):]
+    argumentos = pila[len(pila) - posicionales:]
+    del pila[len(pila) - posicionales:]
+    funcion = pila[-1]
+    if type(funcion) is FuncionMaquina and funcion.maquina is marco.maquina:
+        marco.llamada = funcion.marco(argumentos, dict(zip(nombres, valores)))
+        return LLAMADA
+    pila[-1] = funcion(*argumentos, **dict(zip(nombres, valores)))
+
+
+def _attr(pila, marco, nombre):
+    pila[-1] = getattr(pila[-1], nombre)
+
+
+def _store_attr(pila, marco, nombre):
+    objeto = pila.pop()
+    setattr(objeto, nombre, pila.pop())
+
+
+def _indices(pila, n):
+    if n == 1:
+        return pila.pop()
+    indices = tuple(pila[-n:])
+    del pila[-n:]
+    return indices
+
+
+def _index(pila, marco, n):
+    indice = _indices(pila, n)
+    pila[-1] = pila[-1][indice]
+
+
+def _store_index(pila, marco, n):
+    indice = _indices(pila, n)
+    objeto = pila.pop()
+    objeto[indice] = pila.pop()
+
+
+def _elementos(pila, n):
+    if not n:
+        return []
+    elementos = pila[-n:]
+    del pila[-n:]
+    return elementos
+
+
+def _build_list(pila, marco, n):
+    pila.append(_elementos(pila, n))
+
+
+def _build_tuple(pila, marco, n):
+    pila.append(tuple(_elementos(pila, n)))
+
+
+def _build_dict(pila, marco, n):
+    elementos = _elementos(pila, 2 * n)
+    pila.append(dict(zip(elementos[::2], elementos[1::2])))
+
+
+def _build_slice(pila, marco, n):
+    pila.append(slice(*_elementos(pila, n)))
+
+
+def _unpack(pila, marco, n):
+    valores = tuple(pila.pop())
+    if len(valores) != n:
+        raise ValueError(f"se esperaban {n} valores para desempaquetar, hay {len(valores)}")
+    pila.extend(reversed(valores))  # el primer STORE se lleva el primer valor
+
+
+def _pop(pila, marco, argumento):
+    pila.pop()
+
+
+def _dup(pila, marco, argumento):
+    pila.append(pila[-1])
+
+
+def _return(pila, marco, argumento):
+    return RETORNO
+
+
+def _import(pila, marco, nombre):
+    pila.append(importlib.import_module(nombre))
+
+
+def _import_from(pila, marco, nombre):
+    modulo = pila[-1]
+    try:
+        pila.append(getattr(modulo, nombre))
+    except AttributeError:
+        pila.append(importlib.import_module(f"{modulo.__name__}.{nombre}"))  # submódulo sin cargar
+
+
+def _jump(pila, marco, destino):
+    return destino
+
+
+def _pop_jump_if_false(pila, marco, destino):
+    if not pila.pop():
+        return destino
+
+
+def _pop_jump_if_true(pila, marco, destino):
+    if pila.pop():
+        return destino
+
+
+def _jump_if_false_or_pop(pila, marco, destino):
+    if not pila[-1]:
+        return destino
+    pila.pop()
+
+
+def _jump_if_true_or_pop(pila, marco, destino):
+    if pila[-1]:
+        return destino
+    pila.pop()
+
+
+def _get_iter(pila, marco, argumento):
+    pila[-1] = iter(pila[-1])
+
+
+def _for_iter(pila, marco, destino):
+    valor = next(pila[-1], FALTA)
+    if valor is FALTA:
+        pila.pop()
+        return destino
+    pila.append(valor)
+
+
+def _make_function(pila, marco, argumento):
+    nombre, parametros, num_por_defecto, inicio, locales, declaradas = argumento
+    por_defecto = tuple(_elementos(pila, num_por_defecto))
+    exterior = marco if marco.funcion is not None else None
+    pila.append(FuncionMaquina(marco.maquina, nombre, parametros, por_defecto, inicio, marco.globales,
+                               locales, declaradas, exterior))
+
+
+def _raise(pila, marco, n):
+    if n:
+        raise pila.pop()
+    raise RuntimeError("No hay ninguna excepción activa para relanzar")
+
+
+def _unsupported(pila, marco, descripcion):
+    raise NotImplementedError(descripcion)
+
+
+# Tabla de despacho: opcode -> manejador
+MANEJADORES = [None] * len(OPCODES)
+for _nombre, _manejador in {
+    'NOP': _nada, 'LABEL': _nada, 'LOAD': _load, 'LOAD_VAR': _load_var, 'STORE': _store,
+    'STORE_GLOBAL': _store_global, 'DELETE': _delete, 'OPER': _oper, 'COMPARE': _oper, 'UNARY': _unary,
+    'CALL': _call, 'CALL_KW': _call_kw, 'ATTR': _attr, 'STORE_ATTR': _store_attr,
+    'INDEX': _index, 'STORE_INDEX': _store_index, 'BUILD_LIST': _build_list, 'BUILD_TUPLE': _build_tuple,
+    'BUILD_DICT': _build_dict, 'BUILD_SLICE': _build_slice, 'UNPACK': _unpack, 'POP': _pop, 'DUP': _dup,
+    'RETURN': _return, 'IMPORT': _import, 'IMPORT_FROM': _import_from, 'JUMP': _jump,
+    'POP_JUMP_IF_FALSE': _pop_jump_if_false, 'POP_JUMP_IF_TRUE': _pop_jump_if_true,
+    'JUMP_IF_FALSE_OR_POP': _jump_if_false_or_pop, 'JUMP_IF_TRUE_OR_POP': _jump_if_true_or_pop,
+    'GET_ITER': _get_iter, 'FOR_ITER': _for_iter, 'MAKE_FUNCTION': _make_function, 'RAISE': _raise,
+    'UNSUPPORTED': _unsupported,
+}.items():
+    MANEJADORES[OP[_nombre]] = _manejador
+
+
+# Primera construcción no soportada del código: (descripción, línea) o None
+def comprobar_soporte(codigo):
+    if OP['UNSUPPORTED'] not in codigo.opcodes:
+        return None
+    i = bytes(codigo.opcodes).index(OP['UNSUPPORTED'])  # también si es un memoryview
+    return codigo.argumento(i), codigo.lineas[i]
+
+
+class MaquinaVirtual:
+    def __init__(self, codigo):
+        no_soportado = comprobar_soporte(codigo)
+        if no_soportado is not None:
+            raise NoSoportado(*no_soportado)
+        self.programa, self.lineas = self._preparar(codigo)
+
+    # Quita las etiquetas y resuelve los operandos; los saltos quedan como
+    # posiciones dentro del programa preparado
+    @staticmethod
+    def _preparar(codigo):
+        etiqueta, nop = OP['LABEL'], OP['NOP']
+        posiciones = {}
+        posicion = 0
+        for opcode, operando in zip(codigo.opcodes, codigo.operandos):
+            if opcode == etiqueta:
+                posiciones[operando] = posicion
+            elif opcode != nop:
+                posicion += 1
+
+        programa, lineas = [], []
+        for i, opcode in enumerate(codigo.opcodes):
+            if opcode == etiqueta or opcode == nop:
+                continue
+            tipo = OPERANDO_OPCODE[opcode]
+            operando = codigo.operandos[i]
+            if tipo == 'etiqueta':
+                argumento = posiciones[operando]
+            elif tipo == 'operador':
+                operador = OPERADORES[operando]
+                argumento = FUNCIONES_UNARIAS.get(operador) if opcode == OP['UNARY'] else FUNCIONES_OPERADOR.get(operador)
+            else:
+                argumento = codigo.argumento(i)
+            if opcode == OP['MAKE_FUNCTION']:
+                nombre, parametros, num_por_defecto, inicio, locales, declaradas = argumento
+                argumento = (nombre, parametros, num_por_defecto, posiciones[inicio],
+                             frozenset(locales), frozenset(declaradas))
+            programa.append((MANEJADORES[opcode], argumento))
+            lineas.append(codigo.lineas[i])
+        # Al terminar el módulo: return None
+        programa += [(_load, None), (_return, None)]
+        lineas += [lineas[-1] if lineas else 0] * 2
+        return programa, lineas
+
+    def _ejecutar(self, pc, marco):
+        programa = self.programa
+        pila = marco.pila
+        llamadas = []  # (posición de vuelta, marco) de cada llamada en curso
+        limite = sys.getrecursionlimit()
+        try:
+            while True:
+                manejador, argumento = programa[pc]
+                pc += 1
+                destino = manejador(pila, marco, argumento)
+                if destino is not None:
+                    if destino >= 0:
+                        pc = destino
+                    elif destino == RETORNO:
+                        if not llamadas:
+                            return pila.pop()
+                        valor = pila.pop()
+                        pc, marco = llamadas.pop()
+                        pila = marco.pila
+                        pila[-1] = valor  # en lugar de la función llamada
+                    else:
+                        if len(llamadas) >= limite:
+                            raise RecursionError("maximum recursion depth exceeded")
+                        llamadas.append((pc, marco))
+                        marco.llamada, marco = None, marco.llamada
+                        pila = marco.pila
+                        pc = marco.funcion.inicio
+        except ErrorEjecucion:
+            raise
+        except Exception as e:
+            raise ErrorEjecucion(e, self.lineas[pc - 1]) from e
+
+    # Ejecuta el programa y devuelve sus variables globales
+    def ejecutar(self, globales=None):
+        if globales is None:
+            globales = {'__name__': '__main__'}
+        self._ejecutar(0, Marco(self, globales, globales))
+        return globales
+
+
+def ejecutar_codigo_intermedio(codigo, globales=None):
+    return MaquinaVirtual(codigo).ejecutar(globales)
@@ -0,0 +1,366 @@
+# === Optimización de código intermedio ===
+
+import time
+
+from compilador.intermedio import (FUNCIONES_OPERADOR, FUNCIONES_UNARIAS, OP, OPERADORES, SALTOS, CodigoIntermedio,
+                                   copiar_columna, efecto_pila)
+
+# Máximo de iteraciones del gestor de pases (normalmente converge en 2 o 3)
+MAX_ITERACIONES = 20
+# No se pliegan constantes que darían resultados enormes (2 ** 10 ** 9, 'a' * 10 ** 9)
+MAX_TAMANO_CONSTANTE = 4096
+
+# 1 is 1 depende de la implementación: no se pliega
+OPERACIONES = {operador: funcion for operador, funcion in FUNCIONES_OPERADOR.items()
+               if operador not in ('is', 'is not')}
+OPERACIONES_UNARIAS = FUNCIONES_UNARIAS
+TIPOS_PLEGABLES = (int, float, bool, str, type(None))
+
+# Con x entero: x op c == x, c op x == x, x op c == c (y c op x == c)
+NEUTRO_DERECHA = {'+': 0, '-': 0, '*': 1, '//': 1, '**': 1, '|': 0, '^': 0, '<<': 0, '>>': 0}
+NEUTRO_IZQUIERDA = {'+': 0, '*': 1, '|': 0, '^': 0}
+ABSORBENTE = {'*': 0, '&': 0}
+
+LOAD, LOAD_VAR, STORE, POP, DUP = OP['LOAD'], OP['LOAD_VAR'], OP['STORE'], OP['POP'], OP['DUP']
+OPER, COMPARE, UNARY, DELETE = OP['OPER'], OP['COMPARE'], OP['UNARY'], OP['DELETE']
+POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE, JUMP = OP['POP_JUMP_IF_FALSE'], OP['POP_JUMP_IF_TRUE'], OP['JUMP']
+# Instrucciones que solo apilan un valor, sin efectos secundarios. LOAD_VAR
+# no: si la variable no existe lanza NameError y quitarla lo taparía.
+PUROS = frozenset([LOAD])
+# Instrucciones tras las que el código puede leer cualquier variable (una
+# llamada puede leer globales) o que empiezan o terminan un bloque básico
+BARRERAS = frozenset([OP['CALL'], OP['CALL_KW'], OP['IMPORT'], OP['RETURN'], OP['RAISE'],
+                      OP['LABEL'], OP['UNSUPPORTED']]) | SALTOS
+
+
+# Lista de instrucciones de trabajo: los pases leen las columnas del código
+# y escriben aquí, mirando hacia atrás lo ya emitido (ventana de mirilla).
+class _Salida:
+    __slots__ = ('opcodes', 'operandos', 'lineas')
+
+    def __init__(self):
+        self.opcodes, self.operandos, self.lineas = [], [], []
+
+    def emitir(self, opcode, operando, linea):
+        self.opcodes.append(opcode)
+        self.operandos.append(operando)
+        self.lineas.append(linea)
+
+    def quitar(self, cuantas):
+        del self.opcodes[-cuantas:], self.operandos[-cuantas:], self.lineas[-cuantas:]
+
+    def codigo(self, original):
+        codigo = _con_tablas(original)
+        codigo.opcodes.extend(self.opcodes)
+        codigo.operandos.extend(self.operandos)
+        codigo.lineas.extend(self.lineas)
+        return codigo
+
+
+def _con_tablas(original):
+    codigo = CodigoIntermedio()
+    codigo.constantes, codigo.nombres = original.constantes, original.nombres
+    codigo._indice_constantes, codigo._indice_nombres = original._indice_constantes, original._indice_nombres
+    return codigo
+
+
+def _es_constante(salida, desde_final, constantes):
+    return salida.opcodes[-desde_final] == LOAD and type(constantes[salida.operandos[-desde_final]]) in TIPOS_PLEGABLES
+
+
+def _demasiado_grande(operador, a, b):
+    if operador == '**' and isinstance(b, (int, float)) and abs(b) > 64 and isinstance(a, (int, float)) and abs(a) > 1:
+        return True
+    if operador == '<<' and isinstance(b, int) and b > MAX_TAMANO_CONSTANTE:
+        return True
+    if operador == '*' and isinstance(a, str) and isinstance(b, int) and len(a) * b > MAX_TAMANO_CONSTANTE:
+        return True
+    if operador == '*' and isinstance(b, str) and isinstance(a, int) and len(b) * a > MAX_TAMANO_CONSTANTE:
+        return True
+    return False
+
+
+def _valido(resultado):
+    if type(resultado) not in TIPOS_PLEGABLES:
+        return False
+    if isinstance(resultado, int) and resultado.bit_length() > MAX_TAMANO_CONSTANTE:
+        return False
+    return not (isinstance(resultado, str) and len(resultado) > MAX_TAMANO_CONSTANTE)
+
+
+# LOAD a, LOAD b, OPER op -> LOAD (a op b); también COMPARE y UNARY. Como
+# mira lo ya emitido, las expresiones anidadas se pliegan en una sola pasada.
+def plegar_constantes(codigo):
+    salida = _Salida()
+    constantes = codigo.constantes
+    cambios = 0
+    for opcode, operando, linea in zip(codigo.opcodes, codigo.operandos, codigo.lineas):
+        operador = OPERADORES[operando] if opcode in (OPER, COMPARE, UNARY) else None
+        if (opcode in (OPER, COMPARE) and operador in OPERACIONES and len(salida.opcodes) >= 2
+                and _es_constante(salida, 1, constantes) and _es_constante(salida, 2, constantes)):
+            a, b = constantes[salida.operandos[-2]], constantes[salida.operandos[-1]]
+            if not _demasiado_grande(operador, a, b):
+                try:
+                    resultado = OPERACIONES[operador](a, b)
+                except Exception:
+                    resultado = None  # p.ej. 1 / 0: se deja para que falle al ejecutarse
+                else:
+                    if _valido(resultado):
+                        salida.quitar(2)
+                        salida.emitir(LOAD, codigo.constante(resultado), linea)
+                        cambios += 1
+                        continue
+        elif (opcode == UNARY and operador in OPERACIONES_UNARIAS and salida.opcodes
+                and _es_constante(salida, 1, constantes)):
+            try:
+                resultado = OPERACIONES_UNARIAS[operador](constantes[salida.operandos[-1]])
+            except Exception:
+                pass
+            else:
+                if _valido(resultado):
+                    salida.quitar(1)
+                    salida.emitir(LOAD, codigo.constante(resultado), linea)
+                    cambios += 1
+                    continue
+        salida.emitir(opcode, operando, linea)
+    return (salida.codigo(codigo) if cambios else codigo), cambios
+
+
+# Valor en la pila simulada del pase algebraico: tipo estático (o None si no
+# se sabe), posición en la salida donde empieza el código que lo calcula (o
+# None), si calcularlo no tiene efectos y la constante, si lo es.
+DESCONOCIDO = (None, None, False, None)
+# Operaciones que con dos enteros dan otro entero (** no: 2 ** -1 es float)
+OPERACIONES_ENTERAS = frozenset(['+', '-', '*', '//', '%', '<<', '>>', '&', '|', '^'])
+# Con enteros nunca fallan (// y % sí: división por cero), así que si se quita
+# el cálculo el programa hace lo mismo
+OPERACIONES_TOTALES = frozenset(['+', '-', '*', '&', '|', '^'])
+# Instrucciones tras las que no se sabe qué hay en la pila
+REINICIAN_PILA = BARRERAS | {OP['FOR_ITER'], OP['UNPACK'], OP['IMPORT_FROM'], OP['DELETE']}
+
+
+def _tipo_resultado(opcode, operador, operandos):
+    tipos = [valor[0] for valor in operandos]
+    if opcode == COMPARE or (opcode == UNARY and operador == 'not'):
+        return bool
+    if opcode == OPER and operador in OPERACIONES_ENTERAS and tipos == [int, int]:
+        return int
+    if opcode == UNARY and operador in ('-', '+', '~') and tipos == [int]:
+        return int
+    return None
+
+
+def _es_entero(valor, constante):
+    return valor[0] is int and valor[3] is not None and valor[3] == constante
+
+
+# x + 0, x * 1, 0 + x, 1 * x -> x;  x * 0, 0 * x -> 0. Solo cuando se sabe
+# que x es un entero: con True * 1 (da 1), -0.0 + 0 (da 0.0) o lista * 0
+# cambiaría el resultado. Los tipos salen de simular la pila: constantes,
+# operaciones entre enteros y variables asignadas antes en el mismo bloque.
+def simplificar_algebra(codigo):
+    salida = _Salida()
+    constantes = codigo.constantes
+    pila = []
+    tipos_variables = {}  # tipo conocido de cada variable dentro del bloque básico
+    cambios = 0
+
+    def sacar():
+        return pila.pop() if pila else DESCONOCIDO
+
+    for opcode, operando, linea in zip(codigo.opcodes, codigo.operandos, codigo.lineas):
+        if opcode == OPER:
+            operador = OPERADORES[operando]
+            derecha = sacar()
+            izquierda = sacar()
+            inicio = izquierda[1]
+            resultado = None
+            final = len(salida.opcodes) - 1
+            if (izquierda[0] is int and operador in NEUTRO_DERECHA and derecha[1] == final
+                    and _es_entero(derecha, NEUTRO_DERECHA[operador])):
+                # quitar el LOAD de la constante de la derecha
+                salida.quitar(1)
+                resultado = izquierda
+            elif (derecha[0] is int and operador in NEUTRO_IZQUIERDA and inicio is not None
+                  and derecha[1] == inicio + 1 and _es_entero(izquierda, NEUTRO_IZQUIERDA[operador])):
+                # quitar el LOAD de la constante de la izquierda, que está justo antes de x
+                del salida.opcodes[inicio], salida.operandos[inicio], salida.lineas[inicio]
+                resultado = (derecha[0], inicio, derecha[2], derecha[3])
+            elif (operador in ABSORBENTE and inicio is not None and izquierda[0] is int and derecha[0] is int
+                  and izquierda[2] and derecha[2]
+                  and (_es_entero(izquierda, ABSORBENTE[operador]) or _es_entero(derecha, ABSORBENTE[operador]))):
+                cero = ABSORBENTE[operador]
+                salida.quitar(len(salida.opcodes) - inicio)
+                salida.emitir(LOAD, codigo.constante(cero), linea)
+                resultado = (int, inicio, True, cero)
+            if resultado is not None:
+                pila.append(resultado)
+                cambios += 1
+                continue
+            tipo = _tipo_resultado(opcode, operador, [izquierda, derecha])
+            puro = tipo is int and operador in OPERACIONES_TOTALES and izquierda[2] and derecha[2]
+            pila.append((tipo, inicio, puro, None))
+            salida.emitir(opcode, operando, linea)
+            continue
+
+        posicion = len(salida.opcodes)
+        salida.emitir(opcode, operando, linea)
+        if opcode in REINICIAN_PILA:
+            pila.clear()
+            tipos_variables.clear()
+        elif opcode == LOAD:
+            valor = constantes[operando]
+            pila.append((type(valor), posicion, True, valor))
+        elif opcode == LOAD_VAR:
+            pila.append((tipos_variables.get(operando), posicion, True, None))
+        elif opcode == STORE:
+            tipo = sacar()[0]
+            if tipo is None:
+                tipos_variables.pop(operando, None)
+            else:
+                tipos_variables[operando] = tipo
+        elif opcode == OP['STORE_GLOBAL']:
+            sacar()
+            tipos_variables.pop(operando, None)
+        elif opcode == DUP:
+            # las dos copias dependen del mismo código: ninguna se puede quitar
+            valor = sacar()
+            pila += [(valor[0], None, False, valor[3])] * 2
+        elif opcode in (COMPARE, UNARY):
+            operandos = [sacar() for _ in range(2 if opcode == COMPARE else 1)][::-1]
+            tipo = _tipo_resultado(opcode, OPERADORES[operando], operandos)
+            puro = all(valor[0] is int and valor[2] for valor in operandos)  # entre enteros no falla
+            pila.append((tipo, operandos[0][1], puro, None))
+        else:
+            saca, mete = efecto_pila(opcode, operando, constantes)
+            for _ in range(saca):
+                sacar()
+            pila.extend([DESCONOCIDO] * mete)
+    return (salida.codigo(codigo) if cambios else codigo), cambios
+
+
+# Mirilla de cargas y almacenamientos redundantes:
+#   STORE x, LOAD_VAR x   -> DUP, STORE x (no vuelve a buscar x)
+#   LOAD/DUP, POP         -> nada (valor que nadie usa)
+# LOAD_VAR x, STORE x (x = x) y LOAD_VAR x, POP se dejan: fallan si x no
+# tiene valor.
+#   LOAD c, POP_JUMP_IF_FALSE/TRUE -> nada o JUMP (while True, if 0)
+def mirilla(codigo):
+    salida = _Salida()
+    cambios = 0
+    for opcode, operando, linea in zip(codigo.opcodes, codigo.operandos, codigo.lineas):
+        if salida.opcodes:
+            anterior, operando_anterior = salida.opcodes[-1], salida.operandos[-1]
+            if opcode == LOAD_VAR and anterior == STORE and operando_anterior == operando:
+                salida.quitar(1)
+                salida.emitir(DUP, 0, linea)
+                salida.emitir(STORE, operando, linea)
+                cambios += 1
+                continue
+            if opcode == POP and (anterior in PUROS or anterior == DUP):
+                salida.quitar(1)
+                cambios += 1
+                continue
+            if opcode in (POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE) and anterior == LOAD:
+                salida.quitar(1)
+                if bool(codigo.constantes[operando_anterior]) == (opcode == POP_JUMP_IF_TRUE):
+                    salida.emitir(JUMP, operando, linea)
+                cambios += 1
+                continue
+        salida.emitir(opcode, operando, linea)
+    return (salida.codigo(codigo) if cambios else codigo), cambios
+
+
+# Dentro de cada bloque básico, un STORE x seguido de otro STORE x sin
+# ninguna lectura de x en medio es inútil: se cambia por POP (el valor se
+# sigue calculando por si tiene efectos) y la mirilla quita lo que sobre.
+# Se recorre hacia atrás; las llamadas cuentan como lectura de todo.
+def eliminar_almacenamientos_muertos(codigo):
+    opcodes = codigo.opcodes
+    operandos = codigo.operandos
+    nuevos = codigo.opcodes[:]  # array('B') copiado
+    sobrescritos = set()
+    cambios = 0
+    for i in range(len(opcodes) - 1, -1, -1):
+        opcode = opcodes[i]
+        if opcode == STORE:
+            if operandos[i] in sobrescritos:
+                nuevos[i] = POP
+                cambios += 1
+            else:
+                sobrescritos.add(operandos[i])
+        elif opcode == LOAD_VAR or opcode == DELETE:
+            sobrescritos.discard(operandos[i])
+        elif opcode in BARRERAS:
+            sobrescritos.clear()
+    if not cambios:
+        return codigo, 0
+    resultado = _con_tablas(codigo)
+    resultado.opcodes = nuevos
+    resultado.operandos = codigo.operandos[:]
+    resultado.lineas = codigo.lineas[:]
+    return resultado, cambios
+
+
+PASES = [
+    ('Plegado de constantes', plegar_constantes),
+    ('Simplificación algebraica', simplificar_algebra),
+    ('Mirilla load/store', mirilla),
+    ('Almacenamientos muertos', eliminar_almacenamientos_muertos),
+]
+
+
+# Gestor de pases: aplica todos los pases en orden hasta que una vuelta
+# completa no cambia nada. Devuelve el código optimizado y un informe con el
+# tiempo, los cambios y las instrucciones eliminadas por cada pase.
+def optimizar(codigo_intermedio, pases=PASES, max_iteraciones=MAX_ITERACIONES):
+    # Tablas propias: plegar añade constantes y no debe tocar el código original
+    codigo = CodigoIntermedio()
+    codigo.constantes = list(codigo_intermedio.constantes)
+    codigo.nombres = list(codigo_intermedio.nombres)
+    codigo._indice_constantes = dict(codigo_intermedio._indice_constantes)
+    codigo._indice_nombres = dict(codigo_intermedio._indice_nombres)
+    codigo.opcodes = copiar_columna(codigo_intermedio.opcodes)
+    codigo.operandos = copiar_columna(codigo_intermedio.operandos)
+    codigo.lineas = copiar_columna(codigo_intermedio.lineas)
+
+    informe = {
+        'instrucciones_antes': len(codigo),
+        'instrucciones_despues': len(codigo),
+        'iteraciones': 0,
+        'tiempo': 0.0,
+        'pases': {nombre: {'tiempo': 0.0, 'cambios': 0, 'eliminadas': 0} for nombre, _ in pases},
+    }
+    inicio_total = time.perf_counter()
+    for _ in range(max_iteraciones):
+        informe['iteraciones'] += 1
+        cambios_vuelta = 0
+        for nombre, pase in pases:
+            antes = len(codigo)
+            inicio = time.perf_counter()
+            codigo, cambios = pase(codigo)
+            estadistica = informe['pases'][nombre]
+            estadistica['tiempo'] += time.perf_counter() - inicio
+            estadistica['cambios'] += cambios
+            estadistica['eliminadas'] += antes - len(codigo)
+            cambios_vuelta += cambios
+        if not cambios_vuelta:
+            break
+    informe['tiempo'] = time.perf_counter() - inicio_total
+    informe['instrucciones_despues'] = len(codigo)
+    return codigo, informe
+
+
+def optimizar_codigo(codigo_intermedio):
+    return optimizar(codigo_intermedio)[0]
+
+
+def imprimir_informe(informe):
+    antes, despues = informe['instrucciones_antes'], informe['instrucciones_despues']
+    reduccion = 100 * (antes - despues) / antes if antes else 0.0
+    lineas = [f"Instrucciones: {antes} -> {despues} ({reduccion:.1f}% menos) "
+              f"en {informe['iteraciones']} iteraciones, {informe['tiempo'] * 1000:.2f} ms"]
+    for nombre, estadistica in informe['pases'].items():
+        lineas.append(f"  {nombre}: {estadistica['cambios']} cambios, {estadistica['eliminadas']} instrucciones "
+                      f"eliminadas, {estadistica['tiempo'] * 1000:.2f} ms")
+    return lineas
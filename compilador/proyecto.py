@@ -0,0 +1,457 @@
+# === Construcción incremental de proyectos ===
+#
+# construir_proyecto(raiz) pasa todos los archivos de un directorio por las
+# mismas etapas que analizar_directorio (léxico, semántico, intermedio y
+# optimización), pero guarda lo calculado en disco para que la siguiente vez
+# solo se vuelva a hacer lo que cambió. En el directorio de la caché:
+#
+#   indice.bin  (marshal) por archivo: mtime, tamaño y hash del contenido,
+#               sus dependencias y su resultado; por contenido (hash): el
+#               resumen de sus etapas y en qué construcción se usó por última vez
+#   objetos/    un artefacto .cart por contenido con tokens, tabla de
+#               símbolos, código intermedio y optimizado (ver artefactos)
+#
+# Un archivo con el mismo mtime y tamaño que la vez anterior ni se lee. Si
+# cambió pero su hash ya está en la caché (se deshizo un cambio, se copió el
+# archivo) tampoco se procesa.
+#
+# Las etapas de un archivo solo dependen de su contenido; lo que depende de
+# los demás es el enlace: un nombre que llega con `from m import *` desde un
+# módulo del proyecto no es un error. Las sentencias import de cada archivo
+# (sacadas de sus tokens) forman el grafo de dependencias, y cuando un
+# archivo cambia se vuelven a enlazar él y todos los que dependen de él,
+# directa o indirectamente.
+#
+# La caché tiene un tamaño máximo (max_bytes): al pasarse se borran primero
+# los objetos que hace más construcciones que no se usan, aunque no haya
+# cambiado nada (p.ej. al bajar --max-mb). Los de la construcción actual no
+# se borran nunca: sus rutas salen en los resultados. Un archivo cuyo objeto
+# se borró se vuelve a procesar la próxima vez.
+
+import marshal
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import compress
+
+from compilador.artefactos import EXTENSION, VERSION_ARTEFACTO, guardar_artefacto
+from compilador.cache import hash_fuente, version_compilador
+from compilador.flujo_tokens import TokenStream
+from compilador.intermedio import VERSION_IR, generar_codigo_intermedio
+from compilador.lexico import MOTOR_PYTHON
+from compilador.lotes import EXTENSIONES, MAX_CARACTERES, MAX_SEGUNDOS_LEXICO, mensaje_error
+from compilador.optimizador import optimizar_codigo
+from compilador.semantico import construir_tabla_simbolos, mensajes_errores
+from compilador.sintactico import analizador_sintactico
+
+VERSION_PROYECTO = 1
+DIRECTORIO_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'compilador', 'proyectos')
+MAX_BYTES = 256 << 20
+
+
+# (ruta relativa a `raiz`, mtime en ns, tamaño) de cada archivo, en el mismo
+# orden que lotes.listar_archivos
+def explorar(raiz, extensiones=EXTENSIONES):
+    extensiones = tuple(extensiones)
+    archivos = []
+
+    def recorrer(relativo):
+        try:
+            with os.scandir(os.path.join(raiz, relativo)) as entradas:
+                entradas = sorted(entradas, key=lambda entrada: entrada.name)
+        except OSError:
+            return
+        subdirectorios = []
+        for entrada in entradas:
+            if entrada.is_dir():
+                if not entrada.is_symlink():  # os.walk tampoco entra en ellos
+                    subdirectorios.append(entrada.name)
+            elif entrada.name.endswith(extensiones):
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue
+                archivos.append((os.path.join(relativo, entrada.name), estado.st_mtime_ns, estado.st_size))
+        for nombre in subdirectorios:
+            recorrer(os.path.join(relativo, nombre))
+
+    recorrer('')
+    return archivos
+
+
+# ('a.b.c', False) para a/b/c.py; ('a.b', True) para a/b/__init__.py
+def nombre_modulo(relativo):
+    partes = os.path.splitext(relativo)[0].split(os.sep)
+    es_paquete = partes[-1] == '__init__'
+    if es_paquete:
+        partes.pop()
+    return '.'.join(partes), es_paquete
+
+
+# Sentencias import de un TokenStream: lista de (módulo, nombres). En
+# `import a.b` nombres es None; en `from ..m import x, *` el módulo conserva
+# los puntos del principio y nombres es ('x', '*').
+def importaciones(flujo):
+    fuente, tipos = flujo.fuente, flujo.tipos
+    if 'import' not in fuente or 'PALABRA_CLAVE' not in tipos:
+        return []
+    codigos, lineas, inicios, fines = flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines
+    identificador = tipos.index('IDENTIFICADOR') if 'IDENTIFICADOR' in tipos else -1
+    total = len(flujo)
+    resultado = []
+
+    def texto(k):
+        return fuente[inicios[k]:fines[k]] if k < total else ''
+
+    def nombre_con_puntos(k):
+        inicio = k
+        while texto(k) == '.':
+            k += 1
+        while k < total and codigos[k] == identificador:
+            k += 1
+            if texto(k) != '.' or k + 1 >= total or codigos[k + 1] != identificador:
+                break
+            k += 1
+        return ''.join(texto(i) for i in range(inicio, k)), k
+
+    # Como en correccion: solo se miran las palabras clave
+    clave = tipos.index('PALABRA_CLAVE')
+    tabla = bytes(1 if codigo == clave else 0 for codigo in range(256))
+    for j in compress(range(total), codigos.tobytes().translate(tabla)):
+        palabra = texto(j)
+        if palabra not in ('import', 'from'):
+            continue
+        # Solo al principio de una sentencia: no "yield from" ni "raise e from None"
+        if j and lineas[j - 1] == lineas[j] and texto(j - 1) not in (';', ':'):
+            continue
+        if palabra == 'import':
+            k = j + 1
+            while True:
+                modulo, k = nombre_con_puntos(k)
+                if modulo:
+                    resultado.append((modulo, None))
+                if texto(k) == 'as':
+                    k += 2
+                if texto(k) != ',':
+                    break
+                k += 1
+            continue
+        modulo, k = nombre_con_puntos(j + 1)
+        if not modulo or texto(k) != 'import':
+            continue
+        k += 1
+        if texto(k) == '(':
+            k += 1
+        nombres = []
+        while texto(k) == '*' or k < total and codigos[k] == identificador:
+            nombres.append(texto(k))
+            k += 1
+            if texto(k) == 'as':
+                k += 2
+            if texto(k) != ',':
+                break
+            k += 1
+        resultado.append((modulo, tuple(nombres)))
+    return resultado
+
+
+# Nombre absoluto de `modulo` importado desde el módulo `actual`
+def modulo_absoluto(modulo, actual, es_paquete):
+    sin_puntos = modulo.lstrip('.')
+    nivel = len(modulo) - len(sin_puntos)
+    if not nivel:
+        return modulo
+    partes = actual.split('.') if actual else []
+    if not es_paquete:
+        partes.pop()
+    del partes[max(0, len(partes) - (nivel - 1)):]
+    if sin_puntos:
+        partes.append(sin_puntos)
+    return '.'.join(partes)
+
+
+# (dependencias, estrellas) de un archivo: rutas de los archivos del
+# proyecto que importa y de los que importa con `from m import *`.
+# `modulos` es nombre de módulo -> ruta relativa.
+def resolver_importaciones(relativo, lista, modulos):
+    actual, es_paquete = nombre_modulo(relativo)
+    dependencias = {}
+    estrellas = {}
+    for modulo, nombres in lista:
+        absoluto = modulo_absoluto(modulo, actual, es_paquete)
+        partes = absoluto.split('.') if absoluto else []
+        # Importar a.b.c ejecuta también a y a.b
+        candidatos = ['.'.join(partes[:n]) for n in range(1, len(partes) + 1)]
+        if nombres:
+            candidatos += [f"{absoluto}.{nombre}" if absoluto else nombre for nombre in nombres if nombre != '*']
+            if '*' in nombres and absoluto in modulos:
+                estrellas[modulos[absoluto]] = True
+        for candidato in candidatos:
+            ruta = modulos.get(candidato)
+            if ruta is not None:
+                dependencias[ruta] = True
+    dependencias.pop(relativo, None)
+    estrellas.pop(relativo, None)
+    return tuple(dependencias), tuple(estrellas)
+
+
+# Trabajo de cada proceso: todas las etapas de un código fuente; guarda el
+# artefacto en `destino` y devuelve el resumen que va al índice. El léxico
+# tiene los mismos límites que en lotes.
+def procesar_fuente(trabajo, motor=MOTOR_PYTHON):
+    codigo_fuente, destino = trabajo
+    try:
+        flujo = TokenStream.desde_fuente(codigo_fuente, motor, MAX_CARACTERES, MAX_SEGUNDOS_LEXICO)
+        arbol = analizador_sintactico(flujo)
+        tabla = construir_tabla_simbolos(arbol)
+        intermedio = generar_codigo_intermedio(arbol)
+        optimizado = optimizar_codigo(intermedio)
+        tamano = guardar_artefacto(destino, flujo, tabla, intermedio, optimizado)
+    except Exception as e:  # un archivo que hace fallar una etapa no para todo el lote
+        return {'error': mensaje_error(e), 'tamano': 0, 'uso': 0, 'tokens': 0, 'intermedio': 0, 'optimizado': 0,
+                'importaciones': [], 'exportados': (), 'errores': {}}
+    return {'error': None, 'tamano': tamano, 'uso': 0, 'tokens': len(flujo), 'intermedio': len(intermedio),
+            'optimizado': len(optimizado), 'importaciones': importaciones(flujo),
+            # Lo que se lleva un `from m import *` (sin __all__: lo que no empieza por _)
+            'exportados': tuple(nombre for nombre in tabla.modulo.simbolos if not nombre.startswith('_')),
+            'errores': tabla.errores}
+
+
+# Índice y objetos en disco de un proyecto (un directorio por raíz)
+class CacheProyecto:
+    def __init__(self, raiz, directorio_cache=DIRECTORIO_CACHE, max_bytes=MAX_BYTES, motor=MOTOR_PYTHON):
+        self.directorio = os.path.join(directorio_cache, hash_fuente(os.path.abspath(raiz)))
+        self.ruta_indice = os.path.join(self.directorio, 'indice.bin')
+        self.directorio_objetos = os.path.join(self.directorio, 'objetos')
+        self.max_bytes = max_bytes
+        # Lo guardado deja de servir si cambian los formatos, los patrones del
+        # léxico o el código de las etapas
+        especificacion = repr((motor.tokens, sorted(motor.palabras_clave)))
+        self.version = (f"{VERSION_PROYECTO}-ir{VERSION_IR}-cart{VERSION_ARTEFACTO}-{hash_fuente(especificacion)}"
+                        f"-{version_compilador()}")
+        self.indice = self.cargar()
+
+    def cargar(self):
+        try:
+            with open(self.ruta_indice, 'rb') as archivo:
+                indice = marshal.loads(archivo.read())
+            if indice.get('version') == self.version:
+                return indice
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            pass  # no existe o está corrupto: se empieza de cero
+        return {'version': self.version, 'construccion': 0, 'archivos': {}, 'objetos': {}}
+
+    def guardar(self):
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            temporal = f"{self.ruta_indice}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as archivo:
+                archivo.write(marshal.dumps(self.indice))
+            os.replace(temporal, self.ruta_indice)
+        except OSError:
+            pass  # sin índice la próxima construcción empieza de cero
+
+    def ruta_objeto(self, clave):
+        return os.path.join(self.directorio_objetos, clave + EXTENSION)
+
+    def ocupado(self):
+        return sum(objeto['tamano'] for objeto in self.indice['objetos'].values())
+
+    # Borra los objetos usados hace más tiempo hasta quedar en max_bytes,
+    # salvo los usados en la construcción `actual`; devuelve cuántos borró
+    def expulsar(self, actual=None):
+        objetos = self.indice['objetos']
+        sobrante = self.ocupado() - self.max_bytes
+        if sobrante <= 0:
+            return 0
+        expulsados = 0
+        for clave in sorted(objetos, key=lambda clave: objetos[clave]['uso']):
+            if sobrante <= 0 or objetos[clave]['uso'] == actual:
+                break
+            sobrante -= objetos.pop(clave)['tamano']
+            expulsados += 1
+            try:
+                os.remove(self.ruta_objeto(clave))
+            except OSError:
+                pass
+        return expulsados
+
+
+def _leer(ruta):
+    with open(ruta, encoding='utf-8', errors='replace') as archivo:
+        return archivo.read()
+
+
+# Mensajes de error de un archivo ya enlazado: los nombres sin definir que
+# trae algún `from m import *` del proyecto (o los de m, si m hace lo mismo)
+# no cuentan
+def _enlazar(objeto, estrellas, estrellas_de, objeto_de):
+    errores = objeto['errores']
+    if estrellas and errores:
+        disponibles = set()
+        vistos = set(estrellas)
+        pendientes = list(estrellas)
+        while pendientes:
+            ruta = pendientes.pop()
+            otro = objeto_de(ruta)
+            if otro is not None:
+                disponibles.update(otro['exportados'])
+            for siguiente in estrellas_de.get(ruta, ()):
+                if siguiente not in vistos:
+                    vistos.add(siguiente)
+                    pendientes.append(siguiente)
+        errores = {nombre: error for nombre, error in errores.items() if nombre not in disponibles}
+    return mensajes_errores(errores)
+
+
+# Construye `raiz` usando y actualizando la caché. Devuelve (resultados,
+# resumen) como analizar_directorio; cada resultado dice además si el archivo
+# se procesó o se enlazó en esta construcción y dónde está su artefacto.
+def construir_proyecto(raiz, directorio_cache=DIRECTORIO_CACHE, max_bytes=MAX_BYTES, trabajadores=None,
+                       tam_lote=16, extensiones=EXTENSIONES, motor=MOTOR_PYTHON):
+    inicio = time.perf_counter()
+    cache = CacheProyecto(raiz, directorio_cache, max_bytes, motor)
+    indice = cache.indice
+    anteriores, objetos = indice['archivos'], indice['objetos']
+    construccion = indice['construccion'] + 1
+    archivos = explorar(raiz, extensiones)
+
+    # 1. Hash de lo que tiene otro mtime o tamaño; se procesa cada contenido
+    #    que no esté en la caché (una vez aunque lo tengan varios archivos)
+    hashes = {}
+    cambiados = set()
+    pendientes = {}  # hash -> código fuente
+    errores_lectura = {}
+    modificado = anteriores.keys() != {relativo for relativo, _, _ in archivos}
+    for relativo, mtime, tamano in archivos:
+        anterior = anteriores.get(relativo)
+        fuente = None
+        try:
+            if anterior is not None and anterior[0] == mtime and anterior[1] == tamano:
+                clave = anterior[2]
+            else:
+                fuente = _leer(os.path.join(raiz, relativo))
+                clave = hash_fuente(fuente)
+                modificado = True
+            if clave not in objetos and clave not in pendientes:
+                pendientes[clave] = fuente if fuente is not None else _leer(os.path.join(raiz, relativo))
+        except OSError as e:
+            errores_lectura[relativo] = e.strerror
+            continue
+        hashes[relativo] = clave
+        if anterior is None or anterior[2] != clave or clave in pendientes:
+            cambiados.add(relativo)
+
+    trabajos = [(fuente, cache.ruta_objeto(clave)) for clave, fuente in pendientes.items()]
+    trabajo = partial(procesar_fuente, motor=motor)
+    if trabajos:
+        os.makedirs(cache.directorio_objetos, exist_ok=True)
+    if trabajadores == 1 or len(trabajos) < 2:
+        resumenes = list(map(trabajo, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+            resumenes = list(ejecutor.map(trabajo, trabajos, chunksize=max(1, tam_lote)))
+    fallidos = {}  # los errores no se guardan: se vuelve a intentar la próxima vez
+    for clave, resumen in zip(pendientes, resumenes):
+        if resumen['error'] is None:
+            objetos[clave] = resumen
+        else:
+            fallidos[clave] = resumen
+
+    def objeto_de(relativo):
+        clave = hashes.get(relativo)
+        return objetos.get(clave) or fallidos.get(clave)
+
+    # 2. Grafo de dependencias y enlace de lo que cambió y de sus dependientes
+    enlazados = {}
+    dependencias = {relativo: anteriores[relativo][3:5] for relativo in hashes if relativo in anteriores}
+    if modificado or cambiados:
+        modulos = {}
+        for relativo in hashes:
+            modulos.setdefault(nombre_modulo(relativo)[0], relativo)
+        for relativo in hashes:
+            nuevas = resolver_importaciones(relativo, objeto_de(relativo)['importaciones'], modulos)
+            if dependencias.get(relativo) != nuevas:
+                dependencias[relativo] = nuevas
+                cambiados.add(relativo)  # un módulo importado apareció o desapareció
+        dependientes = {}
+        for relativo, (directas, _) in dependencias.items():
+            for ruta in directas:
+                dependientes.setdefault(ruta, []).append(relativo)
+        estrellas_de = {relativo: estrellas for relativo, (_, estrellas) in dependencias.items() if estrellas}
+        por_enlazar = list(cambiados)
+        vistos = set(cambiados)
+        while por_enlazar:
+            relativo = por_enlazar.pop()
+            enlazados[relativo] = _enlazar(objeto_de(relativo), dependencias[relativo][1], estrellas_de, objeto_de)
+            for dependiente in dependientes.get(relativo, ()):
+                if dependiente not in vistos:
+                    vistos.add(dependiente)
+                    por_enlazar.append(dependiente)
+
+    # 3. Resultados e índice nuevo
+    nuevos = {}
+    resultados = []
+    total_tokens = 0
+    for relativo, mtime, tamano in archivos:
+        ruta = os.path.join(raiz, relativo)
+        if relativo in errores_lectura:
+            resultados.append({'ruta': ruta, 'error': errores_lectura[relativo], 'tokens': 0,
+                               'errores_semanticos': 0, 'intermedio': 0, 'optimizado': 0,
+                               'procesado': False, 'enlazado': False, 'artefacto': None})
+            continue
+        clave = hashes[relativo]
+        objeto = objeto_de(relativo)
+        mensajes = enlazados[relativo] if relativo in enlazados else anteriores[relativo][5]
+        nuevos[relativo] = (mtime, tamano, clave) + dependencias[relativo] + (mensajes,)
+        if clave in objetos:
+            objetos[clave]['uso'] = construccion
+        total_tokens += objeto['tokens']
+        resultados.append({'ruta': ruta, 'error': objeto['error'], 'tokens': objeto['tokens'],
+                           'errores_semanticos': len(mensajes), 'mensajes': mensajes,
+                           'intermedio': objeto['intermedio'], 'optimizado': objeto['optimizado'],
+                           'procesado': clave in pendientes, 'enlazado': relativo in enlazados,
+                           'artefacto': cache.ruta_objeto(clave) if clave in objetos else None})
+
+    expulsados = 0
+    if modificado or enlazados or pendientes or cache.ocupado() > max_bytes:
+        indice['archivos'] = nuevos
+        indice['construccion'] = construccion
+        expulsados = cache.expulsar(construccion)
+        cache.guardar()
+    duracion = time.perf_counter() - inicio
+
+    resumen = {
+        'archivos': len(resultados),
+        'procesados': len(pendientes),
+        'enlazados': len(enlazados),
+        'expulsados': expulsados,
+        'bytes_cache': cache.ocupado(),
+        'tokens': total_tokens,
+        'segundos': duracion,
+        'archivos_por_segundo': len(resultados) / duracion if duracion else 0.0,
+    }
+    return resultados, resumen
+
+
+# Líneas de texto de una construcción: los archivos procesados o enlazados
+# (todos con todos=True), sus errores y un resumen
+def imprimir_construccion(resultados, resumen, todos=False):
+    lineas = []
+    for r in resultados:
+        if not (todos or r['procesado'] or r['enlazado'] or r['error']):
+            continue
+        if r['error']:
+            lineas.append(f"{r['ruta']}: ERROR {r['error']}")
+            continue
+        estado = "procesado" if r['procesado'] else "enlazado" if r['enlazado'] else "sin cambios"
+        lineas.append(f"{r['ruta']}: {estado}, {r['tokens']} tokens, {r['errores_semanticos']} errores semánticos, "
+                      f"{r['intermedio']} instrucciones -> {r['optimizado']} optimizadas")
+        lineas.extend(f"    {mensaje}" for mensaje in r['mensajes'])
+    lineas.append("---------------------------------------------")
+    lineas.append(f"{resumen['archivos']} archivos: {resumen['procesados']} procesados, "
+                  f"{resumen['enlazados']} enlazados en {resumen['segundos']:.2f} s; "
+                  f"caché {resumen['bytes_cache'] / (1 << 20):.1f} MiB"
+                  + (f", {resumen['expulsados']} objetos expulsados" if resumen['expulsados'] else ""))
+    return lineas
@@ -0,0 +1,75 @@
+from compilador.lexico import MOTOR_PYTHON
+from compilador.lexico_incremental import LexicoIncremental
+
+# Colores por tipo de token para el editor
+COLORES = {
+    'PALABRA_CLAVE': '#0000CD',
+    'COMENTARIO_LINEA': '#808080',
+    'COMENTARIO_BLOQUE': '#808080',
+    'CADENA': '#008000',
+    'CADENA_MULTILINEA': '#008000',
+    'NUMERO': '#B22222',
+    'OPERADOR_LOGICO': '#8B008B',
+    'ERROR_LEXICO': '#FF0000',
+    'DESCONOCIDO': '#FF0000',
+}
+
+
+# Resaltado de sintaxis en vivo para un tk.Text / ScrolledText. Cada edición
+# solo vuelve a analizar las líneas afectadas (LexicoIncremental) y solo
+# repinta esas líneas. Opcionalmente muestra en `etiqueta` el token bajo el cursor.
+class ResaltadorSintaxis:
+    def __init__(self, text, motor=MOTOR_PYTHON, etiqueta=None, retardo_ms=20):
+        self.text = text
+        self.etiqueta = etiqueta
+        self.retardo_ms = retardo_ms
+        self.lexico = LexicoIncremental(motor)
+        self._programado = None
+
+        for tipo, color in COLORES.items():
+            text.tag_configure(tipo, foreground=color)
+        text.tag_configure('ERROR_LEXICO', underline=True)
+        text.bind('<<Modified>>', self._al_modificar, add='+')
+        text.bind('<KeyRelease>', self._mostrar_token, add='+')
+        text.bind('<ButtonRelease-1>', self._mostrar_token, add='+')
+        self.actualizar()
+
+    def _al_modificar(self, evento=None):
+        if not self.text.edit_modified():
+            return
+        self.text.edit_modified(False)
+        # Agrupar ráfagas de teclas en una sola actualización
+        if self._programado is not None:
+            self.text.after_cancel(self._programado)
+        self._programado = self.text.after(self.retardo_ms, self.actualizar)
+
+    def actualizar(self):
+        self._programado = None
+        desde, hasta = self.lexico.actualizar(self.text.get('1.0', 'end-1c'))
+        if desde >= hasta:
+            return
+        inicio, fin = f"{desde + 1}.0", f"{hasta + 1}.0"
+        for tipo in COLORES:
+            self.text.tag_remove(tipo, inicio, fin)
+        for linea, (col, extra, col_fin, tipo) in self.lexico.tokens_en_lineas(desde, hasta):
+            if tipo in COLORES:
+                self.text.tag_add(tipo, f"{linea + 1}.{col}", f"{linea + extra + 1}.{col_fin}")
+        self._mostrar_token()
+
+    def token_en_cursor(self):
+        linea, columna = map(int, self.text.index('insert').split('.'))
+        return self.lexico.token_en(linea - 1, columna)
+
+    def _mostrar_token(self, evento=None):
+        if self.etiqueta is None:
+            return
+        token = self.token_en_cursor()
+        if token is None:
+            self.etiqueta.config(text="")
+            return
+        linea, col, linea_fin, col_fin, tipo = token
+        texto = self.text.get(f"{linea + 1}.{col}", f"{linea_fin + 1}.{col_fin}")
+        if len(texto) > 40:
+            texto = texto[:37] + "..."
+        self.etiqueta.config(text=f"Línea {linea + 1}: {tipo} -> {texto!r}")
+
@@ -0,0 +1,199 @@
+# === Análisis semántico ===
+
+import builtins
+
+from compilador.sintactico import (Asignacion, Atributo, Binaria, Clase, Coleccion, Compuesta, Funcion,
+                                   Importar, Nombre, Para, Programa, Simple, Unaria, analizador_sintactico)
+
+# Como mucho se informa de este número de identificadores; el resto va en un resumen
+MAX_ERRORES = 100
+PREDEFINIDOS = frozenset(dir(builtins)) | {'__file__', '__name__', '__builtins__', '__path__'}
+
+
+# Un ámbito: módulo, función, clase, lambda o comprensión. `simbolos` es el
+# diccionario nombre -> línea de la definición; `libres` guarda los usos que
+# no se pudieron resolver todavía (en una función un nombre puede definirse
+# después de usarse, o ser global y definirse más abajo en el módulo).
+class Ambito:
+    __slots__ = ('nombre', 'padre', 'simbolos', 'libres')
+
+    def __init__(self, nombre, padre=None):
+        self.nombre = nombre
+        self.padre = padre
+        self.simbolos = {}
+        self.libres = []
+
+    def buscar(self, nombre):
+        ambito = self
+        while ambito is not None:
+            if nombre in ambito.simbolos:
+                return ambito
+            ambito = ambito.padre
+        return None
+
+
+# Tabla de símbolos construida en una sola pasada sobre el árbol sintáctico.
+# Cada nombre sin definir se cuenta una vez en `errores` (nombre -> [primera
+# línea, número de usos]), así que el tamaño del resultado depende de los
+# identificadores distintos y no del número de tokens.
+class TablaSimbolos:
+    def __init__(self):
+        self.modulo = Ambito('<modulo>')
+        self.ambitos = [self.modulo]
+        self.errores = {}
+
+    def _error(self, nombre, linea):
+        error = self.errores.get(nombre)
+        if error is None:
+            self.errores[nombre] = [linea, 1]
+        else:
+            error[0] = min(error[0], linea)
+            error[1] += 1
+
+    def _usar(self, nombre, linea, ambito):
+        if ambito.buscar(nombre) is not None or nombre in PREDEFINIDOS:
+            return
+        if ambito is self.modulo:
+            self._error(nombre, linea)  # en el módulo el orden importa
+        else:
+            ambito.libres.append((nombre, linea))
+
+    # Al salir de un ámbito sus usos pendientes pasan al padre, salvo los que
+    # se definieron más abajo dentro del mismo ámbito.
+    def _cerrar(self, ambito):
+        padre = ambito.padre
+        for nombre, linea in ambito.libres:
+            if nombre in ambito.simbolos or padre.buscar(nombre) is not None:
+                continue
+            padre.libres.append((nombre, linea))
+        ambito.libres = []
+
+    def _nuevo_ambito(self, nombre, padre):
+        ambito = Ambito(nombre, padre)
+        self.ambitos.append(ambito)
+        return ambito
+
+    def construir(self, arbol):
+        modulo = self.modulo
+        # Pila de tareas: ('visitar', nodo, ámbito), ('definir', objetivo, ámbito),
+        # ('clausula', nodo, ámbito) o ('cerrar', ámbito). Sin recursión.
+        pila = [('visitar', hijo, modulo) for hijo in reversed(arbol.cuerpo)]
+        while pila:
+            tarea = pila.pop()
+            accion = tarea[0]
+            if accion == 'cerrar':
+                self._cerrar(tarea[1])
+                continue
+            nodo, ambito = tarea[1], tarea[2]
+
+            if accion == 'definir':
+                if isinstance(nodo, Nombre):
+                    ambito.simbolos.setdefault(nodo.id, nodo.linea)
+                elif isinstance(nodo, Coleccion):
+                    pila.extend(('definir', elemento, ambito) for elemento in nodo.elementos)
+                elif isinstance(nodo, Unaria):
+                    pila.append(('definir', nodo.operando, ambito))  # a, *resto = ...
+                elif isinstance(nodo, Binaria) and nodo.operador in ('=', ':'):
+                    # parámetro con valor por defecto o anotación: el valor se evalúa fuera
+                    pila.append(('definir', nodo.izquierda, ambito))
+                    pila.append(('visitar', nodo.derecha, ambito.padre or ambito))
+                else:
+                    pila.append(('visitar', nodo, ambito))  # a.b = 1, a[0] = 1: son usos de a
+                continue
+
+            if accion == 'clausula':
+                # for x in y / if c dentro de una comprensión, en orden
+                if isinstance(nodo, Binaria) and nodo.operador in ('for', 'if'):
+                    pila.append(('visitar' if nodo.operador == 'if' else 'clausula', nodo.derecha, ambito))
+                    pila.append(('clausula', nodo.izquierda, ambito))
+                elif isinstance(nodo, Binaria) and nodo.operador == 'in':
+                    pila.append(('definir', nodo.izquierda, ambito))
+                    pila.append(('visitar', nodo.derecha, ambito))
+                else:
+                    pila.append(('visitar', nodo, ambito))
+                continue
+
+            if isinstance(nodo, Nombre):
+                self._usar(nodo.id, nodo.linea, ambito)
+            elif isinstance(nodo, Asignacion):
+                pila.append(('definir', nodo.objetivo, ambito))
+                if nodo.operador != '=':
+                    pila.append(('visitar', nodo.objetivo, ambito))  # x += 1 usa x
+                pila.append(('visitar', nodo.valor, ambito))
+            elif isinstance(nodo, Para):
+                pila.extend(('visitar', hijo, ambito) for hijo in reversed(nodo.sino))
+                pila.extend(('visitar', hijo, ambito) for hijo in reversed(nodo.cuerpo))
+                pila.append(('definir', nodo.objetivo, ambito))
+                pila.append(('visitar', nodo.iterable, ambito))
+            elif isinstance(nodo, (Funcion, Clase)):
+                ambito.simbolos.setdefault(nodo.nombre, nodo.linea)
+                interno = self._nuevo_ambito(nodo.nombre, ambito)
+                pila.append(('cerrar', interno))
+                pila.extend(('visitar', hijo, interno) for hijo in reversed(nodo.cuerpo))
+                if isinstance(nodo, Funcion):
+                    pila.extend(('definir', parametro, interno) for parametro in reversed(nodo.parametros))
+                else:
+                    pila.extend(('visitar', base, ambito) for base in reversed(nodo.bases))
+            elif isinstance(nodo, Importar):
+                for nombre, alias in nodo.nombres:
+                    if nombre != '*':
+                        ambito.simbolos.setdefault(alias or nombre.split('.')[0], nodo.linea)
+            elif isinstance(nodo, Simple) and nodo.palabra in ('global', 'nonlocal'):
+                pila.extend(('definir', argumento, ambito) for argumento in nodo.argumentos)
+            elif isinstance(nodo, Compuesta) and isinstance(nodo.cabecera, Binaria) and nodo.cabecera.operador == 'as':
+                pila.extend(('visitar', hijo, ambito) for hijo in reversed(nodo.cuerpo))
+                pila.append(('definir', nodo.cabecera.derecha, ambito))
+                pila.append(('visitar', nodo.cabecera.izquierda, ambito))
+            elif isinstance(nodo, Binaria) and nodo.operador == 'lambda':
+                interno = self._nuevo_ambito('<lambda>', ambito)
+                pila.append(('cerrar', interno))
+                pila.append(('visitar', nodo.derecha, interno))
+                pila.append(('definir', nodo.izquierda, interno))
+            elif isinstance(nodo, Binaria) and nodo.operador == 'for':
+                interno = self._nuevo_ambito('<comprension>', ambito)
+                pila.append(('cerrar', interno))
+                pila.append(('visitar', nodo.izquierda, interno))
+                pila.append(('clausula', nodo.derecha, interno))
+            elif isinstance(nodo, Binaria) and nodo.operador == '=':
+                pila.append(('visitar', nodo.derecha, ambito))  # f(x=1): x no es un uso
+            elif isinstance(nodo, Atributo):
+                pila.append(('visitar', nodo.valor, ambito))
+            else:
+                pila.extend(('visitar', hijo, ambito) for hijo in reversed(list(nodo.hijos())))
+
+        # Lo que sigue pendiente en el módulo puede estar definido más abajo
+        # (una función que usa una global definida después de ella)
+        for nombre, linea in modulo.libres:
+            if nombre not in modulo.simbolos:
+                self._error(nombre, linea)
+        modulo.libres = []
+        return self
+
+
+def construir_tabla_simbolos(entrada):
+    arbol = entrada if isinstance(entrada, Programa) else analizador_sintactico(entrada)
+    return TablaSimbolos().construir(arbol)
+
+
+# Un mensaje por identificador sin definir de `errores` (nombre -> [primera
+# línea, usos], como TablaSimbolos.errores), como mucho `max_errores`, más
+# una línea de resumen si hay más.
+def mensajes_errores(errores, max_errores=MAX_ERRORES):
+    mensajes = []
+    pendientes = sorted(errores.items(), key=lambda error: error[1][0])
+    for nombre, (linea, usos) in pendientes[:max_errores]:
+        if usos == 1:
+            mensajes.append(f"Error: Variable '{nombre}' no definida (línea {linea}).")
+        else:
+            mensajes.append(f"Error: Variable '{nombre}' no definida (línea {linea}, {usos} usos).")
+    if len(pendientes) > max_errores:
+        restantes = pendientes[max_errores:]
+        usos = sum(error[1][1] for error in restantes)
+        mensajes.append(f"... y {len(restantes)} identificadores más sin definir ({usos} usos).")
+    return mensajes
+
+
+# Acepta un árbol sintáctico o un TokenStream. Devuelve los mensajes de
+# mensajes_errores para los identificadores sin definir.
+def analizador_semantico(tokens, max_errores=MAX_ERRORES):
+    return mensajes_errores(construir_tabla_simbolos(tokens).errores, max_errores)
@@ -0,0 +1,764 @@
+from array import array
+
+# === Nodos del árbol sintáctico ===
+# Cada clase usa __slots__ para que un árbol grande ocupe poco. `campos`
+# enumera los atributos que contienen hijos (un nodo, una lista o None), en el
+# orden en que se recorren.
+
+
+class Nodo:
+    __slots__ = ('linea',)
+    campos = ()
+
+    def hijos(self):
+        for campo in self.campos:
+            valor = getattr(self, campo)
+            if isinstance(valor, list):
+                yield from valor
+            elif valor is not None:
+                yield valor
+
+    def etiqueta(self):
+        return type(self).__name__
+
+
+class Programa(Nodo):
+    __slots__ = ('cuerpo',)
+    campos = ('cuerpo',)
+
+    def __init__(self, cuerpo, linea=1):
+        self.cuerpo, self.linea = cuerpo, linea
+
+
+class Bloque(Nodo):
+    __slots__ = ('cuerpo',)
+    campos = ('cuerpo',)
+
+    def __init__(self, cuerpo, linea):
+        self.cuerpo, self.linea = cuerpo, linea
+
+    def etiqueta(self):
+        return "{ }"
+
+
+class Asignacion(Nodo):
+    __slots__ = ('objetivo', 'operador', 'valor')
+    campos = ('objetivo', 'valor')
+
+    def __init__(self, objetivo, operador, valor, linea):
+        self.objetivo, self.operador, self.valor, self.linea = objetivo, operador, valor, linea
+
+    def etiqueta(self):
+        return self.operador
+
+
+class Si(Nodo):
+    __slots__ = ('condicion', 'cuerpo', 'sino')
+    campos = ('condicion', 'cuerpo', 'sino')
+
+    def __init__(self, condicion, linea):
+        self.condicion, self.cuerpo, self.sino, self.linea = condicion, [], [], linea
+
+    def etiqueta(self):
+        return "if"
+
+
+class Mientras(Nodo):
+    __slots__ = ('condicion', 'cuerpo', 'sino')
+    campos = ('condicion', 'cuerpo', 'sino')
+
+    def __init__(self, condicion, linea):
+        self.condicion, self.cuerpo, self.sino, self.linea = condicion, [], [], linea
+
+    def etiqueta(self):
+        return "while"
+
+
+class Para(Nodo):
+    __slots__ = ('objetivo', 'iterable', 'cuerpo', 'sino')
+    campos = ('objetivo', 'iterable', 'cuerpo', 'sino')
+
+    def __init__(self, objetivo, iterable, linea):
+        self.objetivo, self.iterable, self.cuerpo, self.sino, self.linea = objetivo, iterable, [], [], linea
+
+    def etiqueta(self):
+        return "for"
+
+
+class Funcion(Nodo):
+    __slots__ = ('nombre', 'parametros', 'cuerpo')
+    campos = ('parametros', 'cuerpo')
+
+    def __init__(self, nombre, parametros, linea):
+        self.nombre, self.parametros, self.cuerpo, self.linea = nombre, parametros, [], linea
+
+    def etiqueta(self):
+        return f"def {self.nombre}"
+
+
+class Clase(Nodo):
+    __slots__ = ('nombre', 'bases', 'cuerpo')
+    campos = ('bases', 'cuerpo')
+
+    def __init__(self, nombre, bases, linea):
+        self.nombre, self.bases, self.cuerpo, self.linea = nombre, bases, [], linea
+
+    def etiqueta(self):
+        return f"class {self.nombre}"
+
+
+# Sentencias compuestas sin estructura propia (try, except, finally, with, else suelto)
+class Compuesta(Nodo):
+    __slots__ = ('palabra', 'cabecera', 'cuerpo')
+    campos = ('cabecera', 'cuerpo')
+
+    def __init__(self, palabra, cabecera, linea):
+        self.palabra, self.cabecera, self.cuerpo, self.linea = palabra, cabecera, [], linea
+
+    def etiqueta(self):
+        return self.palabra
+
+
+class Retorno(Nodo):
+    __slots__ = ('valor',)
+    campos = ('valor',)
+
+    def __init__(self, valor, linea):
+        self.valor, self.linea = valor, linea
+
+    def etiqueta(self):
+        return "return"
+
+
+# import a, b as c  /  from m import a, b as c; `nombres` es una lista de (nombre, alias)
+class Importar(Nodo):
+    __slots__ = ('modulo', 'nombres')
+
+    def __init__(self, modulo, nombres, linea):
+        self.modulo, self.nombres, self.linea = modulo, nombres, linea
+
+    def etiqueta(self):
+        nombres = ", ".join(n if a is None else f"{n} as {a}" for n, a in self.nombres)
+        return f"from {self.modulo} import {nombres}" if self.modulo else f"import {nombres}"
+
+
+# pass, break, continue, global x, nonlocal x, ...
+class Simple(Nodo):
+    __slots__ = ('palabra', 'argumentos')
+    campos = ('argumentos',)
+
+    def __init__(self, palabra, argumentos, linea):
+        self.palabra, self.argumentos, self.linea = palabra, argumentos, linea
+
+    def etiqueta(self):
+        return self.palabra
+
+
+class Expresion(Nodo):
+    __slots__ = ('valor',)
+    campos = ('valor',)
+
+    def __init__(self, valor, linea):
+        self.valor, self.linea = valor, linea
+
+    def etiqueta(self):
+        return "expr"
+
+
+class Binaria(Nodo):
+    __slots__ = ('operador', 'izquierda', 'derecha')
+    campos = ('izquierda', 'derecha')
+
+    def __init__(self, operador, izquierda, derecha, linea):
+        self.operador, self.izquierda, self.derecha, self.linea = operador, izquierda, derecha, linea
+
+    def etiqueta(self):
+        return self.operador
+
+
+class Unaria(Nodo):
+    __slots__ = ('operador', 'operando')
+    campos = ('operando',)
+
+    def __init__(self, operador, operando, linea):
+        self.operador, self.operando, self.linea = operador, operando, linea
+
+    def etiqueta(self):
+        return self.operador
+
+
+class Llamada(Nodo):
+    __slots__ = ('funcion', 'argumentos')
+    campos = ('funcion', 'argumentos')
+
+    def __init__(self, funcion, argumentos, linea):
+        self.funcion, self.argumentos, self.linea = funcion, argumentos, linea
+
+    def etiqueta(self):
+        return "llamada"
+
+
+class Indice(Nodo):
+    __slots__ = ('valor', 'indices')
+    campos = ('valor', 'indices')
+
+    def __init__(self, valor, indices, linea):
+        self.valor, self.indices, self.linea = valor, indices, linea
+
+    def etiqueta(self):
+        return "[ ]"
+
+
+class Atributo(Nodo):
+    __slots__ = ('valor', 'nombre')
+    campos = ('valor',)
+
+    def __init__(self, valor, nombre, linea):
+        self.valor, self.nombre, self.linea = valor, nombre, linea
+
+    def etiqueta(self):
+        return f".{self.nombre}"
+
+
+class Nombre(Nodo):
+    __slots__ = ('id',)
+
+    def __init__(self, id, linea):
+        self.id, self.linea = id, linea
+
+    def etiqueta(self):
+        return self.id
+
+
+# Números, cadenas y constantes (True, False, None); `tipo` es el tipo de token
+class Literal(Nodo):
+    __slots__ = ('tipo', 'valor')
+
+    def __init__(self, tipo, valor, linea):
+        self.tipo, self.valor, self.linea = tipo, valor, linea
+
+    def etiqueta(self):
+        return self.valor if len(self.valor) <= 30 else self.valor[:27] + "..."
+
+
+# Listas, tuplas y diccionarios (los elementos de un diccionario son Binaria ':' clave/valor)
+class Coleccion(Nodo):
+    __slots__ = ('tipo', 'elementos')
+    campos = ('elementos',)
+
+    def __init__(self, tipo, elementos, linea):
+        self.tipo, self.elementos, self.linea = tipo, elementos, linea
+
+    def etiqueta(self):
+        return {'lista': "[ ]", 'tupla': "( )", 'diccionario': "{ }"}[self.tipo]
+
+
+class Error(Nodo):
+    __slots__ = ('texto',)
+
+    def __init__(self, texto, linea):
+        self.texto, self.linea = texto, linea
+
+    def etiqueta(self):
+        return f"error: {self.texto}"
+
+
+# === Tabla de operadores ===
+
+PRECEDENCIA_BINARIA = {
+    'or': 1, '||': 1,
+    'and': 2, '&&': 2,
+    '==': 4, '!=': 4, '<': 4, '>': 4, '<=': 4, '>=': 4, 'in': 4, 'is': 4,
+    '|': 5, '^': 6, '&': 7, '<<': 8, '>>': 8,
+    '+': 9, '-': 9,
+    '*': 10, '/': 10, '%': 10, '//': 10,
+    '**': 12, 'not in': 4, 'is not': 4,
+}
+# Operadores de Python que no son tokens de operador: lambda, argumentos con
+# nombre (f(x=1)), anotaciones (def f(x: int)), comprensiones y el condicional
+PRECEDENCIA_ESPECIAL = {'lambda': 0.1, '=': 0.2, ':': 0.3, 'for': 0.4, 'clave': 0.5, 'if': 0.6, 'else': 0.6}
+ASOCIA_DERECHA = frozenset(['**', 'for'])
+PRECEDENCIA_UNARIA = {'not': 3, '-': 11, '+': 11, '~': 11, '*': 11, 'await': 11}
+PREFIJOS_CADENA = frozenset(['f', 'r', 'b', 'u', 'rb', 'br', 'fr', 'rf'])
+TIPOS_OPERADOR = frozenset(['OPERADOR_LOGICO', 'OPERADOR_COMPARACION', 'OPERADOR_ARITMETICO',
+                            'OPERADOR_BITWISE', 'PALABRA_CLAVE'])
+TIPOS_LITERAL = frozenset(['NUMERO', 'CADENA', 'CADENA_MULTILINEA', 'CARACTER'])
+CONSTANTES = frozenset(['True', 'False', 'None'])
+CIERRES = {'(': ')', '[': ']', '{': '}'}
+CABECERAS = frozenset(['if', 'elif', 'else', 'while', 'for', 'def', 'class',
+                       'try', 'except', 'finally', 'with'])
+SIMPLES = frozenset(['pass', 'break', 'continue', 'global', 'nonlocal', 'del', 'assert', 'raise', 'yield'])
+TIPOS_IGNORADOS = frozenset(['COMENTARIO_LINEA', 'COMENTARIO_BLOQUE'])
+
+
+# Analizador sintáctico de descenso recursivo con precedencia de operadores,
+# pero escrito con pilas explícitas en lugar de recursión: cada token se
+# consume una sola vez (tiempo lineal) y ningún anidamiento, por profundo que
+# sea, puede agotar la pila de Python.
+#
+# Necesita la columna de cada token para reconocer los bloques por sangría,
+# así que trabaja sobre un TokenStream. También acepta bloques con llaves.
+class AnalizadorSintactico:
+    def __init__(self, tokens):
+        if not hasattr(tokens, 'columna'):
+            raise TypeError("El analizador sintáctico necesita un TokenStream (con columnas)")
+        self.flujo = tokens
+        self.indices = array('I', (i for i in range(len(tokens))
+                                   if tokens.tipo(i) not in TIPOS_IGNORADOS))
+        self.posicion = 0
+        self.linea_fin_anterior = 0  # línea donde terminó el último token consumido
+        self.columna_linea = 0  # sangría de la línea actual
+        self.token = tokens[self.indices[0]] if self.indices else (0, 'FIN', '')
+
+    # --- acceso a tokens ---
+
+    def _fin(self):
+        return self.posicion >= len(self.indices)
+
+    # El token actual se guarda ya materializado: se consulta varias veces por token
+    def _actual(self):
+        return self.token
+
+    def _avanzar(self):
+        linea, _, texto = self.token
+        self.linea_fin_anterior = linea + texto.count('\n')
+        self.posicion += 1
+        if self.posicion < len(self.indices):
+            self.token = self.flujo[self.indices[self.posicion]]
+        else:
+            self.token = (self.linea_fin_anterior, 'FIN', '')
+
+    def _siguiente(self):
+        if self.posicion + 1 >= len(self.indices):
+            return (self.linea_fin_anterior, 'FIN', '')
+        return self.flujo[self.indices[self.posicion + 1]]
+
+    # El token actual empieza una línea nueva respecto al anterior
+    def _nueva_linea(self):
+        return self.posicion == 0 or self.token[0] > self.linea_fin_anterior
+
+    def _columna(self):
+        return self.flujo.columna(self.indices[self.posicion])
+
+    # --- sentencias ---
+
+    def analizar(self):
+        programa = Programa([])
+        # Contextos abiertos: [lista de sentencias, columna de la cabecera, tipo, último if/for/while]
+        pila = [[programa.cuerpo, -1, 'raiz', None]]
+        self.llaves = 0  # bloques con llaves abiertos en la pila
+
+        while not self._fin():
+            linea, tipo, texto = self._actual()
+            if self._nueva_linea():
+                columna = self.columna_linea = self._columna()
+                while pila[-1][2] == 'sangria' and columna <= pila[-1][1]:
+                    pila.pop()
+            contexto = pila[-1]
+            cuerpo = contexto[0]
+
+            if texto == ';' and tipo == 'PUNTUACION':
+                self._avanzar()
+            elif texto == '{' and tipo == 'PUNTUACION':
+                self._avanzar()
+                bloque = Bloque([], linea)
+                cuerpo.append(bloque)
+                pila.append([bloque.cuerpo, None, 'llave', None])
+                self.llaves += 1
+            elif texto == '}' and tipo == 'PUNTUACION':
+                self._avanzar()
+                if self.llaves:
+                    while pila.pop()[2] != 'llave':
+                        pass
+                    self.llaves -= 1
+                else:
+                    cuerpo.append(Error(texto, linea))
+            elif tipo == 'PALABRA_CLAVE' and texto == 'async':
+                self._avanzar()  # async def / async for / async with: se analizan igual
+            elif tipo == 'PALABRA_CLAVE' and texto in CABECERAS:
+                self._cabecera(pila)
+            else:
+                inicio = self.posicion
+                sentencia = self._sentencia_simple()
+                if self.posicion == inicio:  # nada reconocible: saltar el token
+                    self._avanzar()
+                    sentencia = Error(texto, linea)
+                cuerpo.append(sentencia)
+                contexto[3] = None
+        return programa
+
+    def _cabecera(self, pila):
+        contexto = pila[-1]
+        cuerpo = contexto[0]
+        linea, _, palabra = self._actual()
+        columna = self.columna_linea
+        self._avanzar()
+
+        if palabra in ('if', 'while'):
+            nodo = (Si if palabra == 'if' else Mientras)(self._expresion(), linea)
+            cuerpo.append(nodo)
+            contexto[3] = nodo
+            destino = nodo.cuerpo
+        elif palabra == 'for':
+            objetivo = self._expresion(parar_en_in=True)
+            if isinstance(objetivo, Binaria) and objetivo.operador == 'in':
+                nodo = Para(objetivo.izquierda, objetivo.derecha, linea)  # for (i in r) {
+            else:
+                if self._actual()[2] == 'in':
+                    self._avanzar()
+                nodo = Para(objetivo, self._expresion(), linea)
+            cuerpo.append(nodo)
+            contexto[3] = nodo
+            destino = nodo.cuerpo
+        elif palabra == 'elif' and isinstance(contexto[3], Si):
+            nodo = Si(self._expresion(), linea)
+            contexto[3].sino.append(nodo)
+            contexto[3] = nodo
+            destino = nodo.cuerpo
+        elif palabra == 'else' and contexto[3] is not None:
+            destino = contexto[3].sino
+            contexto[3] = None
+        elif palabra in ('def', 'class'):
+            nombre = self._actual()[2] if self._actual()[1] == 'IDENTIFICADOR' else '?'
+            if nombre != '?':
+                self._avanzar()
+            parametros = []
+            if self._actual()[2] == '(':
+                grupo = self._expresion(parametros=True)
+                parametros = grupo.elementos if isinstance(grupo, Coleccion) else [grupo]
+            while not (self._fin() or self._nueva_linea() or self._actual()[2] in (':', '{')):
+                self._avanzar()  # anotación de retorno: -> int
+            nodo = (Funcion if palabra == 'def' else Clase)(nombre, parametros, linea)
+            cuerpo.append(nodo)
+            contexto[3] = None
+            destino = nodo.cuerpo
+        else:
+            # try/except/finally/with, o elif/else sin if previo
+            cabecera = None if self._actual()[2] in (':', '{') else self._expresion()
+            while self._actual()[2] == 'as' and not self._nueva_linea():
+                # except E as e / with open(r) as f
+                alias_linea = self._actual()[0]
+                self._avanzar()
+                cabecera = Binaria('as', cabecera, self._expresion(), alias_linea)
+            nodo = Compuesta(palabra, cabecera, linea)
+            cuerpo.append(nodo)
+            contexto[3] = None
+            destino = nodo.cuerpo
+
+        _, tipo, texto = self._actual()
+        if texto == '{' and tipo == 'PUNTUACION':
+            self._avanzar()
+            pila.append([destino, None, 'llave', None])
+            self.llaves += 1
+            return
+        if texto == ':':
+            self._avanzar()
+        if self._fin() or self._nueva_linea():
+            pila.append([destino, columna, 'sangria', None])
+            return
+        # Cuerpo en la misma línea: if x: y = 1; z = 2
+        while not self._fin() and not self._nueva_linea():
+            if self._actual()[2] == ';':
+                self._avanzar()
+                continue
+            inicio = self.posicion
+            sentencia = self._sentencia_simple()
+            if self.posicion == inicio:
+                linea_error, _, texto_error = self._actual()
+                self._avanzar()
+                sentencia = Error(texto_error, linea_error)
+            destino.append(sentencia)
+
+    def _sentencia_simple(self):
+        linea, tipo, texto = self._actual()
+        if tipo == 'PALABRA_CLAVE':
+            if texto == 'return':
+                self._avanzar()
+                valor = None if self._fin() or self._nueva_linea() or self._actual()[2] == ';' else self._expresion()
+                return Retorno(valor, linea)
+            if texto in ('import', 'from'):
+                return self._importar()
+            if texto in SIMPLES:
+                self._avanzar()
+                argumentos = []
+                if not (self._fin() or self._nueva_linea() or self._actual()[2] == ';'):
+                    argumentos.append(self._expresion())
+                return Simple(texto, argumentos, linea)
+            siguiente = self._siguiente()
+            if siguiente[1] == 'IDENTIFICADOR' and siguiente[0] == linea:
+                # Declaración con tipo (perfil tipo C): int x = 1
+                self._avanzar()
+                sentencia = self._sentencia_simple()
+                return Simple(texto, [sentencia] if sentencia is not None else [], linea)
+
+        inicio = self.posicion
+        objetivo = self._expresion()
+        if self.posicion == inicio:
+            return None
+        _, tipo, texto = self._actual()
+        if texto == ':' and not self._nueva_linea() and not self._fin():
+            # Anotación: x: int = 3
+            self._avanzar()
+            objetivo = Binaria(':', objetivo, self._expresion(), linea)
+            _, tipo, texto = self._actual()
+            if not (tipo == 'OPERADOR_ASIGNACION' and not self._nueva_linea()):
+                return Expresion(objetivo, linea)
+        if tipo == 'OPERADOR_ASIGNACION' and not self._nueva_linea():
+            self._avanzar()
+            return Asignacion(objetivo, texto, self._expresion(), linea)
+        return Expresion(objetivo, linea)
+
+    def _nombre_con_puntos(self):
+        partes = []
+        while (self._actual()[1] == 'IDENTIFICADOR' or self._actual()[2] == '.') and not (partes and self._nueva_linea()):
+            partes.append(self._actual()[2])
+            self._avanzar()
+        return "".join(partes)
+
+    def _importar(self):
+        linea, _, palabra = self._actual()
+        self._avanzar()
+        modulo = None
+        if palabra == 'from':
+            modulo = self._nombre_con_puntos()
+            if self._actual()[2] == 'import':
+                self._avanzar()
+        nombres = []
+        parentesis = False  # from m import (a,\n b): puede seguir en otra línea
+        while not self._fin() and (parentesis or not self._nueva_linea()):
+            _, tipo, texto = self._actual()
+            if texto in (',', '(', ')'):
+                parentesis = texto == '(' or (parentesis and texto != ')')
+                self._avanzar()
+                continue
+            if tipo != 'IDENTIFICADOR' and texto != '*':
+                break
+            nombre = self._nombre_con_puntos() if texto != '*' else '*'
+            if texto == '*':
+                self._avanzar()
+            alias = None
+            if self._actual()[2] == 'as':
+                self._avanzar()
+                alias = self._actual()[2]
+                self._avanzar()
+            nombres.append((nombre, alias))
+        return Importar(modulo, nombres, linea)
+
+    # --- expresiones ---
+
+    # El léxico separa '**' y '//' en dos tokens; se juntan si van pegados
+    def _operador_doble(self, texto):
+        if texto not in ('*', '/') or self.posicion + 1 >= len(self.indices):
+            return texto
+        i, j = self.indices[self.posicion], self.indices[self.posicion + 1]
+        if self.flujo.texto(j) == texto and self.flujo.inicios[j] == self.flujo.fines[i]:
+            self._avanzar()
+            return texto * 2
+        return texto
+
+    # El token actual es un prefijo de cadena pegado a la cadena: f"...", rb'...'
+    def _cadena_pegada(self):
+        if self.posicion + 1 >= len(self.indices):
+            return False
+        i, j = self.indices[self.posicion], self.indices[self.posicion + 1]
+        return self.flujo.inicios[j] == self.flujo.fines[i] and self.flujo.tipo(j) in TIPOS_LITERAL
+
+    # Precedencia de operadores con pilas explícitas (shunting-yard). Las
+    # llamadas, índices, grupos y colecciones abren un "marcador" en la pila de
+    # operadores; al cerrarlo se construye el nodo con los operandos de encima.
+    # parametros=True: lista de parámetros de def (termina al cerrar el
+    # paréntesis) o de lambda (termina en ':'); '=' marca valores por defecto.
+    def _expresion(self, parar_en_in=False, parametros=False):
+        operandos = []
+        operadores = []  # ('bin'|'un', operador, precedencia, linea) o marcadores (listas)
+        abiertos = []  # marcadores abiertos, del más externo al más interno
+        espera_operando = True
+        tupla = False
+        linea_inicio = self._actual()[0]
+
+        def reducir(precedencia_minima, derecha=False):
+            while (operadores and not isinstance(operadores[-1], list)
+                   and (operadores[-1][2] > precedencia_minima if derecha else operadores[-1][2] >= precedencia_minima)):
+                clase, operador, _, linea = operadores.pop()
+                operando = operandos.pop() if operandos else Error("falta operando", linea)
+                if clase == 'un':
+                    operandos.append(Unaria(operador, operando, linea))
+                else:
+                    izquierda = operandos.pop() if operandos else Error("falta operando", linea)
+                    operandos.append(Binaria(operador, izquierda, operando, linea))
+
+        def abrir(marcador):
+            operadores.append(marcador)
+            abiertos.append(marcador)
+
+        def cerrar_marcador():
+            reducir(0)
+            apertura, tipo, base, valor, linea = operadores.pop()
+            abiertos.pop()
+            elementos = operandos[base:]
+            del operandos[base:]
+            if tipo == 'llamada':
+                operandos.append(Llamada(valor, elementos, linea))
+            elif tipo == 'indice':
+                operandos.append(Indice(valor, elementos, linea))
+            elif tipo == 'grupo' and len(elementos) == 1 and not valor:
+                operandos.append(elementos[0])
+            else:
+                operandos.append(Coleccion({'(': 'tupla', '[': 'lista', '{': 'diccionario'}[apertura],
+                                           elementos, linea))
+
+        while not self._fin():
+            linea, tipo, texto = self._actual()
+            if not abiertos and self.posicion > 0 and self._nueva_linea() and (operandos or operadores):
+                break
+            es_operador = tipo in TIPOS_OPERADOR
+
+            if espera_operando:
+                if tipo in TIPOS_LITERAL or (tipo == 'PALABRA_CLAVE' and texto in CONSTANTES):
+                    operandos.append(Literal(tipo, texto, linea))
+                    espera_operando = False
+                elif tipo == 'IDENTIFICADOR' and texto.lower() in PREFIJOS_CADENA and self._cadena_pegada():
+                    # f"...", r'...': el léxico separa el prefijo de la cadena
+                    self._avanzar()
+                    operandos.append(Literal(self._actual()[1], texto + self._actual()[2], linea))
+                    espera_operando = False
+                elif tipo == 'PALABRA_CLAVE' and texto == 'lambda':
+                    self._avanzar()
+                    if self._actual()[2] == ':':
+                        parametros = Coleccion('tupla', [], linea)
+                    else:
+                        parametros = self._expresion(parametros=True)
+                    operandos.append(parametros)
+                    operadores.append(('bin', 'lambda', PRECEDENCIA_ESPECIAL['lambda'], linea))
+                    if self._actual()[2] != ':':
+                        continue
+                elif tipo == 'IDENTIFICADOR' or (tipo == 'PALABRA_CLAVE' and self._siguiente()[2] == '('):
+                    # (una palabra clave seguida de '(' es una llamada: print(x) en el perfil tipo C)
+                    operandos.append(Nombre(texto, linea))
+                    espera_operando = False
+                elif es_operador and texto in PRECEDENCIA_UNARIA:
+                    operadores.append(('un', texto, PRECEDENCIA_UNARIA[texto], linea))
+                elif tipo == 'PUNTUACION' and texto in CIERRES:
+                    tipo_marcador = {'(': 'grupo', '[': 'lista', '{': 'diccionario'}[texto]
+                    abrir([texto, tipo_marcador, len(operandos), False, linea])
+                elif texto == ':' and abiertos and abiertos[-1][1] == 'indice':
+                    # a[:2], a[::2]: el extremo que falta es None
+                    operandos.append(Literal('PALABRA_CLAVE', 'None', linea))
+                    reducir(PRECEDENCIA_ESPECIAL[':'])
+                    operadores.append(('bin', ':', PRECEDENCIA_ESPECIAL[':'], linea))
+                elif tipo == 'PUNTUACION' and abiertos and texto == CIERRES[abiertos[-1][0]]:
+                    if abiertos[-1][1] == 'indice' and operadores and operadores[-1][1] == ':':
+                        operandos.append(Literal('PALABRA_CLAVE', 'None', linea))  # a[1:]
+                    cerrar_marcador()  # colección vacía o coma final
+                    espera_operando = False
+                    if parametros and not abiertos:
+                        self._avanzar()
+                        break
+                else:
+                    break
+            else:
+                tope = abiertos[-1] if abiertos else None
+                if parar_en_in and not abiertos and texto == 'in':
+                    break
+                if texto == 'not' and self._siguiente()[2] == 'in':
+                    self._avanzar()
+                    texto = 'not in'
+                elif texto == 'is' and self._siguiente()[2] == 'not':
+                    self._avanzar()
+                    texto = 'is not'
+                if es_operador and texto in PRECEDENCIA_BINARIA:
+                    texto = self._operador_doble(texto)
+                    precedencia = PRECEDENCIA_BINARIA[texto]
+                    reducir(precedencia, texto in ASOCIA_DERECHA)
+                    operadores.append(('bin', texto, precedencia, linea))
+                    espera_operando = True
+                elif tipo == 'PALABRA_CLAVE' and texto in ('if', 'else'):
+                    # a if c else b, y los filtros de las comprensiones
+                    reducir(PRECEDENCIA_ESPECIAL[texto])
+                    operadores.append(('bin', texto, PRECEDENCIA_ESPECIAL[texto], linea))
+                    espera_operando = True
+                elif tipo == 'PALABRA_CLAVE' and texto == 'for':
+                    # [x for a, b in y]: el objetivo se analiza aparte para que sus
+                    # comas no se mezclen con las de la colección
+                    reducir(PRECEDENCIA_ESPECIAL['for'], True)
+                    operadores.append(('bin', 'for', PRECEDENCIA_ESPECIAL['for'], linea))
+                    self._avanzar()
+                    operandos.append(self._expresion(parar_en_in=True))
+                    if self._actual()[2] == 'in':
+                        operadores.append(('bin', 'in', PRECEDENCIA_BINARIA['in'], linea))
+                        self._avanzar()
+                    espera_operando = True
+                    continue
+                elif texto == ':' and tope is not None and tope[1] == 'diccionario':
+                    reducir(PRECEDENCIA_ESPECIAL['clave'])
+                    operadores.append(('bin', ':', PRECEDENCIA_ESPECIAL['clave'], linea))
+                    espera_operando = True
+                elif texto in ('=', ':') and ((tope is not None and tope[1] in ('llamada', 'grupo'))
+                                              or (parametros and tope is None and texto == '=')):
+                    # argumento con nombre o parámetro por defecto: f(x=1), def f(y=3),
+                    # y anotaciones: def f(x: int)
+                    reducir(PRECEDENCIA_ESPECIAL[texto])
+                    operadores.append(('bin', texto, PRECEDENCIA_ESPECIAL[texto], linea))
+                    espera_operando = True
+                elif texto == '(' and tipo == 'PUNTUACION':
+                    abrir(['(', 'llamada', len(operandos) - 1, operandos.pop(), linea])
+                    espera_operando = True
+                elif texto == '[' and tipo == 'PUNTUACION':
+                    abrir(['[', 'indice', len(operandos) - 1, operandos.pop(), linea])
+                    espera_operando = True
+                elif texto == '.' and tipo == 'PUNTUACION':
+                    self._avanzar()
+                    nombre = self._actual()[2] if self._actual()[1] in ('IDENTIFICADOR', 'PALABRA_CLAVE') else None
+                    if nombre is None:
+                        operandos[-1] = Atributo(operandos[-1], '?', linea)
+                        continue
+                    operandos[-1] = Atributo(operandos[-1], nombre, linea)
+                elif texto == ',' and tipo == 'PUNTUACION':
+                    if tope is not None:
+                        reducir(0)
+                        if tope[1] == 'grupo':
+                            tope[3] = True  # (a, b) es una tupla, (a) no
+                    else:
+                        reducir(0)
+                        tupla = True
+                    espera_operando = True
+                elif texto == ':' and tope is not None and tope[1] == 'indice':
+                    # rebanada: a[1:2:3] -> Binaria(':', Binaria(':', 1, 2), 3)
+                    reducir(PRECEDENCIA_ESPECIAL[':'])
+                    operadores.append(('bin', ':', PRECEDENCIA_ESPECIAL[':'], linea))
+                    espera_operando = True
+                elif tope is not None and tipo == 'PUNTUACION' and texto == CIERRES[tope[0]]:
+                    cerrar_marcador()
+                    if parametros and not abiertos:
+                        self._avanzar()
+                        break
+                else:
+                    break
+            self._avanzar()
+
+        # Tolerancia a errores: cerrar lo que quedó abierto
+        while abiertos:
+            cerrar_marcador()
+        if espera_operando and operadores:
+            operandos.append(Error("falta operando", operadores[-1][-1]))
+        reducir(0)
+        if not operandos:
+            return Error("expresión vacía", linea_inicio)
+        if tupla or len(operandos) > 1:
+            return Coleccion('tupla', operandos, linea_inicio)
+        return operandos[0]
+
+
+def analizador_sintactico(tokens):
+    return AnalizadorSintactico(tokens).analizar()
+
+
+# Recorrido en preorden sin recursión: (nodo, profundidad)
+def recorrer(arbol):
+    pila = [(arbol, 0)]
+    while pila:
+        nodo, profundidad = pila.pop()
+        yield nodo, profundidad
+        hijos = list(nodo.hijos())
+        for hijo in reversed(hijos):
+            pila.append((hijo, profundidad + 1))
@@ -0,0 +1,114 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Tabla que solo crea las filas que se ven. El Treeview tiene siempre tantos
+# elementos como filas caben en la ventana; al desplazarse se cambian sus
+# valores con los de `fuente.fila(i)` en vez de insertar todas las filas.
+# `fuente` es cualquier objeto con len(), fila(i) y `columnas` (ver
+# compilador.tablas). La barra de desplazamiento es propia porque la del
+# Treeview solo conoce los elementos que tiene.
+class TablaVirtual(tk.Frame):
+    def __init__(self, padre, fuente=None, anchos=None, **opciones):
+        super().__init__(padre, **opciones)
+        self.fuente = None
+        self.desplazamiento = 0
+        self.visibles = 0
+        self.elementos = []
+        self.anchos = anchos or {}
+
+        self.arbol = ttk.Treeview(self, show='headings', selectmode='browse')
+        self.barra = ttk.Scrollbar(self, orient='vertical', command=self._desplazar)
+        self.barra.pack(side='right', fill='y')
+        self.arbol.pack(side='left', fill='both', expand=True)
+
+        self.arbol.bind('<Configure>', self._al_redimensionar)
+        self.arbol.bind('<MouseWheel>', self._rueda)
+        self.arbol.bind('<Button-4>', lambda evento: self.mover(-3))
+        self.arbol.bind('<Button-5>', lambda evento: self.mover(3))
+        self.arbol.bind('<Up>', lambda evento: self._tecla(-1))
+        self.arbol.bind('<Down>', lambda evento: self._tecla(1))
+        self.arbol.bind('<Prior>', lambda evento: self._tecla(-max(1, self.visibles - 1)))
+        self.arbol.bind('<Next>', lambda evento: self._tecla(max(1, self.visibles - 1)))
+        self.arbol.bind('<Home>', lambda evento: self._tecla(-len(self.fuente or ())))
+        self.arbol.bind('<End>', lambda evento: self._tecla(len(self.fuente or ())))
+        if fuente is not None:
+            self.cambiar_fuente(fuente)
+
+    def cambiar_fuente(self, fuente):
+        if self.fuente is None or fuente.columnas != self.fuente.columnas:
+            self.arbol.configure(columns=fuente.columnas)
+            for columna in fuente.columnas:
+                self.arbol.heading(columna, text=columna)
+                ancho = self.anchos.get(columna)
+                if ancho is not None:
+                    self.arbol.column(columna, width=ancho, stretch=False)
+        self.fuente = fuente
+        self.desplazamiento = 0
+        self._refrescar()
+
+    def _filas_que_caben(self):
+        alto = self.arbol.winfo_height()
+        alto_fila = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        # La cabecera ocupa más o menos una fila
+        return max(1, alto // int(alto_fila) - 1)
+
+    def _al_redimensionar(self, evento=None):
+        visibles = self._filas_que_caben()
+        if visibles != self.visibles:
+            self.visibles = visibles
+            self._refrescar()
+
+    def _refrescar(self):
+        total = len(self.fuente) if self.fuente is not None else 0
+        self.desplazamiento = max(0, min(self.desplazamiento, total - self.visibles))
+        cantidad = min(self.visibles, total - self.desplazamiento)
+        while len(self.elementos) < cantidad:
+            self.elementos.append(self.arbol.insert('', 'end'))
+        while len(self.elementos) > cantidad:
+            self.arbol.delete(self.elementos.pop())
+        for k, elemento in enumerate(self.elementos):
+            self.arbol.item(elemento, values=self.fuente.fila(self.desplazamiento + k))
+        if total:
+            self.barra.set(self.desplazamiento / total, (self.desplazamiento + cantidad) / total)
+        else:
+            self.barra.set(0, 1)
+
+    def mover(self, filas):
+        anterior = self.desplazamiento
+        self.desplazamiento += filas
+        self._refrescar()
+        return self.desplazamiento - anterior
+
+    # Muestra la fila `indice` de la fuente arriba de todo
+    def ir_a(self, indice):
+        self.desplazamiento = indice
+        self._refrescar()
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        total = len(self.fuente) if self.fuente is not None else 0
+        if accion == 'moveto':
+            self.desplazamiento = int(float(cantidad) * total)
+            self._refrescar()
+        elif accion == 'scroll':
+            paso = max(1, self.visibles - 1) if unidad == 'pages' else 1
+            self.mover(int(cantidad) * paso)
+
+    def _rueda(self, evento):
+        self.mover(-3 if evento.delta > 0 else 3)
+        return 'break'
+
+    # Con el teclado la selección se mueve y la tabla se desplaza cuando la
+    # selección llega al borde de lo que se ve
+    def _tecla(self, paso):
+        if not self.elementos:
+            return 'break'
+        seleccion = self.arbol.selection()
+        posicion = self.elementos.index(seleccion[0]) if seleccion else 0
+        nueva = posicion + paso
+        if nueva < 0 or nueva >= len(self.elementos):
+            movidas = self.mover(nueva - (0 if nueva < 0 else len(self.elementos) - 1))
+            nueva -= movidas
+        nueva = max(0, min(nueva, len(self.elementos) - 1))
+        self.arbol.selection_set(self.elementos[nueva])
+        self.arbol.focus(self.elementos[nueva])
+        return 'break'
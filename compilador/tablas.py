@@ -0,0 +1,153 @@
+# === Filas para las tablas de resultados ===
+#
+# Las vistas de tokens y de código intermedio no construyen un texto con todo
+# el resultado: la tabla pide solo las filas que se ven con fila(i). Aquí
+# están esas fuentes de filas (filtradas sin materializar los tokens) y la
+# exportación a TSV/JSONL, que escribe directamente desde las columnas del
+# flujo de tokens.
+
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from json.encoder import encode_basestring
+
+from compilador.intermedio import texto_instruccion
+
+COLUMNAS_TOKENS = ('n', 'linea', 'columna', 'tipo', 'texto')
+COLUMNAS_CODIGO = ('n', 'linea', 'instruccion')
+FILAS_POR_ESCRITURA = 4096
+ESCAPES_TSV = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+# Tokens de un TokenStream que cumplen el filtro: tipos (conjunto de nombres
+# o None para todos) y rango de líneas [linea_desde, linea_hasta]. Las líneas
+# del flujo están ordenadas, así que el rango es un tramo de índices que se
+# busca con bisect; el filtro de tipo se hace sobre la columna de códigos.
+class FilasTokens:
+    columnas = COLUMNAS_TOKENS
+
+    def __init__(self, flujo, tipos=None, linea_desde=None, linea_hasta=None):
+        self.flujo = flujo
+        inicio = 0 if linea_desde is None else bisect_left(flujo.lineas, linea_desde)
+        fin = len(flujo) if linea_hasta is None else bisect_right(flujo.lineas, linea_hasta)
+        fin = max(inicio, fin)
+        if tipos is None:
+            self.indices = range(inicio, fin)
+        else:
+            tabla = bytes(1 if tipo in tipos else 0 for tipo in flujo.tipos).ljust(256, b'\0')
+            mascara = flujo.codigos[inicio:fin].tobytes().translate(tabla)
+            self.indices = array('I', compress(range(inicio, fin), mascara))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def fila(self, i):
+        j = self.indices[i]
+        flujo = self.flujo
+        return (j + 1, flujo.lineas[j], flujo.columna(j), flujo.tipo(j), flujo.texto(j))
+
+    # Igual que fila(i) para cada i, pero leyendo las columnas directamente
+    def __iter__(self):
+        flujo = self.flujo
+        fuente, tipos = flujo.fuente, flujo.tipos
+        codigos, lineas, inicios, fines = flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines
+        for j in self.indices:
+            inicio = inicios[j]
+            yield (j + 1, lineas[j], inicio - fuente.rfind('\n', 0, inicio) - 1, tipos[codigos[j]],
+                   fuente[inicio:fines[j]])
+
+    # Líneas ya formateadas para exportar: sin tuplas intermedias y escapando
+    # solo el texto del token, que es el único campo que puede necesitarlo
+    def lineas_tsv(self):
+        flujo = self.flujo
+        fuente, tipos = flujo.fuente, flujo.tipos
+        codigos, lineas, inicios, fines = flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines
+        for j in self.indices:
+            inicio = inicios[j]
+            columna = inicio - fuente.rfind('\n', 0, inicio) - 1
+            texto = fuente[inicio:fines[j]]
+            if '\t' in texto or '\n' in texto or '\r' in texto or '\\' in texto:
+                texto = texto.translate(ESCAPES_TSV)
+            yield f"{j + 1}\t{lineas[j]}\t{columna}\t{tipos[codigos[j]]}\t{texto}\n"
+
+    def lineas_jsonl(self):
+        flujo = self.flujo
+        fuente, tipos = flujo.fuente, flujo.tipos
+        codigos, lineas, inicios, fines = flujo.codigos, flujo.lineas, flujo.inicios, flujo.fines
+        for j in self.indices:
+            inicio = inicios[j]
+            columna = inicio - fuente.rfind('\n', 0, inicio) - 1
+            texto = encode_basestring(fuente[inicio:fines[j]])
+            yield (f'{{"n": {j + 1}, "linea": {lineas[j]}, "columna": {columna}, '
+                   f'"tipo": "{tipos[codigos[j]]}", "texto": {texto}}}\n')
+
+
+# Instrucciones del código intermedio, con su texto calculado al pedirlas
+class FilasCodigo:
+    columnas = COLUMNAS_CODIGO
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+
+    def __len__(self):
+        return len(self.codigo)
+
+    def fila(self, i):
+        return (i, self.codigo.lineas[i], texto_instruccion(self.codigo, i))
+
+    def __iter__(self):
+        for i in range(len(self.codigo)):
+            yield self.fila(i)
+
+    def lineas_tsv(self):
+        return _lineas_tsv(self)
+
+    def lineas_jsonl(self):
+        return _lineas_jsonl(self)
+
+
+def _escribir_por_tandas(archivo, lineas):
+    tanda = []
+    for linea in lineas:
+        tanda.append(linea)
+        if len(tanda) >= FILAS_POR_ESCRITURA:
+            archivo.write(''.join(tanda))
+            tanda.clear()
+    archivo.write(''.join(tanda))
+
+
+def _lineas_tsv(filas):
+    separadores = len(filas.columnas) - 1
+    for fila in filas:
+        linea = '\t'.join(map(str, fila))
+        # Casi ningún campo lleva tabuladores, saltos o barras: solo entonces se escapa
+        if linea.count('\t') != separadores or '\n' in linea or '\r' in linea or '\\' in linea:
+            linea = '\t'.join(str(valor).translate(ESCAPES_TSV) for valor in fila)
+        yield linea + '\n'
+
+
+def _lineas_jsonl(filas):
+    columnas = filas.columnas
+    codificar = json.JSONEncoder(ensure_ascii=False).encode
+    for fila in filas:
+        yield codificar(dict(zip(columnas, fila))) + '\n'
+
+
+# Escribe las filas (FilasTokens o FilasCodigo) con una cabecera; tabuladores
+# y saltos de línea dentro de un campo se escapan como \t y \n
+def exportar_tsv(filas, ruta):
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        archivo.write('\t'.join(filas.columnas) + '\n')
+        _escribir_por_tandas(archivo, filas.lineas_tsv())
+    return len(filas)
+
+
+# Un objeto JSON por fila con los nombres de las columnas como claves
+def exportar_jsonl(filas, ruta):
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        _escribir_por_tandas(archivo, filas.lineas_jsonl())
+    return len(filas)
+
+
+EXPORTADORES = {'.tsv': exportar_tsv, '.jsonl': exportar_jsonl}
@@ -0,0 +1,183 @@
+# === Proceso de trabajo para ejecutar programas ===
+#
+# Lo arranca compilador.ejecucion antes de que haga falta (python -m
+# compilador.trabajador) y se queda esperando un trabajo en la entrada
+# estándar: el objeto de código en marshal y el límite de memoria. Ejecuta
+# ese programa y termina, así cada programa corre en un proceso limpio.
+#
+# Todo lo que sale hacia el proceso principal va en mensajes (tipo, longitud,
+# datos) por una copia privada de la salida estándar: 'o' salida del
+# programa, 'e' errores y 'f' el final con (estado, mensaje). print() no
+# escribe directamente: un hilo manda lo acumulado cada INTERVALO segundos,
+# así la salida llega mientras el programa sigue corriendo sin mandar un
+# mensaje por cada print. Los descriptores 1 y 2 pasan a ser tuberías que
+# leen otros hilos: lo que escriben ahí los procesos hijos (os.system,
+# subprocess) u os.write llega también como 'o' y 'e' en vez de mezclarse
+# con los mensajes, aunque puede llegar algo desordenado respecto a print().
+
+import codecs
+import io
+import marshal
+import os
+import struct
+import sys
+import threading
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows: sin límite de memoria
+    resource = None
+
+CABECERA = struct.Struct('<cI')
+INTERVALO = 0.05
+ESPERA_DESCRIPTORES = 0.5  # segundos para recoger lo que quede en las tuberías al terminar
+MAX_PENDIENTE = 1 << 16  # caracteres acumulados que obligan a mandar ya
+
+
+class _Canal:
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.cerrojo = threading.Lock()
+
+    def enviar(self, tipo, datos):
+        with self.cerrojo:
+            self.archivo.write(CABECERA.pack(tipo, len(datos)) + datos)
+            self.archivo.flush()
+
+
+# Salida y errores del programa en un solo búfer para no cambiar su orden
+class _Salida:
+    def __init__(self, canal):
+        self.canal = canal
+        self.pendiente = []  # (tipo, texto)
+        self.tamano = 0
+        self.cerrojo = threading.Lock()
+        self.envio = threading.Lock()  # que dos envíos no se adelanten
+
+    def escribir(self, tipo, texto):
+        with self.cerrojo:
+            self.pendiente.append((tipo, texto))
+            self.tamano += len(texto)
+            lleno = self.tamano > MAX_PENDIENTE
+        if lleno:
+            self.mandar()
+
+    def mandar(self):
+        with self.envio:
+            with self.cerrojo:
+                pendiente, self.pendiente, self.tamano = self.pendiente, [], 0
+            # Los trozos seguidos del mismo flujo van en un solo mensaje
+            inicio = 0
+            for i in range(1, len(pendiente) + 1):
+                if i == len(pendiente) or pendiente[i][0] != pendiente[inicio][0]:
+                    texto = ''.join(t for _, t in pendiente[inicio:i])
+                    self.canal.enviar(pendiente[inicio][0], texto.encode('utf-8', 'replace'))
+                    inicio = i
+
+
+class _Flujo(io.TextIOBase):
+    def __init__(self, salida, tipo):
+        self.salida = salida
+        self.tipo = tipo
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        if not isinstance(texto, str):
+            raise TypeError(f"write() espera str, no {type(texto).__name__}")
+        if texto:
+            self.salida.escribir(self.tipo, texto)
+        return len(texto)
+
+
+# Cambia el descriptor `fd` por una tubería y devuelve el hilo que la lee y
+# pasa lo leído a `salida` con el tipo `tipo`
+def _capturar_descriptor(fd, salida, tipo):
+    lectura, escritura = os.pipe()
+    os.dup2(escritura, fd)
+    os.close(escritura)
+
+    def leer():
+        decodificador = codecs.getincrementaldecoder('utf-8')('replace')
+        while True:
+            try:
+                datos = os.read(lectura, 1 << 16)
+            except OSError:
+                datos = b''
+            texto = decodificador.decode(datos, final=not datos)
+            if texto:
+                salida.escribir(tipo, texto)
+            if not datos:
+                break
+        os.close(lectura)
+
+    hilo = threading.Thread(target=leer, daemon=True)
+    hilo.start()
+    return hilo
+
+
+def _leer_trabajo(entrada):
+    cabecera = entrada.read(4)
+    if len(cabecera) < 4:
+        return None  # el pool se cerró sin mandar nada
+    longitud, = struct.unpack('<I', cabecera)
+    return marshal.loads(entrada.read(longitud))
+
+
+def main():
+    entrada = sys.stdin.buffer
+    canal = _Canal(os.fdopen(os.dup(1), 'wb'))  # el descriptor 1 deja de ser el canal
+    trabajo = _leer_trabajo(entrada)
+    if trabajo is None:
+        return
+    objeto, limite_memoria = trabajo
+
+    salida = _Salida(canal)
+    nulo = os.open(os.devnull, os.O_RDWR)
+    os.dup2(nulo, 0)  # los hijos no leen del canal de trabajos
+    lectores = [_capturar_descriptor(1, salida, b'o'), _capturar_descriptor(2, salida, b'e')]
+    sys.stdout = _Flujo(salida, b'o')
+    sys.stderr = _Flujo(salida, b'e')
+    sys.stdin = io.StringIO()
+    terminado = threading.Event()
+
+    def mandar_periodicamente():
+        while not terminado.wait(INTERVALO):
+            salida.mandar()
+
+    threading.Thread(target=mandar_periodicamente, daemon=True).start()
+    if limite_memoria and resource is not None:
+        _, maximo = resource.getrlimit(resource.RLIMIT_AS)
+        if maximo != resource.RLIM_INFINITY:
+            limite_memoria = min(limite_memoria, maximo)
+        resource.setrlimit(resource.RLIMIT_AS, (limite_memoria, maximo))
+
+    estado, mensaje = 'ok', ''
+    try:
+        exec(objeto, {'__name__': '__main__', '__builtins__': __builtins__})
+    except MemoryError:
+        estado, mensaje = 'memoria', "El programa superó el límite de memoria"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            estado, mensaje = 'error', f"El programa terminó con sys.exit({e.code!r})"
+    except BaseException as e:
+        estado, mensaje = 'error', f"{type(e).__name__}: {e}"
+        # Sin el marco de este archivo: el traceback empieza en el programa
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    # Cerrar los extremos de escritura para que los lectores acaben; si un
+    # hijo sigue vivo con la tubería abierta no se le espera más
+    os.dup2(nulo, 1)
+    os.dup2(nulo, 2)
+    limite = time.monotonic() + ESPERA_DESCRIPTORES
+    for lector in lectores:
+        lector.join(max(0, limite - time.monotonic()))
+    terminado.set()
+    salida.mandar()
+    canal.enviar(b'f', marshal.dumps((estado, mensaje)))
+
+
+if __name__ == '__main__':
+    main()
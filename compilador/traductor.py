@@ -0,0 +1,493 @@
+# === Traducción del código intermedio a Python ===
+#
+# Baja el código intermedio (ya optimizado) a código fuente Python, lo compila
+# con compile() y guarda el objeto de código en disco con marshal. Así volver a
+# ejecutar un programa que no cambió no pasa por el léxico, el árbol, el
+# código intermedio ni el optimizador: se lee el archivo y se hace exec.
+#
+# La pila se traduce a variables: la posición i de la pila es _ir_p{i}. Dentro
+# de un bloque básico los valores se van juntando en expresiones ("a + b * 2")
+# y solo se guardan en su variable antes de una sentencia que pueda cambiar
+# algo o al final del bloque. Como el código intermedio tiene saltos
+# arbitrarios, cada función (y el módulo) con más de un bloque se traduce a un
+# bucle `while True` con la variable _ir_b diciendo qué bloque toca; los
+# bloques se eligen con un árbol de ifs para no recorrerlos todos en cada salto.
+
+import ast
+import importlib.util
+import marshal
+import math
+import os
+import sys
+
+from compilador.cache import EtapasCompilador, expulsar_archivos, hash_fuente, tocar, version_compilador
+from compilador.intermedio import (FUNCIONES_OPERADOR, FUNCIONES_UNARIAS, NOMBRES_OPCODE, OP, OPERADORES,
+                                   SALTOS, VERSION_IR, efecto_pila)
+from compilador.maquina import NoSoportado, comprobar_soporte
+
+VERSION_TRADUCTOR = 1
+# Lo compilado depende de la versión de Python (formato de marshal y de los
+# objetos de código), del código intermedio, de este traductor y del código
+# del compilador (un arreglo del optimizador cambia lo que se genera)
+CLAVE_VERSION = (f"{sys.implementation.cache_tag}-ir{VERSION_IR}-py{VERSION_TRADUCTOR}"
+                 f"-{version_compilador()}")
+MAGIA = importlib.util.MAGIC_NUMBER
+DIRECTORIO_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'compilador', 'codigo')
+MAX_BYTES = 64 << 20  # al pasarse se borran los programas ejecutados hace más tiempo
+
+TERMINAN_BLOQUE = SALTOS | {OP['RETURN'], OP['RAISE']}
+CONDICIONALES = {OP['POP_JUMP_IF_FALSE']: 'not ', OP['POP_JUMP_IF_TRUE']: ''}
+CORTOCIRCUITOS = {OP['JUMP_IF_FALSE_OR_POP']: 'not ', OP['JUMP_IF_TRUE_OR_POP']: ''}
+TRIVIALES = ('literal', 'variable', 'modulo')  # no hace falta guardarlos antes de una sentencia
+PRIMARIAS = ('variable', 'modulo', 'nombre')   # se pueden usar sin paréntesis en a.b, a[i], a()
+TAMANO_HOJA = 4  # bloques que se prueban uno tras otro al final del árbol de ifs
+
+
+def _variable(i):
+    return f"_ir_p{i}"
+
+
+def _literal(valor):
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return f"float('{valor}')"
+    return repr(valor)
+
+
+# Posición de la pila: (texto, clase, texto como índice). El tercer campo solo
+# lo usan las rebanadas, que dentro de [] se escriben a:b y fuera slice(a, b).
+def _entrada(texto, clase='expr', como_indice=None):
+    return texto, clase, como_indice
+
+
+# Texto para usar la entrada como operando de un operador (suelto=True) o
+# delante de .atributo, [índice] o (argumentos)
+def _operando(entrada, suelto=False):
+    texto, clase, _ = entrada
+    if clase in PRIMARIAS or suelto and clase == 'literal' and not texto.startswith('-'):
+        return texto
+    return f"({texto})"
+
+
+def _indice(entradas):
+    return ', '.join(e[2] if e[1] == 'rebanada' else e[0] for e in entradas)
+
+
+class _Traductor:
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.salida = []   # líneas de Python
+        self.origen = []   # línea del código fuente de cada una
+        opcodes = codigo.opcodes
+        n = len(opcodes)
+        lideres = {0} if n else set()
+        for i in range(n):
+            if opcodes[i] == OP['LABEL']:
+                lideres.add(i)
+            elif opcodes[i] in TERMINAN_BLOQUE and i + 1 < n:
+                lideres.add(i + 1)
+        self.inicios = sorted(lideres)
+        self.fines = self.inicios[1:] + [n]
+        bloque_en = {inicio: k for k, inicio in enumerate(self.inicios)}
+        self.bloque_etiqueta = {codigo.operandos[i]: bloque_en[i] for i in range(n) if opcodes[i] == OP['LABEL']}
+
+    def linea(self, nivel, texto, origen):
+        self.salida.append('    ' * nivel + texto)
+        self.origen.append(origen)
+
+    # Bloque al que se llega de verdad saltando a k: los bloques que solo
+    # tienen etiquetas y un JUMP (restos del optimizador) se atraviesan
+    def destino(self, k):
+        vistos = set()
+        while k is not None and k not in vistos:
+            vistos.add(k)
+            inicio, fin = self.inicios[k], self.fines[k]
+            opcodes = self.codigo.opcodes
+            if any(opcodes[i] not in (OP['LABEL'], OP['NOP']) for i in range(inicio, fin - 1)):
+                return k
+            if opcodes[fin - 1] == OP['JUMP']:
+                k = self.bloque_etiqueta[self.codigo.operandos[fin - 1]]
+            elif opcodes[fin - 1] in (OP['LABEL'], OP['NOP']):
+                k = k + 1 if k + 1 < len(self.inicios) else None
+            else:
+                return k
+        return k
+
+    def siguiente(self, k):
+        return self.destino(k + 1) if k + 1 < len(self.inicios) else None
+
+    # (bloque siguiente o None si se sale, altura de la pila al llegar)
+    def sucesores(self, k, altura):
+        codigo = self.codigo
+        ultimo = self.fines[k] - 1
+        for i in range(self.inicios[k], ultimo):
+            saca, mete = efecto_pila(codigo.opcodes[i], codigo.operandos[i], codigo.constantes)
+            altura += mete - saca
+        opcode = codigo.opcodes[ultimo]
+        siguiente = self.siguiente(k)
+        if opcode not in TERMINAN_BLOQUE:
+            saca, mete = efecto_pila(opcode, codigo.operandos[ultimo], codigo.constantes)
+            return [(siguiente, altura + mete - saca)]
+        if opcode in (OP['RETURN'], OP['RAISE']):
+            return []
+        destino = self.destino(self.bloque_etiqueta[codigo.operandos[ultimo]])
+        if opcode == OP['JUMP']:
+            return [(destino, altura)]
+        if opcode in CONDICIONALES:
+            return [(destino, altura - 1), (siguiente, altura - 1)]
+        if opcode in CORTOCIRCUITOS:
+            return [(destino, altura), (siguiente, altura - 1)]
+        return [(destino, altura - 1), (siguiente, altura + 1)]  # FOR_ITER
+
+    def procedimiento(self, entrada, nivel, en_funcion, globales=()):
+        alturas = {entrada: 0}
+        pendientes = [entrada]
+        while pendientes:
+            k = pendientes.pop()
+            for sucesor, altura in self.sucesores(k, alturas[k]):
+                if sucesor is None:
+                    continue
+                if sucesor not in alturas:
+                    alturas[sucesor] = altura
+                    pendientes.append(sucesor)
+                elif alturas[sucesor] != altura:
+                    raise NoSoportado("una pila de distinta altura al unir dos caminos",
+                                      self.codigo.lineas[self.inicios[sucesor]])
+        orden = sorted(alturas)
+        primera_linea = self.codigo.lineas[self.inicios[entrada]] if self.inicios else 0
+        # Todas las declaradas, no solo las que se asignan: una función anidada
+        # que lee una global no debe ver la local de la función de fuera
+        if globales:
+            self.linea(nivel, f"global {', '.join(globales)}", primera_linea)
+        # Un solo bloque que no salta a ningún sitio: código seguido, sin bucle
+        if len(orden) == 1 and all(s is None for s, _ in self.sucesores(entrada, 0)):
+            self.bloque(entrada, 0, nivel, en_funcion, None)
+            if en_funcion and self.codigo.opcodes[self.fines[entrada] - 1] not in (OP['RETURN'], OP['RAISE']):
+                self.linea(nivel, "return None", primera_linea)
+            elif not en_funcion and not self.salida:
+                self.linea(nivel, "pass", primera_linea)
+            return
+        posiciones = {k: j for j, k in enumerate(orden)}
+        self.linea(nivel, "_ir_b = 0", primera_linea)
+        self.linea(nivel, "while True:", primera_linea)
+        self.despacho(orden, alturas, posiciones, 0, len(orden), nivel + 1, en_funcion)
+
+    def despacho(self, orden, alturas, posiciones, primero, ultimo, nivel, en_funcion):
+        if ultimo - primero <= TAMANO_HOJA:
+            for j in range(primero, ultimo):
+                k = orden[j]
+                self.linea(nivel, f"if _ir_b == {j}:", self.codigo.lineas[self.inicios[k]])
+                self.bloque(k, alturas[k], nivel + 1, en_funcion, (posiciones, j, ultimo))
+            return
+        medio = (primero + ultimo) // 2
+        linea = self.codigo.lineas[self.inicios[orden[primero]]]
+        self.linea(nivel, f"if _ir_b < {medio}:", linea)
+        self.despacho(orden, alturas, posiciones, primero, medio, nivel + 1, en_funcion)
+        self.linea(nivel, "else:", linea)
+        self.despacho(orden, alturas, posiciones, medio, ultimo, nivel + 1, en_funcion)
+
+    def bloque(self, k, altura, nivel, en_funcion, despacho):
+        codigo = self.codigo
+        opcodes, operandos, lineas = codigo.opcodes, codigo.operandos, codigo.lineas
+        constantes, nombres = codigo.constantes, codigo.nombres
+        pila = [_entrada(_variable(i), 'variable') for i in range(altura)]
+        linea = lineas[self.inicios[k]]
+
+        def sentencia(texto):
+            volcar()
+            self.linea(nivel, texto, linea)
+
+        # Guarda en su variable cada posición que no sea trivial, en orden
+        def volcar():
+            for i, (texto, clase, _) in enumerate(pila):
+                if clase not in TRIVIALES:
+                    self.linea(nivel, f"{_variable(i)} = {texto}", linea)
+                    pila[i] = _entrada(_variable(i), 'variable')
+
+        # Deja toda la pila en sus variables, como la espera el bloque siguiente
+        def materializar():
+            cambios = [(i, texto) for i, (texto, _, _) in enumerate(pila) if texto != _variable(i)]
+            if cambios:
+                destinos = ', '.join(_variable(i) for i, _ in cambios)
+                valores = ', '.join(texto for _, texto in cambios)
+                self.linea(nivel, f"{destinos} = {valores}", linea)
+            for i, _ in cambios:
+                pila[i] = _entrada(_variable(i), 'variable')
+
+        # Ir al bloque destino. Sin `continue` solo se puede caer en el if
+        # que va justo detrás, y solo si el salto no está dentro de otro if.
+        def transicion(destino, dentro_de_if=False):
+            nivel_salto = nivel + 1 if dentro_de_if else nivel
+            if destino is None:
+                self.linea(nivel_salto, "return None" if en_funcion else "break", linea)
+                return
+            posiciones, actual, fin_hoja = despacho
+            j = posiciones[destino]
+            self.linea(nivel_salto, f"_ir_b = {j}", linea)
+            if dentro_de_if or j != actual + 1 or j >= fin_hoja:
+                self.linea(nivel_salto, "continue", linea)
+
+        def sacar(n):
+            if not n:
+                return []
+            valores = pila[-n:]
+            del pila[-n:]
+            return valores
+
+        fin = self.fines[k]
+        i = self.inicios[k]
+        while i < fin:
+            opcode = opcodes[i]
+            operando = operandos[i]
+            nombre = NOMBRES_OPCODE[opcode]
+            linea = lineas[i]
+            i += 1
+            if nombre in ('NOP', 'LABEL'):
+                pass
+            elif nombre == 'LOAD':
+                pila.append(_entrada(_literal(constantes[operando]), 'literal'))
+            elif nombre == 'LOAD_VAR':
+                pila.append(_entrada(nombres[operando], 'nombre'))
+            elif nombre in ('STORE', 'STORE_GLOBAL'):
+                valor = pila.pop()
+                sentencia(f"{nombres[operando]} = {valor[0]}")
+            elif nombre == 'DELETE':
+                sentencia(f"del {nombres[operando]}")
+            elif nombre in ('OPER', 'COMPARE'):
+                operador = OPERADORES[operando]
+                if operador not in FUNCIONES_OPERADOR:
+                    raise NoSoportado(f"el operador {operador}", linea)
+                izquierda, derecha = sacar(2)
+                pila.append(_entrada(f"{_operando(izquierda, True)} {operador} {_operando(derecha, True)}"))
+            elif nombre == 'UNARY':
+                operador = OPERADORES[operando]
+                if operador not in FUNCIONES_UNARIAS:
+                    raise NoSoportado(f"el operador {operador}", linea)
+                separador = ' ' if operador == 'not' else ''
+                pila.append(_entrada(f"{operador}{separador}{_operando(pila.pop(), True)}"))
+            elif nombre == 'CALL':
+                argumentos = sacar(operando)
+                funcion = pila.pop()
+                pila.append(_entrada(f"{_operando(funcion)}({', '.join(a[0] for a in argumentos)})", 'nombre'))
+            elif nombre == 'CALL_KW':
+                posicionales, con_nombre = constantes[operando]
+                valores = sacar(posicionales + len(con_nombre))
+                funcion = pila.pop()
+                partes = [v[0] for v in valores[:posicionales]]
+                partes += [f"{n}={v[0]}" for n, v in zip(con_nombre, valores[posicionales:])]
+                pila.append(_entrada(f"{_operando(funcion)}({', '.join(partes)})", 'nombre'))
+            elif nombre == 'ATTR':
+                pila.append(_entrada(f"{_operando(pila.pop())}.{nombres[operando]}", 'nombre'))
+            elif nombre == 'STORE_ATTR':
+                objeto = pila.pop()
+                valor = pila.pop()
+                sentencia(f"{_operando(objeto)}.{nombres[operando]} = {valor[0]}")
+            elif nombre == 'INDEX':
+                indices = sacar(operando)
+                pila.append(_entrada(f"{_operando(pila.pop())}[{_indice(indices)}]", 'nombre'))
+            elif nombre == 'STORE_INDEX':
+                indices = sacar(operando)
+                objeto = pila.pop()
+                valor = pila.pop()
+                sentencia(f"{_operando(objeto)}[{_indice(indices)}] = {valor[0]}")
+            elif nombre == 'BUILD_LIST':
+                pila.append(_entrada(f"[{', '.join(e[0] for e in sacar(operando))}]", 'nombre'))
+            elif nombre == 'BUILD_TUPLE':
+                elementos = [e[0] for e in sacar(operando)]
+                texto = f"({elementos[0]},)" if len(elementos) == 1 else f"({', '.join(elementos)})"
+                pila.append(_entrada(texto, 'nombre'))
+            elif nombre == 'BUILD_DICT':
+                elementos = sacar(2 * operando)
+                pares = ', '.join(f"{c[0]}: {v[0]}" for c, v in zip(elementos[::2], elementos[1::2]))
+                pila.append(_entrada(f"{{{pares}}}", 'nombre'))
+            elif nombre == 'BUILD_SLICE':
+                partes = [e[0] for e in sacar(operando)]
+                como_indice = ':'.join('' if p == 'None' else p for p in partes)
+                pila.append(_entrada(f"slice({', '.join(partes)})", 'rebanada', como_indice))
+            elif nombre == 'UNPACK':
+                valor = pila.pop()
+                volcar()
+                base = len(pila)
+                destinos = ', '.join(_variable(base + j) for j in reversed(range(operando)))
+                self.linea(nivel, f"{destinos}, = {valor[0]}" if operando == 1 else f"{destinos} = {valor[0]}",
+                           linea)
+                pila.extend(_entrada(_variable(base + j), 'variable') for j in range(operando))
+            elif nombre == 'POP':
+                texto, clase, _ = pila.pop()
+                if clase not in TRIVIALES:
+                    sentencia(texto)
+            elif nombre == 'DUP':
+                volcar()
+                pila.append(_entrada(pila[-1][0], 'literal' if pila[-1][1] == 'literal' else 'variable'))
+            elif nombre == 'IMPORT':
+                volcar()
+                modulo = nombres[operando]
+                self.linea(nivel, f"import {modulo} as {_variable(len(pila))}", linea)
+                pila.append(_entrada(_variable(len(pila)), 'modulo', modulo))
+            elif nombre == 'IMPORT_FROM':
+                volcar()
+                _, clase, modulo = pila[-1]
+                destino = _variable(len(pila))
+                if clase == 'modulo':
+                    self.linea(nivel, f"from {modulo} import {nombres[operando]} as {destino}", linea)
+                else:
+                    self.linea(nivel, f"{destino} = {_operando(pila[-1])}.{nombres[operando]}", linea)
+                pila.append(_entrada(destino, 'variable'))
+            elif nombre == 'GET_ITER':
+                pila.append(_entrada(f"iter({pila.pop()[0]})", 'nombre'))
+            elif nombre == 'MAKE_FUNCTION':
+                nombre_funcion, parametros, num_por_defecto, inicio, _, declaradas = constantes[operando]
+                por_defecto = sacar(num_por_defecto)
+                volcar()
+                primero_con_defecto = len(parametros) - num_por_defecto
+                partes = [p if j < primero_con_defecto else f"{p}={por_defecto[j - primero_con_defecto][0]}"
+                          for j, p in enumerate(parametros)]
+                self.linea(nivel, f"def {nombre_funcion}({', '.join(partes)}):", linea)
+                self.procedimiento(self.bloque_etiqueta[inicio], nivel + 1, True, declaradas)
+                # def ya guarda la función en su nombre: el STORE de detrás
+                # sobra (o el DUP; STORE que deja la mirilla)
+                guardar = (OP['STORE'], OP['STORE_GLOBAL'])
+                if i < fin and opcodes[i] in guardar and nombres[operandos[i]] == nombre_funcion:
+                    i += 1
+                else:
+                    if i + 1 < fin and opcodes[i] == OP['DUP'] and opcodes[i + 1] in guardar \
+                            and nombres[operandos[i + 1]] == nombre_funcion:
+                        i += 2
+                    pila.append(_entrada(nombre_funcion, 'nombre'))
+            elif nombre == 'RETURN':
+                texto, clase, _ = pila.pop()
+                if en_funcion:
+                    sentencia(f"return {texto}")
+                else:
+                    if clase not in TRIVIALES:
+                        sentencia(texto)
+                    if despacho is not None:
+                        self.linea(nivel, "break", linea)
+                return
+            elif nombre == 'RAISE':
+                sentencia(f"raise {pila.pop()[0]}" if operando else "raise")
+                return
+            elif opcode in CONDICIONALES:
+                condicion = pila.pop()
+                materializar()
+                self.linea(nivel, f"if {CONDICIONALES[opcode]}{_operando(condicion)}:", linea)
+                transicion(self.destino(self.bloque_etiqueta[operando]), True)
+                transicion(self.siguiente(k))
+                return
+            elif opcode in CORTOCIRCUITOS:
+                materializar()
+                self.linea(nivel, f"if {CORTOCIRCUITOS[opcode]}{pila[-1][0]}:", linea)
+                transicion(self.destino(self.bloque_etiqueta[operando]), True)
+                pila.pop()
+                transicion(self.siguiente(k))
+                return
+            elif nombre == 'JUMP':
+                materializar()
+                transicion(self.destino(self.bloque_etiqueta[operando]))
+                return
+            elif nombre == 'FOR_ITER':
+                materializar()
+                self.linea(nivel, f"for {_variable(len(pila))} in {pila[-1][0]}:", linea)
+                self.linea(nivel + 1, "break", linea)
+                self.linea(nivel, "else:", linea)
+                transicion(self.destino(self.bloque_etiqueta[operando]), True)
+                transicion(self.siguiente(k))
+                return
+            else:
+                raise NoSoportado(nombre, linea)
+        # El bloque sigue en el siguiente sin saltar
+        materializar()
+        if despacho is not None:
+            transicion(self.siguiente(k))
+
+    def traducir(self):
+        if self.inicios:
+            self.procedimiento(0, 0, False)
+        else:
+            self.linea(0, "pass", 1)
+        return '\n'.join(self.salida) + '\n', self.origen
+
+
+# Código fuente Python equivalente al código intermedio
+def ir_a_python(codigo):
+    no_soportado = comprobar_soporte(codigo)
+    if no_soportado is not None:
+        raise NoSoportado(*no_soportado)
+    return _Traductor(codigo).traducir()[0]
+
+
+# Objeto de código del código intermedio. Las líneas del árbol de Python se
+# cambian por las del programa original, así los errores al ejecutar dicen la
+# línea que escribió el usuario y no la del código traducido.
+def compilar_ir(codigo, nombre='<programa>'):
+    no_soportado = comprobar_soporte(codigo)
+    if no_soportado is not None:
+        raise NoSoportado(*no_soportado)
+    texto, origen = _Traductor(codigo).traducir()
+    arbol = ast.parse(texto, nombre)
+    for nodo in ast.walk(arbol):
+        if hasattr(nodo, 'lineno'):
+            nodo.lineno = nodo.end_lineno = max(origen[nodo.lineno - 1], 1)
+            if nodo.end_col_offset is not None and nodo.end_col_offset < nodo.col_offset:
+                nodo.end_col_offset = nodo.col_offset
+    return compile(arbol, nombre, 'exec')
+
+
+# Objeto de código del programa: el código intermedio optimizado traducido, o
+# el código fuente compilado por Python si usa algo que no se sabe traducir
+def compilar_programa(codigo_fuente, nombre='<programa>', etapas=None):
+    etapas = etapas if etapas is not None else EtapasCompilador()
+    try:
+        return compilar_ir(etapas.optimizado(codigo_fuente), nombre)
+    except NoSoportado:
+        return compile(codigo_fuente, nombre, 'exec')
+
+
+def _ruta_cache(codigo_fuente, nombre, directorio_cache):
+    clave = hash_fuente('\0'.join((CLAVE_VERSION, nombre, codigo_fuente)))
+    return os.path.join(directorio_cache, f"{clave}.bin")
+
+
+def cargar_compilado(codigo_fuente, nombre='<programa>', directorio_cache=DIRECTORIO_CACHE):
+    ruta = _ruta_cache(codigo_fuente, nombre, directorio_cache)
+    try:
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read()
+    except OSError:
+        return None
+    if not datos.startswith(MAGIA):
+        return None
+    try:
+        objeto = marshal.loads(datos[len(MAGIA):])
+    except (EOFError, ValueError, TypeError):
+        return None  # archivo a medio escribir o corrupto: se vuelve a compilar
+    tocar(ruta)
+    return objeto
+
+
+def guardar_compilado(codigo_fuente, objeto, nombre='<programa>', directorio_cache=DIRECTORIO_CACHE,
+                      max_bytes=MAX_BYTES):
+    ruta = _ruta_cache(codigo_fuente, nombre, directorio_cache)
+    try:
+        os.makedirs(directorio_cache, exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(MAGIA + marshal.dumps(objeto))
+        os.replace(temporal, ruta)
+    except OSError:
+        return ruta  # sin caché en disco se sigue pudiendo ejecutar
+    expulsar_archivos(directorio_cache, max_bytes, '.bin')
+    return ruta
+
+
+# (objeto de código, si salió de la caché en disco). Con la caché caliente no
+# se calcula ninguna etapa del compilador: ni siquiera se crean los tokens.
+def codigo_compilado(codigo_fuente, nombre='<programa>', etapas=None, directorio_cache=DIRECTORIO_CACHE,
+                     max_bytes=MAX_BYTES):
+    if directorio_cache:
+        objeto = cargar_compilado(codigo_fuente, nombre, directorio_cache)
+        if objeto is not None:
+            return objeto, True
+    objeto = compilar_programa(codigo_fuente, nombre, etapas)
+    if directorio_cache:
+        guardar_compilado(codigo_fuente, objeto, nombre, directorio_cache, max_bytes)
+    return objeto, False
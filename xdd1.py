@@ -1,54 +1,11 @@
-import re
-import keyword
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
-from graphviz import Digraph
-
-# Definir patrones generales y ampliados para Python
-TOKENS_PYTHON = [
-    ('COMENTARIO_LINEA', r'#.*'),
-    ('CADENA_MULTILINEA', r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\')'),
-    ('CADENA', r'"[^"\n]*"|\'[^\']*\''),  
-    ('OPERADOR_LOGICO', r'and|or|not|&&|\|\|'),  
-    ('OPERADOR_COMPARACION', r'==|!=|<=|>=|<|>'),
-    ('OPERADOR_ASIGNACION', r'[\+\-\*/]?='),
-    ('OPERADOR_ARITMETICO', r'[+\-*/%]'),
-    ('PUNTUACION', r'[;,\(\)\{\}\[\]\.:]'),
-    ('IDENTIFICADOR', r'[a-zA-Z_][a-zA-Z_0-9]*'),
-    ('NUMERO', r'\d+(\.\d+)?'),  
-    ('ESPACIO', r'\s+'),  
-]
-
-PALABRAS_CLAVE = keyword.kwlist
-
-def es_palabra_clave(palabra):
-    return palabra in PALABRAS_CLAVE
-
-# Analizador léxico
-def analizador_lexico(codigo_fuente):
-    tokens_encontrados = []
-    lineas = codigo_fuente.splitlines()
-
-    for num_linea, linea in enumerate(lineas, start=1):
-        posicion = 0
-        while posicion < len(linea):
-            for token_tipo, patron in TOKENS_PYTHON:
-                patron_compilado = re.compile(patron)
-                coincidencia = patron_compilado.match(linea, posicion)
-                if coincidencia:
-                    texto = coincidencia.group(0)
-                    if token_tipo != 'ESPACIO':  
-                        if token_tipo == 'IDENTIFICADOR' and es_palabra_clave(texto):
-                            tokens_encontrados.append((num_linea, 'PALABRA_CLAVE', texto))
-                        else:
-                            tokens_encontrados.append((num_linea, token_tipo, texto))
-                    posicion = coincidencia.end(0)
-                    break
-
-    return tokens_encontrados
+
+from compilador.lexico import analizador_lexico
 
 # Analizador sintáctico para construir el árbol (sintaxis simple)
 def construir_arbol_sintactico(tokens, nombre_programa):
+    from graphviz import Digraph  # solo al dibujar el árbol
     g = Digraph('G', format='png')
     g.attr(size='6,6')
     nodo_id = 0
@@ -106,21 +63,22 @@ def analizar_codigo():
     # Construir y mostrar el árbol sintáctico
     construir_arbol_sintactico(tokens, nombre_programa)
 
-# Crear la ventana principal
-ventana_principal = tk.Tk()
-ventana_principal.title("Analizador Léxico y Sintáctico")
-ventana_principal.geometry("800x600")
+if __name__ == '__main__':
+    # Crear la ventana principal
+    ventana_principal = tk.Tk()
+    ventana_principal.title("Analizador Léxico y Sintáctico")
+    ventana_principal.geometry("800x600")
 
-# Añadir un área de texto para ingresar código fuente
-label_input = tk.Label(ventana_principal, text="Escriba el código a analizar:", font=("Arial", 12))
-label_input.pack(pady=5)
+    # Añadir un área de texto para ingresar código fuente
+    label_input = tk.Label(ventana_principal, text="Escriba el código a analizar:", font=("Arial", 12))
+    label_input.pack(pady=5)
 
-text_area = scrolledtext.ScrolledText(ventana_principal, width=80, height=25, font=("Courier", 10))
-text_area.pack(padx=10, pady=10)
+    text_area = scrolledtext.ScrolledText(ventana_principal, width=80, height=25, font=("Courier", 10))
+    text_area.pack(padx=10, pady=10)
 
-# Botón para analizar el código
-btn_analizar = tk.Button(ventana_principal, text="Analizar Código", command=analizar_codigo, width=25, height=2, bg="#D2691E", fg="white", font=("Arial", 10))
-btn_analizar.pack(pady=10)
+    # Botón para analizar el código
+    btn_analizar = tk.Button(ventana_principal, text="Analizar Código", command=analizar_codigo, width=25, height=2, bg="#D2691E", fg="white", font=("Arial", 10))
+    btn_analizar.pack(pady=10)
 
-# Ejecutar la ventana principal
-ventana_principal.mainloop()
+    # Ejecutar la ventana principal
+    ventana_principal.mainloop()